@@ -0,0 +1,87 @@
+"""
+Payload bytes and latency per turn of the chat-history fetch: the old full
+fetch (last 100 documents with full _source every turn) vs the incremental
+per-user cache (libs/chat_history_cache.py), against the local OpenSearch
+stand-in. Each simulated turn fetches the history, then writes the user and
+assistant messages with the write-behind buffer.
+
+Usage:
+    python benchmarks/chat_history_fetch.py [--history 300] [--turns 30] [--search-ms 20]
+"""
+import argparse
+import datetime as dt
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+for key in ['OPENAI_API_KEY', 'OPENSEARCH_URL', 'OPENSEARCH_ID', 'OPENSEARCH_PASSWORD']:
+    os.environ.setdefault(key, 'chat-history-benchmark')
+
+from libs.chat_history_cache import ChatHistoryCache
+from libs.chat_history_writer import ChatHistoryWriter
+from libs.opensearch_client import OpenSearchClient
+from scripts.local_standin import start_standin
+
+USER_ID = 'benchmark-user'
+
+def full_fetch(client, user_id):
+    """The query fetch_chat_history sent on every turn before the cache"""
+    query = {
+        "query": {"term": {"user_id": {"value": user_id}}},
+        "sort": [{"timestamp": {"order": "desc"}}],
+        "size": 100,
+    }
+    resp = client.get("chat-history/_search", query)
+    chats = [x['_source'] for x in resp.json()['hits']['hits']]
+    chats.sort(key=lambda x: x['timestamp'])
+    return chats
+
+def run(label, fetch, client, writer, turns, start):
+    before = client.stats()['endpoints'].get('GET /chat-history/_search', {}).get('bytes_received', 0)
+    latencies = []
+    for turn in range(turns):
+        t0 = time.perf_counter()
+        history = fetch()
+        latencies.append(time.perf_counter() - t0)
+        now = start + dt.timedelta(minutes=turn)
+        writer.add(USER_ID, 'user', f'{turn}번째 질문: 오늘 환율이랑 금리 뉴스 좀 알려줘', now.isoformat())
+        writer.add(USER_ID, 'assistant', '오늘 원/달러 환율은 소폭 상승했고 기준금리는 동결되었습니다. ' * 3,
+                   (now + dt.timedelta(seconds=2)).isoformat())
+        writer.end_turn()
+    received = client.stats()['endpoints']['GET /chat-history/_search']['bytes_received'] - before
+    print(f"{label:<14}{received / turns / 1024:>12.1f}{statistics.median(latencies) * 1000:>10.2f}"
+          f"{max(latencies) * 1000:>10.2f}{len(history):>10}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--history', type=int, default=300, help='documents already stored for the user')
+    parser.add_argument('--turns', type=int, default=30)
+    parser.add_argument('--search-ms', type=float, default=20, help='stand-in server time per _search')
+    args = parser.parse_args()
+
+    server, state = start_standin(search_ms=args.search_ms)
+    client = OpenSearchClient(url=f"http://127.0.0.1:{server.server_address[1]}", auth=None)
+    start = dt.datetime(2024, 1, 1)
+    docs = state.indices.setdefault('chat-history', {})
+    for i in range(args.history):
+        docs[f'old-{i}'] = {'user_id': USER_ID, 'role': 'user' if i % 2 == 0 else 'assistant',
+                            'text': '지난 대화 내용입니다. ' * 10, 'timestamp': (start + dt.timedelta(seconds=i)).isoformat()}
+
+    print(f"{'mode':<14}{'KB / turn':>12}{'p50 (ms)':>10}{'max (ms)':>10}{'window':>10}")
+
+    writer = ChatHistoryWriter(durability='sync', client=client)
+    run('full fetch', lambda: full_fetch(client, USER_ID), client, writer, args.turns, start + dt.timedelta(days=1))
+
+    cache = ChatHistoryCache(client=client)
+    writer = ChatHistoryWriter(durability='sync', client=client)
+    writer.subscribe(cache.note_write)
+    run('incremental', lambda: cache.get(USER_ID), client, writer, args.turns, start + dt.timedelta(days=2))
+    print(f"\ncache: {cache.stats()}")
+
+    server.shutdown()
+
+if __name__ == '__main__':
+    main()
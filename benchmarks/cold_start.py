@@ -0,0 +1,103 @@
+"""
+Cold-start measurement for the kakao_callback_project Lambda.
+
+Each sample runs in a fresh interpreter, like a new Lambda container:
+- lazy:  import services.kakao_callback_project (translation model not loaded)
+- eager: the same import followed by translator.warmup(), which is what every
+         cold start used to pay when the model was loaded at import time
+
+Only torch, the MarianMT modules and the model load are deferred. The
+transformers package itself is still imported at startup when it is installed:
+langchain_core (pulled in by langchain_openai) tries to import it for its
+GPT-2 tokenizer. The lazy run reports which of these packages it already
+loaded, so they aren't counted as saved.
+
+Usage:
+    python benchmarks/cold_start.py [--runs 5] [--imports-only]
+
+--imports-only replaces warmup() with the imports translation_handler defers
+(`import torch` and `from transformers import MarianMTModel, MarianTokenizer`),
+for machines that can't download the MarianMT weights (a lower bound on the
+saving).
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# Heavy packages whose import the lazy translator is meant to avoid
+DEFERRED_PACKAGES = ['torch', 'transformers']
+
+LAZY_SNIPPET = """
+import json, sys, time
+t0 = time.perf_counter()
+import services.kakao_callback_project
+elapsed = time.perf_counter() - t0
+print(json.dumps([name for name in %r if name in sys.modules]))
+print(elapsed)
+""" % (DEFERRED_PACKAGES,)
+
+EAGER_SNIPPET = """
+import time
+t0 = time.perf_counter()
+import services.kakao_callback_project
+from libs.translation_handler import translator
+translator.warmup()
+print(time.perf_counter() - t0)
+"""
+
+IMPORTS_ONLY_SNIPPET = """
+import time
+t0 = time.perf_counter()
+import services.kakao_callback_project
+import torch
+from transformers import MarianMTModel, MarianTokenizer
+print(time.perf_counter() - t0)
+"""
+
+def run_sample(snippet: str) -> list:
+    env = dict(os.environ)
+    # config.py refuses to import without these; the values are never used here
+    for key in ['OPENAI_API_KEY', 'OPENSEARCH_URL', 'OPENSEARCH_ID', 'OPENSEARCH_PASSWORD']:
+        env.setdefault(key, 'cold-start-benchmark')
+    env.pop('AWS_LAMBDA_INITIALIZATION_TYPE', None)
+
+    out = subprocess.run(
+        [sys.executable, '-c', snippet],
+        cwd=PROJECT_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return out.stdout.strip().splitlines()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--imports-only', action='store_true')
+    args = parser.parse_args()
+
+    eager_snippet = IMPORTS_ONLY_SNIPPET if args.imports_only else EAGER_SNIPPET
+    eager_label = 'eager (imports only)' if args.imports_only else 'eager (model loaded)'
+
+    lazy_runs = [run_sample(LAZY_SNIPPET) for _ in range(args.runs)]
+    lazy = [float(lines[-1]) for lines in lazy_runs]
+    eager = [float(run_sample(eager_snippet)[-1]) for _ in range(args.runs)]
+    already_loaded = json.loads(lazy_runs[0][-2])
+
+    print(f"{'mode':<24}{'median (s)':>12}{'min (s)':>10}{'max (s)':>10}")
+    for label, samples in [('lazy', lazy), (eager_label, eager)]:
+        print(f"{label:<24}{statistics.median(samples):>12.3f}{min(samples):>10.3f}{max(samples):>10.3f}")
+    print(f"\nimport-time saving: {statistics.median(eager) - statistics.median(lazy):.3f}s per cold start")
+    if already_loaded:
+        # Imported by other dependencies at startup, so neither run can save them
+        print(f"still imported at startup by other modules (not part of the saving): {', '.join(already_loaded)}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+"""
+Index size, query latency and recall of topics embeddings at reduced dimensions.
+
+Offline (default): truncates + renormalizes full-size vectors to each size and
+compares exact kNN against the full-size ranking. Vectors come from a dump made
+by `scripts/build_vector_index.py dump`, or from a synthetic corpus whose
+variance decays across components like text-embedding-3 vectors (random
+isotropic vectors would lose everything when shortened). Queries are stored
+vectors with noise; a query's own document is excluded from its results.
+
+Live (--indices): for indices built by scripts/migrate_topics_dimensions.py,
+reports store size from _stats and kNN query latency/recall through OpenSearch
+with the query embedding shortened to each index's dimension. Recall is
+measured against the first index given.
+
+Usage:
+    python benchmarks/embedding_dimensions.py [--dump topics.jsonl] [--dims 256 512 1024 3072] [--k 2]
+    python benchmarks/embedding_dimensions.py --indices topics topics-1024 topics-512 topics-256
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+for key in ['OPENAI_API_KEY', 'OPENSEARCH_URL', 'OPENSEARCH_ID', 'OPENSEARCH_PASSWORD']:
+    os.environ.setdefault(key, 'embedding-dimensions-benchmark')
+
+from libs.embedding_service import reduce_dimensions
+
+QUERIES_PATH = Path(__file__).resolve().parent / 'news_queries.jsonl'
+
+def load_dump(path):
+    with open(path, encoding='utf-8') as f:
+        return np.stack([np.asarray(json.loads(line)['_source']['embed'], dtype=np.float32) for line in f if line.strip()])
+
+def synthetic_vectors(size, dim, seed=0):
+    rng = np.random.default_rng(seed)
+    scale = (1.0 + np.arange(dim, dtype=np.float32)) ** -0.5
+    topics = rng.standard_normal((max(size // 50, 1), dim)).astype(np.float32) * scale
+    vectors = topics[rng.integers(len(topics), size=size)] + 0.5 * rng.standard_normal((size, dim)).astype(np.float32) * scale
+    return reduce_dimensions(vectors, dim)
+
+def exact_top_k(vectors, query, k, exclude):
+    scores = vectors @ query
+    scores[exclude] = -np.inf
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top])]
+
+def offline_report(vectors, dims, k, num_queries):
+    rng = np.random.default_rng(1)
+    picks = rng.integers(len(vectors), size=num_queries)
+    full_dim = vectors.shape[1]
+    queries = vectors[picks] + rng.standard_normal((num_queries, full_dim)).astype(np.float32) * np.abs(vectors[picks]).mean()
+    full = [set(exact_top_k(vectors, q, k, p)) for q, p in zip(reduce_dimensions(queries, full_dim), picks)]
+
+    print(f"{len(vectors)} vectors, full size {full_dim}\n")
+    print(f"{'dims':>6}{'index MB':>10}{'query KB':>10}{'p50 (ms)':>10}{'recall@' + str(k):>10}")
+    for dim in dims:
+        reduced, reduced_queries = reduce_dimensions(vectors, dim), reduce_dimensions(queries, dim)
+        latencies, recalls = [], []
+        for query, pick, expected in zip(reduced_queries, picks, full):
+            t0 = time.perf_counter()
+            found = exact_top_k(reduced, query, k, pick)
+            latencies.append(time.perf_counter() - t0)
+            recalls.append(len(expected & set(found)) / k)
+        # kNN 요청 본문 크기: 벡터를 JSON 리스트로 보냄
+        payload = len(json.dumps([float(x) for x in reduced_queries[0]]))
+        print(f"{dim:>6}{reduced.nbytes / 2**20:>10.1f}{payload / 1024:>10.1f}"
+              f"{statistics.median(latencies) * 1000:>10.2f}{statistics.mean(recalls):>10.3f}")
+
+def live_report(indices, k, runs):
+    import requests
+    from config import OPENSEARCH_URL, OPENSEARCH_HEADERS, OPENSEARCH_AUTH
+    from libs.embedding_service import EmbeddingService
+    from libs.news_search import make_knn_query
+
+    def call(method, path, body=None):
+        resp = requests.request(method, f"{OPENSEARCH_URL}/{path}", data=body and json.dumps(body),
+                                headers=OPENSEARCH_HEADERS, auth=OPENSEARCH_AUTH)
+        assert resp.status_code == 200, resp.text
+        return resp.json()
+
+    with open(QUERIES_PATH, encoding='utf-8') as f:
+        texts = [json.loads(line)['query'] for line in f if line.strip()]
+    full = EmbeddingService(dimensions=None, disk_path=None).embed_many(texts)
+
+    baseline = None
+    print(f"{'index':<16}{'dims':>6}{'store MB':>10}{'p50 (ms)':>10}{'recall@' + str(k):>10}")
+    for index in indices:
+        mapping = next(iter(call('GET', f"{index}/_mapping").values()))
+        dim = mapping['mappings']['properties']['embed']['dimension']
+        store = call('GET', f"{index}/_stats/store")['_all']['primaries']['store']['size_in_bytes']
+
+        latencies, results = [], []
+        for vector in full:
+            query = make_knn_query(reduce_dimensions(vector, dim).tolist(), k)
+            query['_source'] = False
+            for _ in range(runs):
+                t0 = time.perf_counter()
+                hits = call('POST', f"{index}/_search", query)['hits']['hits']
+                latencies.append(time.perf_counter() - t0)
+            results.append({hit['_id'] for hit in hits})
+        baseline = baseline or results
+        recall = statistics.mean(len(r & b) / max(len(b), 1) for r, b in zip(results, baseline))
+        print(f"{index:<16}{dim:>6}{store / 2**20:>10.1f}{statistics.median(latencies) * 1000:>10.1f}{recall:>10.3f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dump', help='JSONL dump with full-size embeddings (default: synthetic corpus)')
+    parser.add_argument('--size', type=int, default=20000)
+    parser.add_argument('--dims', type=int, nargs='+', default=[256, 512, 1024, 3072])
+    parser.add_argument('--k', type=int, default=2)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--indices', nargs='+', help='compare live OpenSearch indices instead')
+    parser.add_argument('--runs', type=int, default=3)
+    args = parser.parse_args()
+
+    if args.indices:
+        live_report(args.indices, args.k, args.runs)
+        return
+    vectors = load_dump(args.dump) if args.dump else synthetic_vectors(args.size, max(args.dims))
+    offline_report(vectors, [d for d in args.dims if d <= vectors.shape[1]], args.k, args.queries)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+"""
+Schedule lookup latency before/after the schema and filter-context rewrite.
+
+Two scratch indices get the same synthetic schedule documents:
+    bench-schedule-dynamic  dynamic mapping (what the app ran on before)
+    bench-schedule-schema   schema/schedule.json (keyword user_id, date types)
+and each is queried the way fetch_schedule did then and does now:
+    before: bool.must of scored `match` clauses on user_id and date
+    after:  bool.filter of `term` clauses (no scoring, cacheable)
+
+Reports client-side and server-side (`took`) latency, plus hits that belong to
+another user: `match` on an analyzed user_id also matches users whose ids share
+a token. Needs a real cluster at OPENSEARCH_URL for meaningful latency;
+--standin only checks that the script runs.
+
+Usage:
+    python benchmarks/filter_queries.py [--users 2000] [--docs-per-user 50] [--queries 500]
+"""
+import argparse
+import datetime as dt
+import os
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+if '--standin' in sys.argv:
+    for key in ['OPENAI_API_KEY', 'OPENSEARCH_URL', 'OPENSEARCH_ID', 'OPENSEARCH_PASSWORD']:
+        os.environ.setdefault(key, 'filter-benchmark')
+
+from libs.index_schema import load_schemas
+from libs.opensearch_client import OpenSearchClient, opensearch
+
+def before_query(user_id, date):
+    return {
+        "query": {"bool": {"must": [{"match": {"user_id": user_id}}, {"match": {"date": date}}]}},
+        "sort": [{"timestamp": {"order": "desc"}}],
+        "size": 10,
+    }
+
+def after_query(user_id, date):
+    return {
+        "query": {"bool": {"filter": [{"term": {"user_id": user_id}}, {"term": {"date": date}}]}},
+        "sort": [{"timestamp": {"order": "desc"}}],
+        "_source": ["user_id", "date", "time", "text", "timestamp"],  # fetch_schedule skips user_id; kept to count foreign hits
+        "size": 10,
+    }
+
+def load(client, index, docs, batch=2000):
+    for i in range(0, len(docs), batch):
+        lines = []
+        for doc_id, doc in docs[i:i + batch]:
+            lines += [{"index": {"_index": index, "_id": doc_id}}, doc]
+        resp = client.post("_bulk", lines, ndjson=True)
+        assert resp.status_code == 200 and not resp.json()['errors'], resp.text[:500]
+    client.post(f"{index}/_refresh")
+
+def run(client, index, make_query, lookups):
+    latencies, took, foreign = [], [], 0
+    for user_id, date in lookups:
+        t0 = time.perf_counter()
+        resp = client.get(f"{index}/_search", make_query(user_id, date))
+        latencies.append(time.perf_counter() - t0)
+        result = resp.json()
+        took.append(result.get('took', 0))
+        foreign += sum(hit['_source'].get('user_id', user_id) != user_id for hit in result['hits']['hits'])
+    return latencies, took, foreign
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=2000)
+    parser.add_argument('--docs-per-user', type=int, default=50)
+    parser.add_argument('--queries', type=int, default=500)
+    parser.add_argument('--standin', action='store_true', help='run against scripts/local_standin.py instead')
+    parser.add_argument('--keep', action='store_true', help='keep the scratch indices')
+    args = parser.parse_args()
+
+    client = opensearch
+    if args.standin:
+        from scripts.local_standin import start_standin
+        server, _ = start_standin()
+        client = OpenSearchClient(url=f"http://127.0.0.1:{server.server_address[1]}", auth=None)
+
+    rng = random.Random(0)
+    start = dt.date(2024, 1, 1)
+    docs = []
+    for u in range(args.users):
+        user_id = f"kakao-user-{u:05d}"  # ids sharing tokens, like prefixed Kakao bot user keys
+        for d in range(args.docs_per_user):
+            date = start + dt.timedelta(days=rng.randrange(90))
+            docs.append((f"{u}-{d}", {
+                "user_id": user_id,
+                "date": date.isoformat(),
+                "time": f"{rng.randrange(24):02d}:{rng.choice([0, 30]):02d}",
+                "text": rng.choice(["회의", "치과 예약", "점심 약속", "운동", "생일 파티"]),
+                "timestamp": dt.datetime(2024, 1, 1).isoformat(),
+            }))
+    lookups = [(f"kakao-user-{rng.randrange(args.users):05d}", (start + dt.timedelta(days=rng.randrange(90))).isoformat())
+               for _ in range(args.queries)]
+
+    indices = {'before': 'bench-schedule-dynamic', 'after': 'bench-schedule-schema'}
+    client.put(indices['after'], load_schemas()['schedule'])
+    for index in indices.values():
+        load(client, index, docs)
+
+    print(f"{len(docs)} documents, {args.users} users, {args.queries} lookups")
+    print(f"{'query':<8}{'p50 (ms)':>10}{'p95 (ms)':>10}{'took avg':>10}{'foreign hits':>14}")
+    for label, make_query in [('before', before_query), ('after', after_query)]:
+        index = indices[label]
+        run(client, index, make_query, lookups[:50])  # warm-up
+        latencies, took, foreign = run(client, index, make_query, lookups)
+        latencies.sort()
+        print(f"{label:<8}{statistics.median(latencies) * 1000:>10.2f}{latencies[int(len(latencies) * 0.95)] * 1000:>10.2f}"
+              f"{statistics.mean(took):>10.2f}{foreign:>14}")
+
+    if not args.keep:
+        for index in indices.values():
+            client.request('DELETE', index)
+    if args.standin:
+        print("\n(stand-in: latency is not representative of OpenSearch)")
+        server.shutdown()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Latency and result quality of topics retrieval modes against a live cluster.
+
+Compares the legacy summed script_score bool query with hybrid _msearch
+retrieval fused by RRF and by normalized score blending. Relevance comes from
+benchmarks/news_queries.jsonl: a retrieved topic counts as relevant when its
+title contains one of the query's relevant_title_terms.
+
+Usage:
+    python benchmarks/hybrid_search.py [--k 2] [--candidates 20] [--runs 3]
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config import *
+from libs.news_search import hybrid_search, make_advanced_query
+from libs.opensearch_client import opensearch
+
+QUERIES_PATH = Path(__file__).resolve().parent / 'news_queries.jsonl'
+
+def bool_search(text, k):
+    query = make_advanced_query(text)
+    query['size'] = k
+    resp = opensearch.get(f"{TOPICS_INDEX}/_search", query)
+    assert resp.status_code == 200
+    return [x['_source'] for x in resp.json()['hits']['hits']]
+
+def is_relevant(doc, terms):
+    return any(term in (doc.get('title') or '') for term in terms)
+
+def evaluate(name, search, labeled, runs):
+    latencies, precisions, reciprocal_ranks = [], [], []
+    for example in labeled:
+        for _ in range(runs):
+            t0 = time.perf_counter()
+            docs = search(example['query'])
+            latencies.append(time.perf_counter() - t0)
+        relevant = [is_relevant(doc, example['relevant_title_terms']) for doc in docs]
+        precisions.append(sum(relevant) / len(relevant) if relevant else 0.0)
+        reciprocal_ranks.append(next((1 / (i + 1) for i, r in enumerate(relevant) if r), 0.0))
+    print(f"{name:<22}{statistics.mean(precisions):>8.3f}{statistics.mean(reciprocal_ranks):>8.3f}"
+          f"{statistics.median(latencies) * 1000:>10.1f}{max(latencies) * 1000:>10.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--k', type=int, default=NEWS_SEARCH_K)
+    parser.add_argument('--candidates', type=int, default=NEWS_SEARCH_CANDIDATES)
+    parser.add_argument('--runs', type=int, default=3)
+    args = parser.parse_args()
+
+    with open(QUERIES_PATH, encoding='utf-8') as f:
+        labeled = [json.loads(line) for line in f if line.strip()]
+
+    # Query embeddings are cached after the first run, so every mode pays the same embedding cost
+    for example in labeled:
+        hybrid_search(example['query'], k=args.k, candidates=args.candidates)
+
+    print(f"{'mode':<22}{'P@' + str(args.k):>8}{'MRR':>8}{'p50 (ms)':>10}{'max (ms)':>10}")
+    evaluate('bool script_score', lambda q: bool_search(q, args.k), labeled, args.runs)
+    evaluate('hybrid rrf', lambda q: hybrid_search(q, k=args.k, candidates=args.candidates, fusion='rrf'), labeled, args.runs)
+    evaluate('hybrid score blend', lambda q: hybrid_search(q, k=args.k, candidates=args.candidates, fusion='score'), labeled, args.runs)
+
+if __name__ == '__main__':
+    main()
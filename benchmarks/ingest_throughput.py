@@ -0,0 +1,70 @@
+"""
+Ingestion throughput (docs/sec) against the local stand-in for OpenSearch and
+the embeddings API, comparing one-document-at-a-time ingestion with batched
+embedding calls and concurrent batches.
+
+Usage:
+    python benchmarks/ingest_throughput.py [--docs 2000] [--embed-ms 150] [--bulk-ms 30] [--dimensions 1024]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+for key in ['OPENAI_API_KEY', 'OPENSEARCH_URL', 'OPENSEARCH_ID', 'OPENSEARCH_PASSWORD']:
+    os.environ.setdefault(key, 'ingest-benchmark')
+
+from openai import OpenAI
+
+from libs.ingestion import BulkIngester
+from scripts.local_standin import start_standin
+
+def write_articles(path, count):
+    with open(path, 'w', encoding='utf-8') as f:
+        for i in range(count):
+            article = {'id': f'article-{i}', 'title': f'경제 뉴스 {i}', 'content': '기준금리와 환율 전망. ' * 40,
+                       'created_at': f'2024-05-{i % 28 + 1:02d}T09:00:00'}
+            f.write(json.dumps(article, ensure_ascii=False) + '\n')
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--docs', type=int, default=2000)
+    parser.add_argument('--embed-ms', type=float, default=150, help='stand-in latency per embeddings call')
+    parser.add_argument('--bulk-ms', type=float, default=30, help='stand-in latency per _bulk call')
+    parser.add_argument('--dimensions', type=int, default=1024)
+    args = parser.parse_args()
+
+    server, state = start_standin(dimensions=args.dimensions, embed_ms=args.embed_ms, bulk_ms=args.bulk_ms)
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    client = OpenAI(api_key='standin', base_url=f"{url}/v1")
+
+    configs = [
+        # (label, texts per embeddings call, batches in flight)
+        ('one doc per call', 1, 1),
+        ('batch 64', 64, 1),
+        ('batch 256', 256, 1),
+        ('batch 64 x 4 in flight', 64, 4),
+        ('batch 256 x 4 in flight', 256, 4),
+    ]
+    with tempfile.TemporaryDirectory() as tmp:
+        articles = os.path.join(tmp, 'articles.jsonl')
+        write_articles(articles, args.docs)
+
+        print(f"{'config':<26}{'docs':>7}{'docs/s':>9}{'embed calls':>13}{'bulk reqs':>11}")
+        for label, batch_size, in_flight in configs:
+            # 한 건씩 처리하는 설정은 오래 걸리므로 일부만 측정
+            docs = min(args.docs, 200) if batch_size == 1 else args.docs
+            with open(articles, encoding='utf-8') as f:
+                lines = [next(f) for _ in range(docs)]
+            ingester = BulkIngester(index='news-benchmark', embed_batch_size=batch_size, max_in_flight=in_flight,
+                                    dimensions=args.dimensions, opensearch_url=url, client=client)
+            stats = ingester.ingest(lines)
+            print(f"{label:<26}{stats['docs']:>7}{stats['docs_per_sec']:>9.0f}{stats['embed_calls']:>13}{stats['bulk_requests']:>11}")
+
+    server.shutdown()
+
+if __name__ == '__main__':
+    main()
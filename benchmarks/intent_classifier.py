@@ -0,0 +1,87 @@
+"""
+Accuracy/latency report for the local intent fast path.
+
+For every labeled utterance in benchmarks/intent_eval.jsonl the local classifier
+either answers (fast path) or abstains (falls back to intent_chain). Reports
+coverage, fast-path accuracy and per-utterance latency. With --llm, abstentions
+are sent to the real intent_chain so end-to-end accuracy can be compared.
+
+Usage:
+    python benchmarks/intent_classifier.py [--llm]
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from libs.intent_classifier import intent_classifier
+
+EVAL_PATH = Path(__file__).resolve().parent / 'intent_eval.jsonl'
+
+def load_eval_set():
+    with open(EVAL_PATH, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--llm', action='store_true', help='send abstentions to intent_chain')
+    parser.add_argument('--repeat', type=int, default=1000, help='timing repetitions per utterance')
+    args = parser.parse_args()
+
+    examples = load_eval_set()
+    answered, correct, latencies = 0, 0, []
+    errors = Counter()
+    fallbacks = []
+
+    for example in examples:
+        utterance, expected = example['utterance'], example['intent']
+        t0 = time.perf_counter()
+        for _ in range(args.repeat):
+            result = intent_classifier.predict(utterance)
+        latencies.append((time.perf_counter() - t0) / args.repeat)
+
+        if result is None:
+            fallbacks.append(example)
+            print(f"  fallback   {expected:<9} {utterance}")
+            continue
+        answered += 1
+        if result[0] == expected:
+            correct += 1
+            print(f"  ok         {expected:<9} {utterance}")
+        else:
+            errors[(expected, result[0])] += 1
+            print(f"  WRONG      {expected:<9} {utterance} -> {result[0]}")
+
+    print()
+    print(f"examples:           {len(examples)}")
+    print(f"fast-path coverage: {answered}/{len(examples)} ({answered / len(examples):.0%})")
+    print(f"fast-path accuracy: {correct}/{answered} ({correct / max(answered, 1):.0%})")
+    print(f"latency per call:   median {statistics.median(latencies) * 1e6:.1f} us, max {max(latencies) * 1e6:.1f} us")
+    for (expected, got), count in errors.items():
+        print(f"  confused {expected} -> {got}: {count}")
+
+    if args.llm and fallbacks:
+        from libs.prompt_chains import intent_chain, intent_parser
+        from libs.translation_handler import translator
+
+        llm_correct, llm_latencies = 0, []
+        for example in fallbacks:
+            t0 = time.perf_counter()
+            translated, _ = translator.process_text(example['utterance'])
+            result = intent_chain.invoke({
+                "utterance": translated,
+                "format_instructions": intent_parser.get_format_instructions()
+            })
+            llm_latencies.append(time.perf_counter() - t0)
+            llm_correct += intent_parser.parse(result["intent_output"]).intent == example['intent']
+        total_correct = correct + llm_correct
+        print(f"LLM fallback accuracy: {llm_correct}/{len(fallbacks)}, median {statistics.median(llm_latencies) * 1000:.0f} ms")
+        print(f"end-to-end accuracy:   {total_correct}/{len(examples)} ({total_correct / len(examples):.0%})")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""
+Ack latency vs completion latency of the Kakao callback mode (libs/kakao_async.py).
+
+A stand-in handler sleeps for the typical intent + retrieval + LLM time and the
+answer is delivered to the local stand-in's /callback receiver. Kakao's skill
+timeout is 5 seconds: synchronously the user-visible response time is the whole
+handler, in callback mode it is only the acknowledgement.
+
+Usage:
+    python benchmarks/kakao_callback_async.py [--handler-ms 3000] [--requests 8]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+for key in ['OPENAI_API_KEY', 'OPENSEARCH_URL', 'OPENSEARCH_ID', 'OPENSEARCH_PASSWORD']:
+    os.environ.setdefault(key, 'callback-benchmark')
+
+from libs.kakao_async import CallbackDispatcher
+from scripts.local_standin import start_standin
+
+def make_event(callback_url, i):
+    return {'body': json.dumps({'userRequest': {'user': {'id': f'user-{i}'}, 'utterance': '오늘 뉴스 알려줘',
+                                                'callbackUrl': callback_url}})}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--handler-ms', type=float, default=3000, help='intent + retrieval + LLM time')
+    parser.add_argument('--requests', type=int, default=8)
+    args = parser.parse_args()
+
+    server, state = start_standin()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    def handler(event, context):
+        time.sleep(args.handler_ms / 1000)
+        return {'statusCode': 200, 'body': json.dumps({'version': '2.0', 'template': {'outputs': [{'simpleText': {'text': '답변'}}]}})}
+
+    print(f"{'mode':<10}{'ack p50 (ms)':>14}{'ack max (ms)':>14}{'done avg (ms)':>15}{'done max (ms)':>15}")
+    for mode in ['off', 'thread']:
+        # The stand-in receiver is plain http on loopback
+        dispatcher = CallbackDispatcher(mode=mode, workers=args.requests, allowed_hosts=["127.0.0.1"], allowed_schemes=["http"])
+        acks = []
+        for i in range(args.requests):
+            t0 = time.perf_counter()
+            dispatcher.handle(make_event(f"{url}/callback/{mode}-{i}", i), None, handler)
+            acks.append((time.perf_counter() - t0) * 1000)
+        if dispatcher.executor:
+            dispatcher.executor.shutdown(wait=True)
+            stats = dispatcher.stats()
+            done_avg, done_max = stats['avg_completion_ms'], stats['max_completion_ms']
+        else:
+            done_avg, done_max = statistics.mean(acks), max(acks)
+        print(f"{mode:<10}{statistics.median(acks):>14.1f}{max(acks):>14.1f}{done_avg:>15.0f}{done_max:>15.0f}")
+
+    print(f"\ncallbacks received: {len(state.callbacks)}")
+    server.shutdown()
+
+if __name__ == '__main__':
+    main()
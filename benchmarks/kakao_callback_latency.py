@@ -0,0 +1,75 @@
+"""
+Per-stage latency of services/kakao_callback_project.main with stand-in I/O.
+
+OpenSearch, the intent LLM and the answer LLM are replaced by sleeps of
+typical durations, so the orchestration itself is measured: the printed
+timing line shows every stage, and the summary compares the serial cost of
+the old sequential handler with the measured end-to-end time.
+
+Usage:
+    python benchmarks/kakao_callback_latency.py [--history-ms 120] [--intent-ms 600] ...
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from types import SimpleNamespace
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+for key in ['OPENAI_API_KEY', 'OPENSEARCH_URL', 'OPENSEARCH_ID', 'OPENSEARCH_PASSWORD']:
+    os.environ.setdefault(key, 'latency-benchmark')
+
+import services.kakao_callback_project as callback
+
+def sleeper(ms, result=None):
+    def fn(*args, **kwargs):
+        time.sleep(ms / 1000)
+        return result
+    return fn
+
+def make_event(utterance):
+    return {'body': json.dumps({'userRequest': {'user': {'id': 'benchmark-user'}, 'utterance': utterance}})}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--history-ms', type=float, default=120, help='fetch_chat_history')
+    parser.add_argument('--intent-ms', type=float, default=600, help='detect_intent LLM fallback')
+    parser.add_argument('--retrieval-ms', type=float, default=350, help='semantic_search (embedding + kNN)')
+    parser.add_argument('--answer-ms', type=float, default=1500, help='answer LLM call')
+    parser.add_argument('--upload-ms', type=float, default=80, help='each chat-history write (one PUT before, one _bulk now)')
+    args = parser.parse_args()
+
+    callback.fetch_chat_history = sleeper(args.history_ms, [])
+    callback.semantic_search = sleeper(args.retrieval_ms, [])
+    bulk_ok = SimpleNamespace(status_code=200, json=lambda: {'errors': False, 'items': []})
+    callback.chat_history_writer.client = SimpleNamespace(post=sleeper(args.upload_ms, bulk_ok))
+    callback.process_user_message = sleeper(args.answer_ms, ('답변', {}))
+    callback.answer_news_search = lambda utterance, topics=None: (
+        sleeper(args.answer_ms if topics is not None else args.retrieval_ms + args.answer_ms)() or '답변'
+    )
+
+    cases = [
+        # (utterance, intent, detected by the local fast path?)
+        ('환율 뉴스', 'news', True),
+        ('너 뭐 좋아해?', 'chat', False),
+    ]
+    for utterance, intent, fast_path in cases:
+        intent_ms = 0 if fast_path else args.intent_ms
+        callback.detect_intent = sleeper(intent_ms, (intent, {}))
+
+        retrieval_ms = args.retrieval_ms if intent == 'news' else 0
+        serial = args.history_ms + intent_ms + retrieval_ms + args.answer_ms + 2 * args.upload_ms
+
+        t0 = time.perf_counter()
+        callback.main(make_event(utterance), None)
+        elapsed = (time.perf_counter() - t0) * 1000
+
+        print(f"\n{utterance} ({intent}): sequential {serial:.0f} ms -> concurrent {elapsed:.0f} ms "
+              f"({1 - elapsed / serial:.0%} faster)\n")
+
+    callback.executor.shutdown(wait=True)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+"""
+Latency of the MMR diversity rerank (libs/rerank.py) for typical candidate pools.
+
+Usage:
+    python benchmarks/mmr_rerank.py [--dim 3072] [--k 2] [--runs 200]
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from libs.rerank import mmr_rerank
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dim', type=int, default=3072)
+    parser.add_argument('--k', type=int, default=2)
+    parser.add_argument('--runs', type=int, default=200)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'candidates':>10}{'p50 (ms)':>10}{'p95 (ms)':>10}")
+    for n in [20, 50, 100, 200]:
+        query = rng.standard_normal(args.dim).astype(np.float32)
+        candidates = rng.standard_normal((n, args.dim)).astype(np.float32)
+        latencies = []
+        for _ in range(args.runs):
+            t0 = time.perf_counter()
+            mmr_rerank(query, candidates, args.k)
+            latencies.append(time.perf_counter() - t0)
+        print(f"{n:>10}{statistics.median(latencies) * 1000:>10.3f}{np.percentile(latencies, 95) * 1000:>10.3f}")
+
+if __name__ == '__main__':
+    main()
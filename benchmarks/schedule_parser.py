@@ -0,0 +1,80 @@
+"""
+Coverage/accuracy/latency report for the local schedule parser.
+
+For every labeled utterance in benchmarks/schedule_eval.jsonl (relative to
+2024-02-14 10:00, a Wednesday) the local parser either answers or returns None
+and leaves it to the structured-output LLM fallback. Reports coverage, local
+accuracy and per-utterance latency. With --llm, fallbacks are sent to
+parse_schedule_with_llm so its accuracy and latency can be compared.
+
+Usage:
+    python benchmarks/schedule_parser.py [--llm]
+"""
+import argparse
+import datetime as dt
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from libs.schedule_parser import parse_schedule_request
+
+EVAL_PATH = Path(__file__).resolve().parent / 'schedule_eval.jsonl'
+NOW = dt.datetime(2024, 2, 14, 10, 0)
+
+def load_eval_set():
+    with open(EVAL_PATH, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--llm', action='store_true', help='send fallbacks to parse_schedule_with_llm')
+    parser.add_argument('--repeat', type=int, default=1000, help='timing repetitions per utterance')
+    args = parser.parse_args()
+
+    examples = load_eval_set()
+    answered, correct, latencies = 0, 0, []
+    fallbacks = []
+
+    for example in examples:
+        utterance = example['utterance']
+        expected = {key: example[key] for key in ('action', 'title', 'date', 'end_date', 'time', 'limit')}
+        t0 = time.perf_counter()
+        for _ in range(args.repeat):
+            result = parse_schedule_request(utterance, NOW)
+        latencies.append((time.perf_counter() - t0) / args.repeat)
+
+        if result is None:
+            fallbacks.append((example, expected))
+            print(f"  fallback   {utterance}")
+            continue
+        answered += 1
+        if result == expected:
+            correct += 1
+            print(f"  ok         {utterance}")
+        else:
+            print(f"  WRONG      {utterance} -> {result}")
+
+    print()
+    print(f"examples:        {len(examples)}")
+    print(f"local coverage:  {answered}/{len(examples)} ({answered / len(examples):.0%})")
+    print(f"local accuracy:  {correct}/{answered} ({correct / max(answered, 1):.0%})")
+    print(f"latency per call: median {statistics.median(latencies) * 1e6:.1f} us, max {max(latencies) * 1e6:.1f} us")
+
+    if args.llm and fallbacks:
+        from libs.schedule import parse_schedule_with_llm
+
+        llm_correct, llm_latencies = 0, []
+        for example, expected in fallbacks:
+            t0 = time.perf_counter()
+            result = parse_schedule_with_llm(example['utterance'], NOW)
+            llm_latencies.append(time.perf_counter() - t0)
+            # Schedule names are free-form; compare the fields the lookup/save depends on
+            llm_correct += all(result[key] == expected[key] for key in ('action', 'date', 'time') if expected[key])
+        print(f"LLM fallback accuracy: {llm_correct}/{len(fallbacks)}, median {statistics.median(llm_latencies) * 1000:.0f} ms")
+
+if __name__ == '__main__':
+    main()
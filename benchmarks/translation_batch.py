@@ -0,0 +1,81 @@
+"""
+Per-message vs batched translation latency on a 100-message chat history.
+
+Mirrors what generate_chat_response does each turn: every Korean user message
+in the history is translated. The cache is disabled so both modes do real
+MarianMT decodes.
+
+Usage:
+    python benchmarks/translation_batch.py [--messages 100] [--batch-size 16] [--runs 3]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from libs.translation_cache import TranslationCache
+from libs.translation_handler import TranslationHandler
+
+KOREAN_SAMPLES = [
+    "안녕하세요",
+    "오늘 날씨 어때?",
+    "내일 일정 알려줘",
+    "어제 찍은 사진 보여줘",
+    "주식 시장 뉴스 찾아줘",
+    "오늘 기분이 어때?",
+    "다음 주 화요일 오후 3시에 회의 있어",
+    "환율 뉴스",
+    "너는 누구니?",
+    "점심 메뉴 추천해줘",
+]
+
+def make_history(size: int):
+    history = []
+    for i in range(size):
+        if i % 2 == 0:
+            # Suffix keeps user messages distinct, like a real history
+            history.append({"role": "user", "text": f"{KOREAN_SAMPLES[(i // 2) % len(KOREAN_SAMPLES)]} ({i // 2}번째)"})
+        else:
+            history.append({"role": "assistant", "text": "네, 알겠습니다."})
+    return history
+
+def per_message(handler: TranslationHandler, history):
+    return [handler.process_text(chat["text"]) for chat in history if chat["role"] == "user"]
+
+def batched(handler: TranslationHandler, history, batch_size: int):
+    return handler.translate_batch([chat["text"] for chat in history if chat["role"] == "user"], batch_size=batch_size)
+
+def timed(fn, runs: int):
+    samples = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return samples
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--messages', type=int, default=100)
+    parser.add_argument('--batch-size', type=int, default=16)
+    parser.add_argument('--runs', type=int, default=3)
+    args = parser.parse_args()
+
+    handler = TranslationHandler(cache=TranslationCache(namespace="benchmark", enabled=False))
+    handler.warmup()
+    history = make_history(args.messages)
+
+    loop = timed(lambda: per_message(handler, history), args.runs)
+    batch = timed(lambda: batched(handler, history, args.batch_size), args.runs)
+
+    print(f"history: {args.messages} messages, batch size {args.batch_size}")
+    print(f"{'mode':<14}{'median (s)':>12}{'min (s)':>10}")
+    for label, samples in [('per-message', loop), ('batched', batch)]:
+        print(f"{label:<14}{statistics.median(samples):>12.3f}{min(samples):>10.3f}")
+    print(f"\nspeedup: {statistics.median(loop) / statistics.median(batch):.2f}x")
+
+if __name__ == '__main__':
+    main()
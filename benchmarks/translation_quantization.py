@@ -0,0 +1,100 @@
+"""
+Quality/latency comparison of the float32 and int8 ko-en translators.
+
+Runs every Korean sample from tests/test_translation.py through both models
+and reports per-utterance latency, model size, and how close the int8
+translation is to the float32 one (exact matches and token-overlap F1).
+
+Usage:
+    python benchmarks/translation_quantization.py [--runs 5]
+"""
+import argparse
+import io
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import torch
+
+from libs.translation_cache import TranslationCache
+from libs.translation_handler import TranslationHandler
+from tests.test_translation import KOREAN_TEXTS, TEST_CASES
+
+def token_f1(reference: str, candidate: str) -> float:
+    ref = reference.lower().split()
+    cand = candidate.lower().split()
+    if not ref or not cand:
+        return float(ref == cand)
+    common = 0
+    remaining = list(ref)
+    for token in cand:
+        if token in remaining:
+            remaining.remove(token)
+            common += 1
+    if common == 0:
+        return 0.0
+    precision = common / len(cand)
+    recall = common / len(ref)
+    return 2 * precision * recall / (precision + recall)
+
+def model_size_mb(model) -> float:
+    buffer = io.BytesIO()
+    torch.save(model.state_dict(), buffer)
+    return buffer.tell() / 1024 / 1024
+
+def translate_all(handler: TranslationHandler, texts, runs: int):
+    outputs, latencies = [], []
+    for text in texts:
+        samples = []
+        for _ in range(runs):
+            t0 = time.perf_counter()
+            output = handler.translate_to_english(text)
+            samples.append(time.perf_counter() - t0)
+        outputs.append(output)
+        latencies.append(statistics.median(samples))
+    return outputs, latencies
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    texts = list(KOREAN_TEXTS) + [text for text, is_korean in TEST_CASES if is_korean and text not in KOREAN_TEXTS]
+    no_cache = TranslationCache(namespace="benchmark", enabled=False)
+
+    fp32 = TranslationHandler(cache=no_cache, quantized=False)
+    fp32.warmup()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        t0 = time.perf_counter()
+        int8 = TranslationHandler(cache=no_cache, quantized=True, quantized_model_path=f"{tmp_dir}/int8.pt")
+        int8.warmup()
+        convert_time = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        reloaded = TranslationHandler(cache=no_cache, quantized=True, quantized_model_path=f"{tmp_dir}/int8.pt")
+        reloaded.warmup()
+        reload_time = time.perf_counter() - t0
+
+    fp32_out, fp32_lat = translate_all(fp32, texts, args.runs)
+    int8_out, int8_lat = translate_all(int8, texts, args.runs)
+
+    print(f"{'Korean':<28}{'fp32 (ms)':>10}{'int8 (ms)':>10}{'F1':>6}")
+    for text, a, b, la, lb in zip(texts, fp32_out, int8_out, fp32_lat, int8_lat):
+        print(f"{text:<28}{la * 1000:>10.1f}{lb * 1000:>10.1f}{token_f1(a, b):>6.2f}")
+        print(f"    fp32: {a}")
+        print(f"    int8: {b}")
+
+    exact = sum(a == b for a, b in zip(fp32_out, int8_out))
+    mean_f1 = statistics.mean(token_f1(a, b) for a, b in zip(fp32_out, int8_out))
+    print()
+    print(f"model size:      fp32 {model_size_mb(fp32.ko_en_model):.1f} MB, int8 {model_size_mb(int8.ko_en_model):.1f} MB")
+    print(f"median latency:  fp32 {statistics.median(fp32_lat) * 1000:.1f} ms, int8 {statistics.median(int8_lat) * 1000:.1f} ms")
+    print(f"int8 load:       {convert_time:.2f}s converting, {reload_time:.2f}s from the local cache")
+    print(f"quality vs fp32: {exact}/{len(texts)} exact matches, mean token F1 {mean_f1:.3f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+Recall/latency of the local vector index: IVF (approximate) vs exact search.
+
+Uses an index directory built by scripts/build_vector_index.py, or a synthetic
+clustered corpus when --index is not given. Queries are perturbed copies of
+stored vectors, so they look like real near-duplicate topics.
+
+Usage:
+    python benchmarks/vector_index.py [--index DIR] [--size 20000] [--dim 3072] [--nlist 128] [--spread 1.5] [--k 2]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+for key in ['OPENAI_API_KEY', 'OPENSEARCH_URL', 'OPENSEARCH_ID', 'OPENSEARCH_PASSWORD']:
+    os.environ.setdefault(key, 'vector-index-benchmark')
+
+from libs.vector_index import LocalVectorIndex
+
+def synthetic_index(size, dim, nlist, spread, seed=0):
+    rng = np.random.default_rng(seed)
+    topics = rng.standard_normal((max(size // 50, 1), dim)).astype(np.float32)
+    vectors = topics[rng.integers(len(topics), size=size)] + spread * rng.standard_normal((size, dim)).astype(np.float32)
+    records = [{'_id': str(i), '_source': {'title': f'topic {i}', 'summary': '', 'sources': [], 'embed': v}} for i, v in enumerate(vectors)]
+    t0 = time.perf_counter()
+    index = LocalVectorIndex.from_records(records, nlist=nlist)
+    print(f"built synthetic index: {size} x {dim}, nlist={nlist} in {time.perf_counter() - t0:.1f}s")
+    return index
+
+def timed_search(index, queries, k, mode, nprobe):
+    results, latencies = [], []
+    for query in queries:
+        t0 = time.perf_counter()
+        results.append([i for i, _ in index.search(query, k, mode, nprobe)])
+        latencies.append(time.perf_counter() - t0)
+    return results, latencies
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--index', help='index directory (default: synthetic corpus)')
+    parser.add_argument('--size', type=int, default=20000)
+    parser.add_argument('--dim', type=int, default=3072)
+    parser.add_argument('--nlist', type=int, default=128)
+    parser.add_argument('--spread', type=float, default=1.5, help='synthetic within-topic noise')
+    parser.add_argument('--query-noise', type=float, default=1.5)
+    parser.add_argument('--k', type=int, default=2)
+    parser.add_argument('--queries', type=int, default=200)
+    args = parser.parse_args()
+
+    if args.index:
+        t0 = time.perf_counter()
+        index = LocalVectorIndex.load(args.index)
+        print(f"loaded {args.index} (memory-mapped) in {(time.perf_counter() - t0) * 1000:.1f} ms")
+    else:
+        index = synthetic_index(args.size, args.dim, args.nlist, args.spread)
+
+    rng = np.random.default_rng(1)
+    picks = rng.integers(len(index), size=args.queries)
+    dim = index.vectors.shape[1]
+    # Noise of norm ~query_noise around unit vectors: related, not identical, queries
+    queries = [np.asarray(index.vectors[i]) + args.query_noise * rng.standard_normal(dim).astype(np.float32) / np.sqrt(dim) for i in picks]
+
+    exact, exact_lat = timed_search(index, queries, args.k, 'exact', 0)
+    print(f"\n{'mode':<16}{'recall@' + str(args.k):>10}{'p50 (ms)':>10}{'p95 (ms)':>10}")
+    print(f"{'exact':<16}{1.0:>10.3f}{statistics.median(exact_lat) * 1000:>10.2f}{np.percentile(exact_lat, 95) * 1000:>10.2f}")
+    if index.centroids is None:
+        print("(index has no IVF lists; build it with --nlist to compare)")
+        return
+    for nprobe in [1, 4, 8, 16, 32]:
+        approx, lat = timed_search(index, queries, args.k, 'ivf', nprobe)
+        recall = statistics.mean(len(set(a) & set(e)) / len(e) for a, e in zip(approx, exact))
+        print(f"{'ivf nprobe=' + str(nprobe):<16}{recall:>10.3f}{statistics.median(lat) * 1000:>10.2f}{np.percentile(lat, 95) * 1000:>10.2f}")
+
+if __name__ == '__main__':
+    main()
@@ -47,15 +47,124 @@ OPENSEARCH_HEADERS = {
     "Content-Type": "application/json",
 }
 
+# OpenSearch Client Configuration
+OPENSEARCH_POOL_SIZE = 16  # Keep-alive connections kept per host (>= KAKAO_CALLBACK_WORKERS + callers on the main thread)
+OPENSEARCH_CONNECT_TIMEOUT = 3  # Seconds to open a connection
+OPENSEARCH_READ_TIMEOUT = 10  # Seconds to wait for a response
+OPENSEARCH_MAX_RETRIES = 3  # Retries of 429/5xx responses and connection errors
+OPENSEARCH_RETRY_BACKOFF = 0.2  # Exponential backoff factor: 0.2s, 0.4s, 0.8s...
+
+# Kakao Callback Configuration
+KAKAO_CALLBACK_WORKERS = 8  # Thread pool for I/O that overlaps with intent detection
+KAKAO_CALLBACK_MODE = os.getenv('KAKAO_CALLBACK_MODE', 'off')  # 'off' answers synchronously; 'thread' or 'lambda' ack with useCallback and POST the answer to callbackUrl
+KAKAO_CALLBACK_ASYNC_WORKERS = 4  # Thread mode: answers computed concurrently
+KAKAO_CALLBACK_ACK_TEXT = os.getenv('KAKAO_CALLBACK_ACK_TEXT', '답변을 준비하고 있어요. 잠시만 기다려 주세요!')
+KAKAO_CALLBACK_ERROR_TEXT = '죄송합니다. 답변을 만드는 중에 문제가 생겼어요. 다시 한 번 말씀해 주세요.'
+KAKAO_CALLBACK_DELIVERY_TIMEOUT = 5  # Seconds per POST to callbackUrl
+KAKAO_CALLBACK_DELIVERY_RETRIES = 2  # Retries on 429/5xx/connection errors (callbackUrl is valid for one minute)
+KAKAO_CALLBACK_ALLOWED_HOSTS = [h.strip() for h in os.getenv('KAKAO_CALLBACK_ALLOWED_HOSTS', 'bot-api.kakao.com').split(',') if h.strip()]  # Hosts a callbackUrl may point to (https only); anything else is answered synchronously
+
+# Chat History Write-Behind Configuration
+CHAT_HISTORY_DURABILITY = os.getenv('CHAT_HISTORY_DURABILITY', 'sync')  # 'sync' writes (one _bulk per turn) before the handler returns; 'background' writes off the response path, only for long-running servers (Lambda freezes the process after returning)
+CHAT_HISTORY_FLUSH_INTERVAL_SECONDS = float(os.getenv('CHAT_HISTORY_FLUSH_INTERVAL_SECONDS', '0'))  # Background mode: wait this long to batch more turns (0 = one _bulk per turn)
+CHAT_HISTORY_FLUSH_MAX_DOCS = 500  # Flush early once this many documents are buffered
+CHAT_HISTORY_MAX_RETRIES = 3  # Failed documents are re-sent with the next flush this many times
+
+# Chat History Cache Configuration
+CHAT_HISTORY_CACHE_ENABLED = os.getenv('CHAT_HISTORY_CACHE_ENABLED', 'true').lower() == 'true'  # Incremental per-user history fetch (false = full fetch every turn)
+CHAT_HISTORY_WINDOW = 100  # Most recent chat-history documents kept and returned per user
+CHAT_HISTORY_CACHE_MAX_USERS = 500  # Users cached per container (least recently active evicted first)
+
 # Translation Configuration
 KOREAN_DETECTION_THRESHOLD = 0.5  # Ratio of Korean characters to consider text as Korean
 TRANSLATION_MODEL_NAME = "Helsinki-NLP/opus-mt-ko-en"  # MarianMT model for Korean to English translation
+TRANSLATION_BATCH_SIZE = 16  # Max texts per generate() call in translate_batch
+TRANSLATION_CHUNK_MAX_CHARS = 150  # Long inputs are split at sentence boundaries into chunks of at most this many characters
+TRANSLATION_QUANTIZED = os.getenv('TRANSLATION_QUANTIZED', 'false').lower() == 'true'  # Int8 dynamic quantization for CPU inference
+TRANSLATION_QUANTIZED_MODEL_PATH = os.getenv('TRANSLATION_QUANTIZED_MODEL_PATH', '/tmp/opus-mt-ko-en-int8.pt')  # Quantized weights are converted once and reused from here
+
+# Translation Cache Configuration
+TRANSLATION_CACHE_ENABLED = os.getenv('TRANSLATION_CACHE_ENABLED', 'true').lower() == 'true'  # Switch to disable the cache
+TRANSLATION_CACHE_MAX_ENTRIES = 2048  # In-process LRU size
+TRANSLATION_CACHE_TTL_SECONDS = 7 * 24 * 60 * 60  # Entries older than this are re-translated
+TRANSLATION_CACHE_DISK_PATH = os.getenv('TRANSLATION_CACHE_DISK_PATH', '/tmp/translation-cache.sqlite3')  # Empty string disables the on-disk level
+TRANSLATION_CACHE_DISK_MAX_ENTRIES = 50000  # On-disk store size (oldest entries are evicted first)
+
+# Embedding Configuration
+EMBEDDING_MODEL_NAME = "text-embedding-3-large"  # OpenAI embedding model used for the topics/news indices
+EMBEDDING_DIMENSIONS = int(os.getenv('EMBEDDING_DIMENSIONS', '0')) or None  # 256/512/1024 via the model's `dimensions` parameter (must match TOPICS_INDEX); None keeps the full 3072
+EMBEDDING_CACHE_MAX_ENTRIES = 4096  # In-process LRU of query vectors
+EMBEDDING_CACHE_DISK_PATH = os.getenv('EMBEDDING_CACHE_DISK_PATH', '/tmp/embedding-cache.sqlite3')  # Empty string disables the on-disk level
+EMBEDDING_CACHE_DISK_MAX_ENTRIES = 10000  # ~120MB at 3072 float32 dims; oldest vectors are evicted first
+
+# News Search Configuration
+TOPICS_INDEX = os.getenv('TOPICS_INDEX', 'topics')  # Index or alias searched for news topics
+NEWS_SEARCH_MODE = os.getenv('NEWS_SEARCH_MODE', 'hybrid')  # 'hybrid' (_msearch + fusion) or 'bool' (summed script_score query)
+NEWS_SEARCH_K = 2  # Topics passed to the answer prompt
+NEWS_SEARCH_CANDIDATES = 20  # Candidates fetched from each of the lexical and vector queries before fusion
+NEWS_SEARCH_FUSION = 'rrf'  # 'rrf' (reciprocal rank fusion) or 'score' (min-max normalized score blending)
+NEWS_SEARCH_LEXICAL_WEIGHT = 1.0  # Weight of the BM25 multi_match ranking
+NEWS_SEARCH_VECTOR_WEIGHT = 1.0  # Weight of the kNN ranking
+NEWS_SEARCH_RRF_K = 60  # RRF rank constant: score = weight / (rrf_k + rank)
+NEWS_SEARCH_RERANK = os.getenv('NEWS_SEARCH_RERANK', 'true').lower() == 'true'  # Second stage: MMR diversity rerank of over-fetched candidates
+NEWS_SEARCH_RERANK_CANDIDATES = 100  # Candidates over-fetched (with embeddings) for the rerank
+NEWS_SEARCH_MMR_LAMBDA = 0.7  # 1.0 = pure relevance, lower values favour diversity
+
+# Local Vector Index Configuration
+VECTOR_INDEX_PATH = os.getenv('VECTOR_INDEX_PATH', '')  # Directory built by scripts/build_vector_index.py; empty uses OpenSearch
+VECTOR_INDEX_MODE = os.getenv('VECTOR_INDEX_MODE', 'exact')  # 'exact' (brute force) or 'ivf' (approximate)
+VECTOR_INDEX_NPROBE = 8  # IVF lists scanned per query
+
+# Ingestion Configuration
+INGEST_EMBED_BATCH_SIZE = 256  # Texts per embeddings.create call (API limit: 2048 inputs)
+INGEST_EMBED_MAX_CHARS = 8000  # Longer texts are cut before embedding to stay under the model's token limit
+INGEST_BULK_MAX_BYTES = 5 * 1024 * 1024  # Max NDJSON body size of one _bulk request
+INGEST_MAX_IN_FLIGHT = 4  # Batches being embedded/written concurrently
+INGEST_MAX_RETRIES = 3  # Retries of 429/5xx responses and rejected bulk items
+INGEST_BULK_TIMEOUT = 60  # Seconds to wait for one _bulk response (a 5 MB body takes longer than a search)
 
 # LLM Configuration
 LLM_MODEL_NAME = "gpt-4o-mini"  # OpenAI model to use
 LLM_TEMPERATURE = 0  # Temperature for LLM responses
 
-# Available OpenSearch indices used in the application:
+# Chat Memory Configuration
+CHAT_MEMORY_TOKEN_BUDGET = 1500  # Max estimated tokens of chat history sent with each chat prompt
+CHAT_MEMORY_MAX_MESSAGE_TOKENS = 300  # A single history message longer than this is truncated before packing
+CHAT_MEMORY_MAX_USERS = 500  # Users kept in memory per container (least recently active evicted first)
+CHAT_MEMORY_SUMMARY_ENABLED = os.getenv('CHAT_MEMORY_SUMMARY_ENABLED', 'false').lower() == 'true'  # Rolling LLM summary of turns outside the window
+
+# Response Cache Configuration
+RESPONSE_CACHE_ENABLED = os.getenv('RESPONSE_CACHE_ENABLED', 'true').lower() == 'true'  # Reuse LLM answers for repeated inputs
+RESPONSE_CACHE_MAX_ENTRIES = 1000  # In-process LRU size
+RESPONSE_CACHE_SIMILARITY_ENABLED = os.getenv('RESPONSE_CACHE_SIMILARITY_ENABLED', 'false').lower() == 'true'  # Near-duplicate hits; off because n-gram similarity can't tell 인상/인하 or 오늘/어제 apart
+RESPONSE_CACHE_SIMILARITY_THRESHOLD = 0.92  # Min cosine similarity for a near-duplicate utterance to reuse an answer (only when enabled)
+RESPONSE_CACHE_TTLS = {  # Seconds per intent; intents not listed are never cached
+    'intent': 24 * 60 * 60,  # Intent classification (keyed by date too, so relative dates stay correct)
+    'news': 10 * 60,  # News answers go stale quickly
+}
+
+# Intent Fast Path Configuration
+INTENT_FAST_PATH_ENABLED = os.getenv('INTENT_FAST_PATH_ENABLED', 'true').lower() == 'true'  # Local classifier in front of intent_chain
+INTENT_FAST_PATH_MIN_MARGIN = 0.06  # Min cosine margin between the top two intent centroids to skip the LLM
+
+# Schedule Configuration
+SCHEDULE_LOCAL_PARSER_ENABLED = os.getenv('SCHEDULE_LOCAL_PARSER_ENABLED', 'true').lower() == 'true'  # Parse dates/times locally before asking the LLM
+SCHEDULE_LLM_MODEL = "gpt-4o"  # Structured-output fallback for utterances the local parser can't handle
+SCHEDULE_MAX_RESULTS = 50  # Schedules shown for one lookup (Kakao carousel of up to 10 list cards x 5 items)
+SCHEDULE_DEFAULT_DURATION_MINUTES = 60  # Schedules only have a start time; assumed length for overlap checks
+SCHEDULE_INDEX_ENABLED = os.getenv('SCHEDULE_INDEX_ENABLED', 'false').lower() == 'true'  # In-process per-user sorted schedules for range/upcoming/overlap lookups
+SCHEDULE_INDEX_TTL_SECONDS = 60  # A user's schedules are reloaded after this long (picks up other containers' writes)
+SCHEDULE_INDEX_PAST_DAYS = 31  # Schedules older than this aren't loaded; lookups reaching further back go to OpenSearch
+SCHEDULE_INDEX_MAX_EVENTS = 1000  # Schedules loaded per user
+SCHEDULE_INDEX_MAX_USERS = 500  # Users kept per container (least recently active evicted first)
+
+# Photo Configuration
+PHOTO_PAGE_SIZE = 10  # Photos per carousel page (Kakao carousel limit)
+PHOTO_CURSOR_TTL_SECONDS = 10 * 60  # "더 보여줘" continues the last photo lookup for this long
+PHOTO_CURSOR_MAX_USERS = 500  # Users whose photo cursor is kept per container (least recently active evicted first)
+
+# Available OpenSearch indices used in the application
+# (aliases; mappings in schema/<name>.json, applied with scripts/manage_schema.py):
 # - chat-history: Stores chat history between users and the chatbot
 # - user-photos: Stores user uploaded photos
 # - schedule: Stores user schedules
@@ -0,0 +1,140 @@
+from typing import Dict, List, Optional
+from collections import OrderedDict
+import threading
+
+from config import (
+    CHAT_HISTORY_CACHE_ENABLED,
+    CHAT_HISTORY_CACHE_MAX_USERS,
+    CHAT_HISTORY_WINDOW,
+)
+from libs.opensearch_client import opensearch
+from libs.chat_history_writer import chat_history_writer
+
+# Fields the prompts need; user_id is already known and not fetched
+HISTORY_FIELDS = ["role", "text", "timestamp"]
+
+##############################################
+# 사용자별 최근 대화 캐시
+# --------------------------------------------
+# - 처음에는 최근 CHAT_HISTORY_WINDOW개를 가져오고, 이후에는 마지막으로 본
+#   (timestamp, message_id) 이후의 문서만 search_after로 가져옴
+# - message_id는 같은 timestamp인 메시지를 구분하는 tiebreaker라서 경계에서
+#   같은 시각의 다른 메시지를 건너뛰지 않음
+# - 우리가 쓴 문서(chat_history_writer.add)는 바로 캐시에 반영하고,
+#   OpenSearch에서 같은 _id가 돌아오면 확인된 것으로 처리 (중복 없음)
+##############################################
+
+class _UserHistory:
+    def __init__(self):
+        self.docs: Optional[List[Dict]] = None  # 확인된 문서 (오래된 순), None이면 아직 안 가져옴
+        self.last_sort: Optional[list] = None  # 가장 최근 문서의 sort 값 [timestamp, message_id]
+        self.local: "OrderedDict[str, Dict]" = OrderedDict()  # 아직 검색에 안 보이는 우리 쓰기
+
+class ChatHistoryCache:
+    """
+    Per-user ordered window of recent chat history, kept across warm invocations
+    and refreshed incrementally on every read. Other containers' writes are
+    picked up by the incremental fetch; our own writes are visible immediately.
+    """
+
+    def __init__(
+        self,
+        index: str = 'chat-history',
+        window: int = CHAT_HISTORY_WINDOW,
+        max_users: int = CHAT_HISTORY_CACHE_MAX_USERS,
+        enabled: bool = CHAT_HISTORY_CACHE_ENABLED,
+        client=opensearch,
+    ):
+        self.index = index
+        self.window = window
+        self.max_users = max_users
+        self.enabled = enabled
+        self.client = client
+        self._users: "OrderedDict[str, _UserHistory]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.full_fetches = 0
+        self.incremental_fetches = 0
+        self.fetched_docs = 0
+
+    def _entry(self, user_id: str) -> _UserHistory:
+        entry = self._users.get(user_id)
+        if entry is None:
+            entry = self._users[user_id] = _UserHistory()
+        self._users.move_to_end(user_id)
+        while len(self._users) > self.max_users:
+            self._users.popitem(last=False)
+        return entry
+
+    def _search(self, user_id: str, order: str, search_after: Optional[list] = None) -> List[Dict]:
+        query = {
+            "query": {"bool": {"filter": [{"term": {"user_id": user_id}}]}},
+            "sort": [{"timestamp": {"order": order}}, {"message_id": {"order": order}}],
+            "size": self.window,
+            "_source": HISTORY_FIELDS,
+        }
+        if search_after is not None:
+            query["search_after"] = search_after
+        resp = self.client.get(f"{self.index}/_search", query)
+        assert resp.status_code == 200
+        hits = resp.json()['hits']['hits']
+        with self._lock:
+            self.fetched_docs += len(hits)
+        return hits
+
+    def get(self, user_id: str) -> List[Dict]:
+        """Recent chat history of user_id, oldest first, as {role, text, timestamp} dicts"""
+        with self._lock:
+            entry = self._entry(user_id)
+            incremental = self.enabled and entry.docs is not None and entry.last_sort is not None
+            last_sort = entry.last_sort
+
+        hits = self._search(user_id, 'asc', last_sort) if incremental else None
+        if hits is None or len(hits) >= self.window:
+            # 처음이거나 그 사이 문서가 너무 많이 쌓였으면 최근 window만 새로 가져옴
+            hits = list(reversed(self._search(user_id, 'desc')))
+            incremental = False
+
+        with self._lock:
+            if incremental:
+                self.incremental_fetches += 1
+            else:
+                self.full_fetches += 1
+                entry.docs = []
+            seen = {doc['_id'] for doc in entry.docs}
+            for hit in hits:
+                entry.local.pop(hit['_id'], None)
+                if hit['_id'] not in seen:
+                    entry.docs.append(dict(hit['_source'], _id=hit['_id']))
+            if hits:
+                entry.last_sort = hits[-1]['sort']
+            entry.docs = entry.docs[-self.window:]
+
+            chats = entry.docs + list(entry.local.values())
+        chats = sorted(chats, key=lambda x: (x['timestamp'], x.get('message_id') or x['_id']))[-self.window:]
+        return [{field: chat.get(field) for field in HISTORY_FIELDS} for chat in chats]
+
+    def note_write(self, doc_id: str, doc: Dict) -> None:
+        """Make our own write visible to the next get() before OpenSearch has it"""
+        with self._lock:
+            entry = self._entry(doc['user_id'])
+            entry.local[doc_id] = dict(doc, _id=doc_id)
+            while len(entry.local) > self.window:
+                entry.local.popitem(last=False)
+
+    def invalidate(self, user_id: str) -> None:
+        with self._lock:
+            self._users.pop(user_id, None)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'users': len(self._users),
+                'full_fetches': self.full_fetches,
+                'incremental_fetches': self.incremental_fetches,
+                'fetched_docs': self.fetched_docs,
+            }
+
+# Singleton instance shared by the Kakao callbacks; sees every chat-history write
+chat_history_cache = ChatHistoryCache()
+chat_history_writer.subscribe(chat_history_cache.note_write)
@@ -0,0 +1,181 @@
+from typing import Callable, Dict, List, Optional, Tuple
+import atexit
+import datetime as dt
+import threading
+import time
+
+import shortuuid
+
+from config import (
+    CHAT_HISTORY_DURABILITY,
+    CHAT_HISTORY_FLUSH_INTERVAL_SECONDS,
+    CHAT_HISTORY_FLUSH_MAX_DOCS,
+    CHAT_HISTORY_MAX_RETRIES,
+)
+from libs.opensearch_client import opensearch
+
+##############################################
+# chat-history write-behind 버퍼
+# --------------------------------------------
+# - add(): 문서를 버퍼에 쌓기만 함 (네트워크 호출 없음)
+# - end_turn(): 한 턴이 끝났음을 알림
+#   * durability='sync' (기본값): 바로 _bulk 한 번으로 저장한 뒤 반환
+#   * durability='background': 백그라운드 스레드가 flush_interval 동안 더 모은 뒤
+#     _bulk 한 번으로 저장 (0이면 턴마다 바로 저장, 오래 떠 있는 서버에서는
+#     여러 턴을 한 번에 묶음). Lambda는 응답 후 프로세스를 멈추거나 종료하므로
+#     버퍼가 유실될 수 있음 -> 계속 떠 있는 서버에서만 사용
+# - 문서 id는 add() 시점에 정해지므로 재시도해도 중복 저장되지 않음
+##############################################
+
+class ChatHistoryWriter:
+    """Buffers chat-history documents and writes them with one _bulk request per flush"""
+
+    def __init__(
+        self,
+        index: str = 'chat-history',
+        durability: str = CHAT_HISTORY_DURABILITY,
+        flush_interval: float = CHAT_HISTORY_FLUSH_INTERVAL_SECONDS,
+        max_docs: int = CHAT_HISTORY_FLUSH_MAX_DOCS,
+        max_retries: int = CHAT_HISTORY_MAX_RETRIES,
+        client=opensearch,
+    ):
+        if durability not in ('sync', 'background'):
+            raise ValueError(f"Unknown chat history durability: {durability}")
+        self.index = index
+        self.durability = durability
+        self.flush_interval = flush_interval
+        self.max_docs = max_docs
+        self.max_retries = max_retries
+        self.client = client
+
+        self._buffer: List[Tuple[str, Dict, int]] = []  # (doc id, doc, attempts)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()  # 한 번에 하나의 _bulk만
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._listeners: List[Callable[[str, Dict], None]] = []
+
+        self.flushes = 0
+        self.flushed_docs = 0
+        self.failed_flushes = 0
+        self.dropped_docs = 0
+        self.max_flush_docs = 0
+        self.flush_seconds = 0.0
+        self.max_flush_seconds = 0.0
+
+    def subscribe(self, listener: Callable[[str, Dict], None]) -> None:
+        """Call listener(doc_id, doc) for every document added (e.g. to update a read cache)"""
+        self._listeners.append(listener)
+
+    def add(self, user_id: str, role: str, text: str, timestamp: Optional[str] = None) -> str:
+        """Queue one chat-history document; returns its id"""
+        doc_id = shortuuid.uuid()
+        doc = {
+            'user_id': user_id,
+            'message_id': doc_id,  # 같은 timestamp인 메시지의 정렬 순서 (search_after tiebreaker)
+            'role': role,
+            'text': text,
+            'timestamp': timestamp or dt.datetime.now().isoformat(),
+        }
+        with self._lock:
+            self._buffer.append((doc_id, doc, 0))
+            full = len(self._buffer) >= self.max_docs
+        for listener in self._listeners:
+            listener(doc_id, doc)
+        if full:
+            self._wakeup.set()
+        return doc_id
+
+    def pending(self, user_id: Optional[str] = None) -> List[Dict]:
+        """Documents not yet written (optionally for one user), oldest first"""
+        with self._lock:
+            return [doc for _, doc, _ in self._buffer if user_id is None or doc['user_id'] == user_id]
+
+    def end_turn(self) -> None:
+        """Called once per handled message, after its documents were added"""
+        if self.durability == 'sync':
+            self.flush()
+            return
+        self._ensure_thread()
+        self._wakeup.set()
+
+    def flush(self) -> int:
+        """Write everything buffered with one _bulk request; returns the number of documents written"""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._buffer = self._buffer, []
+            if not batch:
+                return 0
+
+            lines = []
+            for doc_id, doc, _ in batch:
+                lines.append({"index": {"_index": self.index, "_id": doc_id}})
+                lines.append(doc)
+
+            t0 = time.perf_counter()
+            failed = batch
+            try:
+                resp = self.client.post("_bulk", lines, ndjson=True)
+                if resp.status_code == 200:
+                    results = resp.json()
+                    if not results.get('errors'):
+                        failed = []
+                    else:
+                        failed = [entry for entry, item in zip(batch, results['items']) if 'error' in next(iter(item.values()))]
+                else:
+                    print(f"[ChatHistoryWriter] _bulk failed with {resp.status_code}: {resp.text[:200]}")
+            except Exception as e:
+                print(f"[ChatHistoryWriter] _bulk failed: {str(e)}")
+            elapsed = time.perf_counter() - t0
+
+            written = len(batch) - len(failed)
+            retry = [(doc_id, doc, attempts + 1) for doc_id, doc, attempts in failed if attempts < self.max_retries]
+            with self._lock:
+                self._buffer = retry + self._buffer  # 실패한 문서는 순서를 유지한 채 다음 flush에 다시 보냄
+                self.flushes += 1
+                self.flushed_docs += written
+                self.failed_flushes += int(bool(failed))
+                self.dropped_docs += len(failed) - len(retry)
+                self.max_flush_docs = max(self.max_flush_docs, len(batch))
+                self.flush_seconds += elapsed
+                self.max_flush_seconds = max(self.max_flush_seconds, elapsed)
+            print(f"[ChatHistoryWriter] Flushed {written}/{len(batch)} docs in {elapsed * 1000:.0f} ms")
+            return written
+
+    def _ensure_thread(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='chat-history-writer', daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            self._wakeup.wait()
+            # 잠깐 더 기다리며 다른 턴의 문서도 모음 (버퍼가 가득 차면 바로 저장)
+            deadline = time.monotonic() + self.flush_interval
+            while time.monotonic() < deadline and len(self._buffer) < self.max_docs:
+                time.sleep(min(0.05, max(deadline - time.monotonic(), 0)))
+            self._wakeup.clear()
+            self.flush()
+            if self._buffer and not self._wakeup.is_set():
+                # 재시도할 문서가 남았으면 잠시 후 다시 시도
+                time.sleep(min(self.flush_interval or 1.0, 5.0))
+                self._wakeup.set()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'pending': len(self._buffer),
+                'flushes': self.flushes,
+                'flushed_docs': self.flushed_docs,
+                'avg_flush_docs': self.flushed_docs / self.flushes if self.flushes else 0.0,
+                'max_flush_docs': self.max_flush_docs,
+                'avg_flush_ms': self.flush_seconds / self.flushes * 1000 if self.flushes else 0.0,
+                'max_flush_ms': self.max_flush_seconds * 1000,
+                'failed_flushes': self.failed_flushes,
+                'dropped_docs': self.dropped_docs,
+            }
+
+# Singleton instance shared by the Kakao callbacks
+chat_history_writer = ChatHistoryWriter()
+atexit.register(chat_history_writer.flush)
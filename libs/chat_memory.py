@@ -0,0 +1,101 @@
+from typing import Callable, Dict, List, Optional, Tuple
+from collections import OrderedDict
+import threading
+
+from config import CHAT_MEMORY_TOKEN_BUDGET, CHAT_MEMORY_MAX_USERS, CHAT_MEMORY_MAX_MESSAGE_TOKENS
+from libs.token_budget import estimate_tokens, pack_newest_first, truncate_to_tokens
+
+# summarize(previous_summary, evicted_chats) -> new summary
+Summarizer = Callable[[str, List[Dict]], str]
+
+class ChatMemoryStore:
+    """
+    Per-user conversation memory for the chat chain.
+
+    Each turn keeps only the newest chat-history messages that fit the token
+    budget (sliding window); a single long message is cut to
+    `max_message_tokens` so it can't crowd out the rest of the window. Older
+    messages are optionally folded into a rolling per-user summary, so they are
+    summarized once instead of being resent every turn. At most `max_users`
+    users are kept; the least recently active is evicted first, which bounds
+    the memory used by a warm container.
+    """
+
+    def __init__(
+        self,
+        token_budget: int = CHAT_MEMORY_TOKEN_BUDGET,
+        max_users: int = CHAT_MEMORY_MAX_USERS,
+        summarize: Optional[Summarizer] = None,
+        max_message_tokens: int = CHAT_MEMORY_MAX_MESSAGE_TOKENS,
+    ):
+        self.token_budget = token_budget
+        self.max_users = max_users
+        self.max_message_tokens = max_message_tokens
+        self.summarize = summarize
+        self._users: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Prompt size metrics
+        self.turns = 0
+        self.total_prompt_tokens = 0
+        self.max_prompt_tokens = 0
+
+    def _state(self, user_id: str) -> Dict:
+        state = self._users.get(user_id)
+        if state is None:
+            state = {'summary': '', 'summarized_until': ''}
+            self._users[user_id] = state
+        self._users.move_to_end(user_id)
+        while len(self._users) > self.max_users:
+            self._users.popitem(last=False)
+        return state
+
+    def select_window(self, user_id: str, chat_history: List[Dict]) -> Tuple[List[Dict], str]:
+        """Return (newest chats that fit the budget, rolling summary of older chats)"""
+        with self._lock:
+            state = dict(self._state(user_id))
+
+        budget = self.token_budget - estimate_tokens(state['summary'])
+        texts = [truncate_to_tokens(chat['text'], self.max_message_tokens) for chat in chat_history]
+        start = pack_newest_first(texts, budget)
+        window = [
+            chat if text is chat['text'] else dict(chat, text=text)
+            for chat, text in zip(chat_history[start:], texts[start:])
+        ]
+
+        if self.summarize is not None:
+            # Only chats that haven't been folded into the summary yet
+            evicted = [
+                chat for chat in chat_history[:start]
+                if chat.get('timestamp', '') > state['summarized_until']
+            ]
+            if evicted:
+                state['summary'] = self.summarize(state['summary'], evicted)
+                state['summarized_until'] = max(chat.get('timestamp', '') for chat in evicted)
+                with self._lock:
+                    self._state(user_id).update(state)
+
+        return window, state['summary']
+
+    def record_prompt(self, user_id: str, history_tokens: int, message_count: int) -> None:
+        """Log the history size sent with one chat turn"""
+        with self._lock:
+            self.turns += 1
+            self.total_prompt_tokens += history_tokens
+            self.max_prompt_tokens = max(self.max_prompt_tokens, history_tokens)
+        print(f"[Chat Memory] User ID: {user_id} history messages: {message_count} history tokens: {history_tokens}")
+
+    def clear(self, user_id: Optional[str] = None) -> None:
+        with self._lock:
+            if user_id is None:
+                self._users.clear()
+            else:
+                self._users.pop(user_id, None)
+
+    def stats(self) -> Dict:
+        return {
+            'users': len(self._users),
+            'turns': self.turns,
+            'avg_prompt_tokens': self.total_prompt_tokens / self.turns if self.turns else 0.0,
+            'max_prompt_tokens': self.max_prompt_tokens,
+        }
@@ -0,0 +1,150 @@
+from typing import Dict, List, Optional
+from collections import OrderedDict
+import hashlib
+import threading
+import time
+
+import numpy as np
+
+from config import (
+    EMBEDDING_MODEL_NAME,
+    EMBEDDING_DIMENSIONS,
+    EMBEDDING_CACHE_MAX_ENTRIES,
+    EMBEDDING_CACHE_DISK_PATH,
+    EMBEDDING_CACHE_DISK_MAX_ENTRIES,
+)
+from libs.openai_client import get_openai_client
+from libs.sqlite_kv import SQLiteKV
+from libs.translation_cache import normalize_text
+
+def reduce_dimensions(vectors: np.ndarray, dimensions: int) -> np.ndarray:
+    """
+    Shorten text-embedding-3 vectors (1-D or rows of a 2-D array) to their first
+    `dimensions` components and L2-renormalize. This matches what the API returns
+    for the same text with the `dimensions` parameter, so stored full-size vectors
+    can be migrated without re-embedding.
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)[..., :dimensions]
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+class EmbeddingService:
+    """
+    Query embeddings with a shared OpenAI client and a two-level cache.
+
+    Vectors are keyed by (model, dimensions, normalized text) and kept as
+    float32 arrays: an in-process LRU, plus an optional SQLite store of raw
+    float32 bytes (under /tmp on Lambda) that survives warm container reuse.
+    """
+
+    def __init__(
+        self,
+        model: str = EMBEDDING_MODEL_NAME,
+        dimensions: Optional[int] = EMBEDDING_DIMENSIONS,
+        max_entries: int = EMBEDDING_CACHE_MAX_ENTRIES,
+        disk_path: Optional[str] = EMBEDDING_CACHE_DISK_PATH,
+        disk_max_entries: int = EMBEDDING_CACHE_DISK_MAX_ENTRIES,
+        client=None,
+    ):
+        self.model = model
+        self.dimensions = dimensions
+        self.max_entries = max_entries
+        self.disk_max_entries = disk_max_entries
+        self._client = client
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk: Optional[SQLiteKV] = None
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.api_calls = 0
+        self.api_seconds = 0.0
+
+        if disk_path:
+            disk = SQLiteKV(disk_path, 'embedding_cache', f"{model}:{dimensions}", disk_max_entries, log_name='EmbeddingService')
+            self._disk = disk if disk.available else None
+
+    @property
+    def client(self):
+        return self._client or get_openai_client()
+
+    def _key(self, text: str) -> str:
+        raw = f"{self.model}\x00{self.dimensions}\x00{normalize_text(text)}"
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def _lookup(self, key: str) -> Optional[np.ndarray]:
+        vector = self._memory.get(key)
+        if vector is not None:
+            self._memory.move_to_end(key)
+            self.memory_hits += 1
+            return vector
+        row = self._disk.get(key) if self._disk is not None else None
+        if row is not None:
+            vector = np.frombuffer(row[0], dtype=np.float32)
+            self._remember(key, vector)
+            self.disk_hits += 1
+            return vector
+        return None
+
+    def _remember(self, key: str, vector: np.ndarray) -> None:
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _request(self, texts: List[str]) -> List[np.ndarray]:
+        kwargs = {'model': self.model, 'input': texts}
+        if self.dimensions:
+            kwargs['dimensions'] = self.dimensions
+        t0 = time.perf_counter()
+        resp = self.client.embeddings.create(**kwargs)
+        with self._lock:
+            self.api_calls += 1
+            self.api_seconds += time.perf_counter() - t0
+        return [np.asarray(item.embedding, dtype=np.float32) for item in resp.data]
+
+    def embed_many(self, texts: List[str]) -> List[np.ndarray]:
+        """Embed texts in input order; cache misses go to the API in one request"""
+        keys = [self._key(text) for text in texts]
+        vectors: List[Optional[np.ndarray]] = [None] * len(texts)
+        missing: Dict[str, List[int]] = {}
+
+        with self._lock:
+            for i, key in enumerate(keys):
+                vectors[i] = self._lookup(key)
+                if vectors[i] is None:
+                    missing.setdefault(key, []).append(i)
+            self.misses += len(missing)
+
+        if missing:
+            first = [indices[0] for indices in missing.values()]
+            fetched = self._request([texts[i] for i in first])
+            with self._lock:
+                for key, vector in zip(missing, fetched):
+                    self._remember(key, vector)
+                    for i in missing[key]:
+                        vectors[i] = vector
+                if self._disk is not None:
+                    self._disk.put_many([(key, vector.tobytes()) for key, vector in zip(missing, fetched)])
+        return vectors
+
+    def embed(self, text: str) -> np.ndarray:
+        """Embed one query text"""
+        return self.embed_many([text])[0]
+
+    def stats(self) -> Dict:
+        hits = self.memory_hits + self.disk_hits
+        total = hits + self.misses
+        return {
+            'memory_hits': self.memory_hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'hit_rate': hits / total if total else 0.0,
+            'api_calls': self.api_calls,
+            'avg_api_latency_ms': self.api_seconds / self.api_calls * 1000 if self.api_calls else 0.0,
+        }
+
+# Singleton instance shared by news_search
+embedding_service = EmbeddingService()
@@ -0,0 +1,153 @@
+from typing import Dict, List, Optional
+import copy
+import json
+from pathlib import Path
+
+from config import EMBEDDING_DIMENSIONS
+from libs.opensearch_client import opensearch
+
+##############################################
+# 인덱스 스키마 관리
+# --------------------------------------------
+# - schema/<이름>.json 하나가 코드에서 쓰는 인덱스 이름(alias) 하나
+# - 실제 인덱스는 <이름>-v<schema_version>, 코드는 항상 alias로 읽고 씀
+# - 같은 버전이 이미 적용되어 있으면 아무것도 하지 않음 (여러 번 실행해도 안전)
+# - 버전이 오르면 새 인덱스를 만들고 _reindex 후 alias를 한 번의 _aliases 호출로 옮김
+# - _reindex는 _source를 복사하므로 _source에서 빠진 필드(embedding 등)가 있는 인덱스는
+#   reindex하지 않고 새 인덱스로 다시 적재(ingestion)해야 함
+# - _meta.reindex_script(painless)가 있으면 _reindex 중에 문서를 정리 (예: schedule.time 앞뒤 공백)
+##############################################
+
+SCHEMA_DIR = Path(__file__).resolve().parent.parent / 'schema'
+
+def load_schemas(schema_dir: Path = SCHEMA_DIR, dimensions: Optional[int] = EMBEDDING_DIMENSIONS) -> Dict[str, Dict]:
+    """{alias: index body} for every schema/*.json; knn_vector dimensions follow EMBEDDING_DIMENSIONS when set"""
+    schemas = {}
+    for path in sorted(Path(schema_dir).glob('*.json')):
+        body = json.loads(path.read_text(encoding='utf-8'))
+        for field in body['mappings'].get('properties', {}).values():
+            if field.get('type') == 'knn_vector' and dimensions:
+                field['dimension'] = dimensions
+        schemas[path.stem] = body
+    return schemas
+
+def schema_version(body: Dict) -> int:
+    return int(body['mappings'].get('_meta', {}).get('schema_version', 0))
+
+class SchemaManager:
+    """
+    Applies schema/*.json to OpenSearch. Each alias moves through three states:
+    missing -> created (<alias>-v1 + alias), alias on an older version ->
+    reindexed into the new version, and a legacy concrete index named like the
+    alias -> reindexed and replaced by the alias (only with migrate_existing,
+    since the old index is deleted in the same _aliases call).
+    """
+
+    def __init__(self, client=opensearch, schemas: Optional[Dict[str, Dict]] = None):
+        self.client = client
+        self.schemas = schemas if schemas is not None else load_schemas()
+
+    def _json(self, method: str, path: str, body=None, ok=(200,)):
+        resp = self.client.request(method, path, body)
+        if resp.status_code not in ok:
+            raise RuntimeError(f"{method} {path} failed: {resp.status_code} {resp.text[:500]}")
+        return resp.json() if resp.content else {}
+
+    def alias_targets(self, alias: str) -> List[str]:
+        resp = self.client.get(f"_alias/{alias}")
+        return sorted(resp.json()) if resp.status_code == 200 else []
+
+    def exists(self, name: str) -> bool:
+        return self.client.request('HEAD', name).status_code == 200
+
+    def mapping(self, index: str) -> Dict:
+        return next(iter(self._json('GET', f"{index}/_mapping").values()))['mappings']
+
+    def current_version(self, index: str) -> int:
+        return int(self.mapping(index).get('_meta', {}).get('schema_version', 0))
+
+    def dropped_source_fields(self, index: str) -> List[str]:
+        """Fields missing from index's _source, which _reindex can't copy ('*' when _source is disabled)"""
+        source = self.mapping(index).get('_source', {})
+        if source.get('enabled') is False:
+            return ['*']
+        return list(source.get('excludes', []))
+
+    def status(self) -> List[Dict]:
+        rows = []
+        for alias, body in self.schemas.items():
+            targets = self.alias_targets(alias)
+            if targets:
+                state, index = 'alias', targets[0]
+            elif self.exists(alias):
+                state, index = 'legacy index', alias
+            else:
+                state, index = 'missing', None
+            rows.append({
+                'alias': alias,
+                'state': state,
+                'index': index,
+                'version': self.current_version(index) if index else None,
+                'wanted': schema_version(body),
+                'docs': self._json('GET', f"{index}/_count")['count'] if index else None,
+            })
+        return rows
+
+    def plan(self, alias: str, migrate_existing: bool = False) -> Dict:
+        """What apply() would do for alias, without changing anything"""
+        step = self._plan(alias, migrate_existing)
+        if step['action'] == 'reindex':
+            dropped = self.dropped_source_fields(step['source'])
+            if dropped:
+                return {'action': 'skip', 'reason': f"{step['source']} excludes {', '.join(dropped)} from _source, so _reindex "
+                                                    f"would drop them; re-ingest into {step['target']} instead"}
+        return step
+
+    def _plan(self, alias: str, migrate_existing: bool) -> Dict:
+        version = schema_version(self.schemas[alias])
+        target = f"{alias}-v{version}"
+        targets = self.alias_targets(alias)
+        if targets:
+            if targets == [target] or self.current_version(targets[0]) >= version:
+                return {'action': 'up to date', 'target': targets[0]}
+            return {'action': 'reindex', 'source': targets[0], 'target': target, 'replace': 'alias'}
+        if self.exists(alias):
+            if not migrate_existing:
+                return {'action': 'skip', 'reason': f"'{alias}' is a concrete index; rerun with --migrate-existing "
+                                                    f"to reindex it into {target} and replace it with an alias"}
+            return {'action': 'reindex', 'source': alias, 'target': target, 'replace': 'index'}
+        return {'action': 'create', 'target': target}
+
+    def apply(self, alias: str, migrate_existing: bool = False, dry_run: bool = False) -> Dict:
+        step = self.plan(alias, migrate_existing)
+        print(f"[Schema] {alias}: {step}")
+        if dry_run or step['action'] in ('up to date', 'skip'):
+            return step
+
+        target = step['target']
+        if not self.exists(target):
+            self._json('PUT', target, copy.deepcopy(self.schemas[alias]))
+
+        if step['action'] == 'create':
+            self._json('POST', "_aliases", {"actions": [{"add": {"index": target, "alias": alias}}]})
+            return step
+
+        reindex = {"source": {"index": step['source']}, "dest": {"index": target}}
+        script = self.schemas[alias]['mappings'].get('_meta', {}).get('reindex_script')
+        if script:
+            reindex["script"] = {"source": script, "lang": "painless"}
+        result = self._json('POST', "_reindex?refresh=true", reindex)
+        if result.get('failures'):
+            raise RuntimeError(f"reindex {step['source']} -> {target} failed: {result['failures'][:3]}")
+        step['docs'] = result.get('total', 0)
+
+        if step['replace'] == 'index':
+            # 기존 인덱스 삭제와 alias 추가를 한 번에 -> 이름이 비는 순간이 없음
+            actions = [{"remove_index": {"index": alias}}, {"add": {"index": target, "alias": alias}}]
+        else:
+            actions = [{"remove": {"index": step['source'], "alias": alias}}, {"add": {"index": target, "alias": alias}}]
+        self._json('POST', "_aliases", {"actions": actions})
+        return step
+
+    def apply_all(self, aliases: Optional[List[str]] = None, migrate_existing: bool = False, dry_run: bool = False) -> Dict[str, Dict]:
+        return {alias: self.apply(alias, migrate_existing, dry_run) for alias in (aliases or list(self.schemas))}
@@ -0,0 +1,293 @@
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import json
+import os
+import threading
+import time
+
+import requests
+
+from config import (
+    OPENSEARCH_URL,
+    OPENSEARCH_AUTH,
+    EMBEDDING_MODEL_NAME,
+    EMBEDDING_DIMENSIONS,
+    INGEST_EMBED_BATCH_SIZE,
+    INGEST_EMBED_MAX_CHARS,
+    INGEST_BULK_MAX_BYTES,
+    INGEST_MAX_IN_FLIGHT,
+    INGEST_MAX_RETRIES,
+    INGEST_BULK_TIMEOUT,
+    OPENSEARCH_CONNECT_TIMEOUT,
+)
+from libs.openai_client import get_openai_client
+
+##############################################
+# JSONL -> embeddings -> OpenSearch _bulk
+# --------------------------------------------
+# - 입력을 한 줄씩 읽어 INGEST_EMBED_BATCH_SIZE개씩 묶음
+# - 묶음마다 embeddings.create 한 번, _bulk는 INGEST_BULK_MAX_BYTES 단위로 나눠 전송
+# - 동시에 처리 중인 묶음은 INGEST_MAX_IN_FLIGHT개로 제한 (읽기가 앞서 나가지 않음)
+# - 체크포인트에는 앞에서부터 빠짐없이 처리된 입력 줄 수를 기록 -> 중단 후 이어서 실행
+# - 429가 아닌 이유로 거절된 문서(매핑 오류 등)는 다시 보내도 실패하므로 체크포인트는
+#   그대로 전진하고, 대신 dead-letter 파일(기본: <checkpoint>.failed.jsonl)에 원래 문서를
+#   한 줄씩 남김 -> 원인을 고친 뒤 그 파일을 다시 ingest하면 됨
+##############################################
+
+def chunk_bulk_lines(pairs: Sequence[Tuple[bytes, bytes]], max_bytes: int) -> Iterator[List[Tuple[bytes, bytes]]]:
+    """Split (action, source) NDJSON line pairs into chunks whose body stays under max_bytes"""
+    chunk, size = [], 0
+    for pair in pairs:
+        pair_size = len(pair[0]) + len(pair[1]) + 2
+        if chunk and size + pair_size > max_bytes:
+            yield chunk
+            chunk, size = [], 0
+        chunk.append(pair)
+        size += pair_size
+    if chunk:
+        yield chunk
+
+class BulkIngester:
+    """
+    Streams articles from a JSONL file into an OpenSearch index with an `embed`
+    vector per document. Document ids come from `id_field` (or a hash of the line),
+    so re-running over the same input overwrites instead of duplicating.
+    """
+
+    def __init__(
+        self,
+        index: str,
+        text_fields: Sequence[str] = ('title', 'content'),
+        id_field: str = 'id',
+        embed_batch_size: int = INGEST_EMBED_BATCH_SIZE,
+        embed_max_chars: int = INGEST_EMBED_MAX_CHARS,
+        bulk_max_bytes: int = INGEST_BULK_MAX_BYTES,
+        max_in_flight: int = INGEST_MAX_IN_FLIGHT,
+        max_retries: int = INGEST_MAX_RETRIES,
+        checkpoint_path: Optional[str] = None,
+        dead_letter_path: Optional[str] = None,
+        model: str = EMBEDDING_MODEL_NAME,
+        dimensions: Optional[int] = EMBEDDING_DIMENSIONS,
+        opensearch_url: str = OPENSEARCH_URL,
+        client=None,
+        session: Optional[requests.Session] = None,
+    ):
+        self.index = index
+        self.text_fields = list(text_fields)
+        self.id_field = id_field
+        self.embed_batch_size = embed_batch_size
+        self.embed_max_chars = embed_max_chars
+        self.bulk_max_bytes = bulk_max_bytes
+        self.max_in_flight = max_in_flight
+        self.max_retries = max_retries
+        self.checkpoint_path = checkpoint_path
+        self.dead_letter_path = dead_letter_path or (checkpoint_path + '.failed.jsonl' if checkpoint_path else None)
+        self.model = model
+        self.dimensions = dimensions
+        self.opensearch_url = opensearch_url
+        self._client = client
+        self.session = session or requests.Session()  # 긴 실행에서 연결 재사용
+
+        self._lock = threading.Lock()
+        self._done: Dict[int, int] = {}  # 완료된 묶음 번호 -> 그 묶음의 마지막 줄 번호
+        self._next_seq = 0
+        self._error: Optional[BaseException] = None
+        self.reset_stats()
+
+    @property
+    def client(self):
+        return self._client or get_openai_client()
+
+    def reset_stats(self) -> None:
+        self.committed_lines = 0
+        self.docs = 0
+        self.skipped = 0
+        self.failed = 0
+        self.embed_calls = 0
+        self.embed_seconds = 0.0
+        self.bulk_requests = 0
+        self.bulk_bytes = 0
+        self.bulk_seconds = 0.0
+        self.retries = 0
+        self.elapsed = 0.0
+
+    # ---------- checkpoint ----------
+    def load_checkpoint(self) -> int:
+        """Input lines already ingested (0 without a checkpoint)"""
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return 0
+        with open(self.checkpoint_path, encoding='utf-8') as f:
+            return json.load(f)['lines']
+
+    def _save_checkpoint(self) -> None:
+        if not self.checkpoint_path:
+            return
+        tmp = self.checkpoint_path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'index': self.index, 'lines': self.committed_lines, 'updated_at': time.time()}, f)
+        os.replace(tmp, self.checkpoint_path)  # 중간에 죽어도 체크포인트가 깨지지 않도록 교체
+
+    def _dead_letter(self, action: bytes, source: bytes) -> None:
+        """Append a rejected document (without its vector) as a JSONL line that can be ingested again"""
+        if not self.dead_letter_path:
+            return
+        article = json.loads(source)
+        article.pop('embed', None)
+        article.setdefault(self.id_field, json.loads(action)['index']['_id'])  # 다시 넣어도 같은 _id
+        with open(self.dead_letter_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(article, ensure_ascii=False) + "\n")
+
+    # ---------- reading ----------
+    def _batches(self, lines: Iterable[str], start: int) -> Iterator[Tuple[int, List[Tuple[str, Dict, str]]]]:
+        """Yield (last line number, [(doc id, article, text)]) per embedding batch, skipping `start` lines"""
+        batch, line_no = [], start
+        for line_no, line in enumerate(lines, start=1):
+            if line_no <= start or not line.strip():
+                continue
+            article = json.loads(line)
+            text = "\n".join(str(article.get(field) or '') for field in self.text_fields).strip()
+            if not text:
+                with self._lock:
+                    self.skipped += 1
+                continue
+            doc_id = article.get(self.id_field) or hashlib.sha1(line.strip().encode('utf-8')).hexdigest()
+            batch.append((str(doc_id), article, text[:self.embed_max_chars]))
+            if len(batch) >= self.embed_batch_size:
+                yield line_no, batch
+                batch = []
+        if batch or line_no > start:
+            yield line_no, batch
+
+    # ---------- embedding ----------
+    def _embed(self, texts: List[str]) -> List[List[float]]:
+        kwargs = {'model': self.model, 'input': texts}
+        if self.dimensions:
+            kwargs['dimensions'] = self.dimensions
+        t0 = time.perf_counter()
+        resp = self.client.embeddings.create(**kwargs)  # 재시도는 OpenAI 클라이언트가 처리
+        with self._lock:
+            self.embed_calls += 1
+            self.embed_seconds += time.perf_counter() - t0
+        return [item.embedding for item in sorted(resp.data, key=lambda item: item.index)]
+
+    # ---------- writing ----------
+    def _bulk(self, pairs: List[Tuple[bytes, bytes]]) -> None:
+        for attempt in range(self.max_retries + 1):
+            body = b"".join(action + b"\n" + source + b"\n" for action, source in pairs)
+            t0 = time.perf_counter()
+            resp = self.session.post(
+                url = f"{self.opensearch_url}/_bulk",
+                data = body,
+                headers = {"Content-Type": "application/x-ndjson"},
+                auth = OPENSEARCH_AUTH,
+                timeout = (OPENSEARCH_CONNECT_TIMEOUT, INGEST_BULK_TIMEOUT),
+            )
+            with self._lock:
+                self.bulk_requests += 1
+                self.bulk_bytes += len(body)
+                self.bulk_seconds += time.perf_counter() - t0
+
+            if resp.status_code == 429 or resp.status_code >= 500:
+                retry = pairs
+            elif resp.status_code != 200:
+                raise RuntimeError(f"_bulk failed with {resp.status_code}: {resp.text[:500]}")
+            else:
+                results = resp.json()
+                retry, failed = [], []
+                for pair, item in zip(pairs, results['items']):
+                    status = next(iter(item.values()))
+                    if status.get('status') == 429:  # 큐가 가득 찬 경우만 다시 보냄
+                        retry.append(pair)
+                    elif 'error' in status:
+                        failed.append(pair)
+                        print(f"[Ingest] Failed to index {status.get('_id')}: {status['error']}")
+                with self._lock:
+                    self.docs += len(pairs) - len(retry) - len(failed)
+                    self.failed += len(failed)
+                    for action, source in failed:
+                        self._dead_letter(action, source)
+            if not retry:
+                return
+            pairs = retry
+            with self._lock:
+                self.retries += 1
+            time.sleep(min(2 ** attempt * 0.5, 10))
+        raise RuntimeError(f"_bulk still rejected {len(pairs)} documents after {self.max_retries} retries")
+
+    def _process(self, batch: List[Tuple[str, Dict, str]]) -> None:
+        if not batch:
+            return
+        vectors = self._embed([text for _, _, text in batch])
+        pairs = [
+            (
+                json.dumps({"index": {"_index": self.index, "_id": doc_id}}).encode('utf-8'),
+                json.dumps(dict(article, embed=vector), ensure_ascii=False).encode('utf-8'),
+            )
+            for (doc_id, article, _), vector in zip(batch, vectors)
+        ]
+        for chunk in chunk_bulk_lines(pairs, self.bulk_max_bytes):
+            self._bulk(chunk)
+
+    def _finish(self, seq: int, last_line: int, future, slots: threading.Semaphore) -> None:
+        slots.release()
+        error = future.exception()
+        with self._lock:
+            if error is not None:
+                self._error = self._error or error
+                return
+            # 앞 묶음이 모두 끝났을 때만 체크포인트를 전진 (뒤 묶음이 먼저 끝나도 유실 없음)
+            self._done[seq] = last_line
+            advanced = False
+            while self._next_seq in self._done and self._error is None:
+                self.committed_lines = self._done.pop(self._next_seq)
+                self._next_seq += 1
+                advanced = True
+            if advanced:
+                self._save_checkpoint()
+
+    def ingest(self, lines: Iterable[str]) -> Dict:
+        """Ingest JSONL lines, resuming after the checkpoint; returns stats()"""
+        self.reset_stats()
+        self._done, self._next_seq, self._error = {}, 0, None
+        start = self.committed_lines = self.load_checkpoint()
+        if start:
+            print(f"[Ingest] Resuming after line {start}")
+
+        slots = threading.Semaphore(self.max_in_flight)
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.max_in_flight) as pool:
+            for seq, (last_line, batch) in enumerate(self._batches(lines, start)):
+                slots.acquire()
+                if self._error is not None:
+                    slots.release()
+                    break
+                future = pool.submit(self._process, batch)
+                future.add_done_callback(lambda f, seq=seq, last_line=last_line: self._finish(seq, last_line, f, slots))
+        self.elapsed = time.perf_counter() - t0
+
+        if self._error is not None:
+            print(f"[Ingest] Stopped; checkpoint at line {self.committed_lines}")
+            raise self._error
+        return self.stats()
+
+    def ingest_file(self, path: str) -> Dict:
+        with open(path, encoding='utf-8') as f:
+            return self.ingest(f)
+
+    def stats(self) -> Dict:
+        return {
+            'docs': self.docs,
+            'skipped': self.skipped,
+            'failed': self.failed,
+            'dead_letter_path': self.dead_letter_path if self.failed else None,
+            'committed_lines': self.committed_lines,
+            'docs_per_sec': self.docs / self.elapsed if self.elapsed else 0.0,
+            'embed_calls': self.embed_calls,
+            'avg_embed_latency_ms': self.embed_seconds / self.embed_calls * 1000 if self.embed_calls else 0.0,
+            'bulk_requests': self.bulk_requests,
+            'bulk_mb': self.bulk_bytes / 2**20,
+            'avg_bulk_latency_ms': self.bulk_seconds / self.bulk_requests * 1000 if self.bulk_requests else 0.0,
+            'retries': self.retries,
+            'elapsed_s': self.elapsed,
+        }
@@ -0,0 +1,160 @@
+from typing import Callable, Dict, List, Optional, Tuple
+import datetime as dt
+import re
+import zlib
+
+import numpy as np
+
+from config import INTENT_FAST_PATH_MIN_MARGIN
+from libs.schedule_parser import SAVE_PATTERN, parse_date, parse_range, parse_time
+
+##############################################
+# Local first-stage intent classifier
+# --------------------------------------------
+# 1) keyword/regex rules (news, schedule, photo); ambiguous words need a cue
+# 2) nearest-centroid over hashed character n-grams of labeled examples
+# Anything it isn't confident about returns None and goes to intent_chain.
+##############################################
+
+INTENT_EXAMPLES: Dict[str, List[str]] = {
+    'chat': [
+        "안녕하세요", "안녕", "반가워", "너는 누구니?", "이름이 뭐야?", "고마워",
+        "오늘 기분이 어때?", "심심해", "재미있는 얘기 해줘", "배고파", "점심 메뉴 추천해줘",
+        "오늘 날씨 어때?", "잘 자", "뭐 하고 있어?", "hello", "how are you?", "who are you?",
+        "thank you", "tell me a joke",
+    ],
+    'schedule': [
+        "내일 일정 알려줘", "오늘 일정 뭐야?", "다음 주 화요일 오후 3시에 회의 있어",
+        "모레 치과 예약 기억해줘", "금요일 저녁 7시에 약속 잡아줘", "이번 주 스케줄 보여줘",
+        "내일 오전 10시 미팅 저장해줘", "약속 언제였지?", "show tomorrow's schedule",
+        "add a meeting tomorrow at 3pm",
+    ],
+    'photo': [
+        "어제 찍은 사진 보여줘", "오늘 올린 사진 보여줘", "사진 저장해줘", "이 사진 올려줘",
+        "지난주 사진 찾아줘", "show yesterday's photos", "show me my pictures",
+    ],
+    'news': [
+        "환율 뉴스", "오늘 뉴스 알려줘", "주식 시장 뉴스 찾아줘", "금리 관련 기사 보여줘",
+        "최신 경제 뉴스", "부동산 기사 찾아줘", "show today's news", "find stock market news",
+    ],
+}
+
+# Rules are checked in order; an utterance matching rules of two intents is ambiguous
+INTENT_RULES: List[Tuple[str, re.Pattern]] = [
+    ('news', re.compile(r'뉴스|헤드라인|\bnews\b|\bheadlines?\b', re.IGNORECASE)),
+    ('schedule', re.compile(r'일정|스케줄|\bschedule\b|\bappointment\b|\bcalendar\b', re.IGNORECASE)),
+    ('photo', re.compile(r'사진|이미지|\bphotos?\b|\bpictures?\b|\bimages?\b', re.IGNORECASE)),
+]
+
+# Words that are also common in chat ("택시 기사님", "식당 예약하는 법", "회의하기 싫다").
+# They count as a rule hit only together with a cue; a bare hit leaves the decision to the LLM
+WEAK_INTENT_RULES: List[Tuple[str, re.Pattern, Callable[[str], bool]]] = [
+    ('news', re.compile(r'기사(?!님)'),
+     lambda text: re.search(r'관련|최신|요즘|오늘|검색|찾아|보여|알려|요약', text) is not None),
+    ('schedule', re.compile(r'약속|예약|미팅|회의'),
+     lambda text: has_schedule_cue(text)),
+]
+
+# Asking about or recording a schedule ("회의 있어?", "예약 기억해줘"), not just mentioning one
+SCHEDULE_ACTION = re.compile(r'언제|몇\s*시|있어|있나|있니|있지|알려|확인|보여|' + SAVE_PATTERN.pattern)
+
+# Relative days that can be resolved without the LLM
+RELATIVE_DAYS = [
+    (re.compile(r'그저께|그제'), -2),
+    (re.compile(r'어제|\byesterday\b', re.IGNORECASE), -1),
+    (re.compile(r'오늘|\btoday\b', re.IGNORECASE), 0),
+    (re.compile(r'내일|\btomorrow\b', re.IGNORECASE), 1),
+    (re.compile(r'모레'), 2),
+]
+
+PHOTO_LOOKUP_PATTERN = re.compile(r'보여|찾아|보자|볼래|\bshow\b|\bfind\b', re.IGNORECASE)
+
+def has_schedule_cue(text: str, today: Optional[dt.date] = None) -> bool:
+    """A clock time (오후 3시), or a date/range (내일, 다음 주) together with a schedule action"""
+    if parse_time(text) is not None:
+        return True
+    today = today or dt.date.today()
+    has_date = parse_date(text, today) is not None or parse_range(text, today) is not None
+    return has_date and SCHEDULE_ACTION.search(text) is not None
+
+def extract_relative_date(utterance: str, today: Optional[dt.date] = None) -> Optional[str]:
+    """Resolve 오늘/내일/어제-style words to YYYY-MM-DD"""
+    today = today or dt.date.today()
+    for pattern, offset in RELATIVE_DAYS:
+        if pattern.search(utterance):
+            return (today + dt.timedelta(days=offset)).isoformat()
+    return None
+
+class IntentClassifier:
+    def __init__(
+        self,
+        examples: Dict[str, List[str]] = INTENT_EXAMPLES,
+        dim: int = 4096,
+        min_margin: float = INTENT_FAST_PATH_MIN_MARGIN,
+    ):
+        self.dim = dim
+        self.min_margin = min_margin
+        self.labels = list(examples)
+        # Example embeddings are computed once and kept as one centroid per intent
+        centroids = np.stack([
+            np.mean([self.embed(text) for text in examples[label]], axis=0)
+            for label in self.labels
+        ])
+        self.centroids = centroids / np.linalg.norm(centroids, axis=1, keepdims=True)
+
+    def embed(self, text: str) -> np.ndarray:
+        """L2-normalized bag of hashed character 1-3 grams"""
+        text = ' ' + re.sub(r'[^\w\s]', '', text.lower()).strip() + ' '
+        vec = np.zeros(self.dim, dtype=np.float32)
+        for n in (1, 2, 3):
+            for i in range(len(text) - n + 1):
+                # crc32 is stable across processes, unlike hash()
+                vec[zlib.crc32(text[i:i + n].encode('utf-8')) % self.dim] += 1.0
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else vec
+
+    def classify(self, utterance: str) -> Tuple[str, float, str]:
+        """Return (intent, confidence, source) where source is 'rule', 'keyword' or 'centroid'"""
+        matched = [intent for intent, pattern in INTENT_RULES if pattern.search(utterance)]
+        weak = [(intent, cue(utterance)) for intent, pattern, cue in WEAK_INTENT_RULES if pattern.search(utterance)]
+        matched = list(dict.fromkeys(matched + [intent for intent, has_cue in weak if has_cue]))
+        if len(matched) == 1:
+            return matched[0], 1.0, 'rule'
+        if not matched and weak:
+            # Only an ambiguous word without a cue: never confident
+            return weak[0][0], 0.0, 'keyword'
+
+        scores = self.centroids @ self.embed(utterance)
+        top, second = np.argsort(scores)[::-1][:2]
+        margin = float(scores[top] - scores[second])
+        if matched:
+            # Several rules fired; never confident
+            return self.labels[top], 0.0, 'centroid'
+        return self.labels[top], margin, 'centroid'
+
+    def predict(self, utterance: str, today: Optional[dt.date] = None) -> Optional[Tuple[str, Dict]]:
+        """
+        Return (intent, params) when the utterance can be handled without the LLM,
+        otherwise None.
+        """
+        intent, confidence, source = self.classify(utterance)
+        if confidence < self.min_margin:
+            return None
+
+        date = extract_relative_date(utterance, today)
+        if intent == 'photo':
+            # Uploads need photo_url/description from the LLM; only dated lookups are local
+            if not PHOTO_LOOKUP_PATTERN.search(utterance):
+                return None
+            if date is not None:
+                return intent, {'photo_date': date}
+            span = parse_range(utterance, today or dt.date.today())  # 이번 주, 지난달, 주말 ...
+            if span is None:
+                return None
+            return intent, {'photo_date': span[0].isoformat(), 'photo_end_date': span[1].isoformat()}
+        if intent == 'schedule':
+            return intent, {'date': date} if date else {}
+        return intent, {}
+
+# Singleton instance
+intent_classifier = IntentClassifier()
@@ -0,0 +1,203 @@
+from typing import Callable, Dict, Optional, Sequence
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor
+import json
+import os
+import threading
+import time
+
+import requests
+
+from config import (
+    KAKAO_CALLBACK_MODE,
+    KAKAO_CALLBACK_ACK_TEXT,
+    KAKAO_CALLBACK_ERROR_TEXT,
+    KAKAO_CALLBACK_ASYNC_WORKERS,
+    KAKAO_CALLBACK_DELIVERY_TIMEOUT,
+    KAKAO_CALLBACK_DELIVERY_RETRIES,
+    KAKAO_CALLBACK_ALLOWED_HOSTS,
+)
+
+##############################################
+# Kakao 콜백 모드
+# --------------------------------------------
+# 스킬 요청에 callbackUrl이 있으면:
+# 1) {"useCallback": true} 응답을 바로 돌려주고
+# 2) 실제 답변(의도 파악 -> 검색 -> LLM)은 백그라운드에서 계산해서
+# 3) 완성된 템플릿을 callbackUrl로 POST
+#
+# 백그라운드 실행 방식 (KAKAO_CALLBACK_MODE)
+# - off:    콜백을 쓰지 않고 지금처럼 동기 응답
+# - thread: 같은 프로세스의 스레드에서 실행 (계속 떠 있는 서버/로컬용)
+# - lambda: 같은 Lambda 함수를 비동기(Event)로 다시 호출해서 실행
+#           (Lambda는 응답 후 프로세스가 멈추므로 스레드로는 안전하지 않음)
+#
+# callbackUrl은 요청 body에서 오므로 https + 허용된 Kakao 호스트
+# (KAKAO_CALLBACK_ALLOWED_HOSTS)일 때만 사용하고, 아니면 동기 응답
+##############################################
+
+# Marks an asynchronous self-invocation that should compute and deliver the answer
+WORKER_EVENT_KEY = 'kakaoCallbackWorker'
+
+Handler = Callable[[Dict, object], Dict]
+
+def text_template(text: str) -> Dict:
+    return {
+        "version": "2.0",
+        "template": {
+            "outputs": [
+                {
+                    "simpleText": {
+                        "text": text
+                    }
+                }
+            ]
+        }
+    }
+
+class CallbackDispatcher:
+    """
+    Runs a Kakao skill handler synchronously, or acknowledges with useCallback
+    and delivers the handler's template to callbackUrl once it is ready.
+    Keeps ack latency (request -> acknowledgement) and completion latency
+    (request -> answer delivered) for both modes.
+    """
+
+    def __init__(
+        self,
+        mode: str = KAKAO_CALLBACK_MODE,
+        ack_text: str = KAKAO_CALLBACK_ACK_TEXT,
+        workers: int = KAKAO_CALLBACK_ASYNC_WORKERS,
+        delivery_timeout: float = KAKAO_CALLBACK_DELIVERY_TIMEOUT,
+        delivery_retries: int = KAKAO_CALLBACK_DELIVERY_RETRIES,
+        invoke: Optional[Callable[[Dict, object], None]] = None,
+        allowed_hosts: Sequence[str] = KAKAO_CALLBACK_ALLOWED_HOSTS,
+        allowed_schemes: Sequence[str] = ('https',),
+    ):
+        if mode not in ('off', 'thread', 'lambda'):
+            raise ValueError(f"Unknown Kakao callback mode: {mode}")
+        self.mode = mode
+        self.ack_text = ack_text
+        self.delivery_timeout = delivery_timeout
+        self.delivery_retries = delivery_retries
+        self.invoke = invoke or self._invoke_lambda
+        self.allowed_hosts = {host.lower() for host in allowed_hosts}
+        self.allowed_schemes = set(allowed_schemes)
+        self.executor = ThreadPoolExecutor(max_workers=workers) if mode == 'thread' else None
+        self.session = requests.Session()  # callbackUrl 호스트와의 연결 재사용
+
+        self._lock = threading.Lock()
+        self.acks = 0
+        self.ack_seconds = 0.0
+        self.completions = 0
+        self.completion_seconds = 0.0
+        self.max_completion_seconds = 0.0
+        self.failures = 0
+
+    def handle(self, event: Dict, context, handler: Handler) -> Dict:
+        """Lambda entry point wrapper: main(event, context) = dispatcher.handle(event, context, handle_turn)"""
+        if event.get(WORKER_EVENT_KEY):
+            work = event[WORKER_EVENT_KEY]
+            self.complete({'body': work['body']}, context, handler, work['callbackUrl'], work['receivedAt'])
+            return {"statusCode": 200, "body": json.dumps({"delivered": True})}
+
+        received_at = time.time()
+        callback_url = json.loads(event['body'])['userRequest'].get('callbackUrl')
+        if self.mode == 'off' or not callback_url:
+            return handler(event, context)
+        if not self.is_allowed(callback_url):
+            print(f"[Kakao Callback] Ignoring callbackUrl outside the allowlist: {callback_url[:200]}")
+            return handler(event, context)
+
+        try:
+            if self.mode == 'thread':
+                self.executor.submit(self.complete, event, context, handler, callback_url, received_at)
+            else:
+                self.invoke({WORKER_EVENT_KEY: {'body': event['body'], 'callbackUrl': callback_url, 'receivedAt': received_at}}, context)
+        except Exception as e:
+            # 백그라운드로 넘기지 못하면 동기 응답으로 처리
+            print(f"[Kakao Callback] Async dispatch failed, answering synchronously: {str(e)}")
+            return handler(event, context)
+
+        ack_seconds = time.time() - received_at
+        with self._lock:
+            self.acks += 1
+            self.ack_seconds += ack_seconds
+        print(f"[Kakao Callback] Ack in {ack_seconds * 1000:.1f} ms ({self.mode})")
+        return {
+            "statusCode": 200,
+            "body": json.dumps({"version": "2.0", "useCallback": True, "data": {"text": self.ack_text}}),
+        }
+
+    def complete(self, event: Dict, context, handler: Handler, callback_url: str, received_at: float) -> None:
+        """Compute the answer and POST it to callbackUrl; an error template is sent if the handler fails"""
+        try:
+            template = json.loads(handler(event, context)['body'])
+        except Exception as e:
+            print(f"[Kakao Callback] Handler failed: {e!r}")
+            template = text_template(KAKAO_CALLBACK_ERROR_TEXT)
+
+        delivered = self.deliver(callback_url, template)
+        completion_seconds = time.time() - received_at
+        with self._lock:
+            self.completions += 1
+            self.completion_seconds += completion_seconds
+            self.max_completion_seconds = max(self.max_completion_seconds, completion_seconds)
+            self.failures += int(not delivered)
+        print(f"[Kakao Callback] Answer {'delivered' if delivered else 'NOT delivered'} "
+              f"{completion_seconds * 1000:.0f} ms after the request")
+
+    def is_allowed(self, callback_url: str) -> bool:
+        """Only POST answers to allowlisted callback hosts (callbackUrl comes from the request body)"""
+        try:
+            url = urlsplit(callback_url)
+            return url.scheme in self.allowed_schemes and (url.hostname or '').lower() in self.allowed_hosts
+        except ValueError:
+            return False
+
+    def deliver(self, callback_url: str, template: Dict) -> bool:
+        if not self.is_allowed(callback_url):
+            print(f"[Kakao Callback] Refusing to deliver to callbackUrl outside the allowlist: {callback_url[:200]}")
+            return False
+        for attempt in range(self.delivery_retries + 1):
+            try:
+                resp = self.session.post(
+                    callback_url,
+                    data = json.dumps(template, ensure_ascii=False).encode('utf-8'),
+                    headers = {"Content-Type": "application/json"},
+                    timeout = self.delivery_timeout,
+                )
+                if resp.status_code // 100 == 2:
+                    return True
+                print(f"[Kakao Callback] callbackUrl returned {resp.status_code}: {resp.text[:200]}")
+                if resp.status_code < 500 and resp.status_code != 429:
+                    return False  # 재시도해도 소용없는 요청 (만료된 callbackUrl 등)
+            except requests.RequestException as e:
+                print(f"[Kakao Callback] callbackUrl request failed: {str(e)}")
+            time.sleep(0.2 * 2 ** attempt)
+        return False
+
+    @staticmethod
+    def _invoke_lambda(payload: Dict, context) -> None:
+        import boto3  # Lambda 런타임에 포함되어 있음; lambda 모드에서만 필요
+        function_name = getattr(context, 'invoked_function_arn', None) or os.environ['AWS_LAMBDA_FUNCTION_NAME']
+        boto3.client('lambda').invoke(
+            FunctionName = function_name,
+            InvocationType = 'Event',
+            Payload = json.dumps(payload).encode('utf-8'),
+        )
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'mode': self.mode,
+                'acks': self.acks,
+                'avg_ack_ms': self.ack_seconds / self.acks * 1000 if self.acks else 0.0,
+                'completions': self.completions,
+                'avg_completion_ms': self.completion_seconds / self.completions * 1000 if self.completions else 0.0,
+                'max_completion_ms': self.max_completion_seconds * 1000,
+                'delivery_failures': self.failures,
+            }
+
+# Singleton instance shared by the Kakao callbacks
+callback_dispatcher = CallbackDispatcher()
@@ -1,17 +1,19 @@
 import json
 import pdb
-import requests
+import time
+import numpy as np
+from typing import Dict, List, Sequence
 
-from openai import OpenAI
 from config import *
+from libs.response_cache import response_cache
+from libs.embedding_service import embedding_service
+from libs.openai_client import get_openai_client
+from libs.vector_index import get_local_index
+from libs.rerank import mmr_rerank
+from libs.opensearch_client import opensearch
 
 def make_basic_query(text):
-    client = OpenAI()
-    resp = client.embeddings.create(
-                model = "text-embedding-3-large",
-                input = text,
-            )
-    embed = resp.data[0].embedding
+    embed = embedding_service.embed(text).tolist() # 같은 질의의 embedding은 캐시에서 가져옴
 
     query = {
         "query": {
@@ -28,12 +30,7 @@ def make_basic_query(text):
     return query
 
 def make_advanced_query(text):
-    client = OpenAI()
-    resp = client.embeddings.create(
-                model = "text-embedding-3-large",
-                input = text,
-            )
-    embed = resp.data[0].embedding
+    embed = embedding_service.embed(text).tolist() # 같은 질의의 embedding은 캐시에서 가져옴
 
     # query 검색 & embedding 검색
     # keyword search 가중치 1, embedding search 가중치 1
@@ -78,22 +75,157 @@ def make_advanced_query(text):
     }
     return query
 
+##############################################
+# Hybrid 검색 (BM25 + kNN)
+# --------------------------------------------
+# 두 쿼리를 _msearch 한 번으로 보내고, 점수 스케일이 다른 두 랭킹을
+# reciprocal rank fusion(또는 정규화한 점수의 가중합)으로 합침
+# rerank할 때는 합친 랭킹의 상위 후보만 _mget으로 embedding을 가져와 MMR
+##############################################
+NEWS_SOURCE_FIELDS = ["title", "summary", "sources"] # 제목, 요약, 원본기사 id만 가져옴
+
+def make_lexical_query(text, size):
+    return {
+        "query": {
+            "multi_match": {
+                "query": text,
+                "fields": ["title^4", "summary"],
+            }
+        },
+        "size": size,
+        "_source": NEWS_SOURCE_FIELDS, # embedding은 rerank할 후보만 따로 가져옴 (fetch_embeddings)
+    }
+
+def make_knn_query(embed, size):
+    return {
+        "query": {
+            "knn": {
+                "embed": {
+                    "vector": embed,
+                    "k": size,
+                }
+            }
+        },
+        "size": size,
+        "_source": NEWS_SOURCE_FIELDS, # embedding은 rerank할 후보만 따로 가져옴 (fetch_embeddings)
+    }
+
+def fetch_embeddings(index, doc_ids):
+    """{_id: embed} of the given topics with one _mget (only the embed field)"""
+    if not doc_ids:
+        return {}
+    resp = opensearch.post(f"{index}/_mget?_source=embed", {"ids": list(doc_ids)})
+    assert resp.status_code == 200
+    return {x['_id']: x['_source']['embed'] for x in resp.json()['docs'] if x.get('found') and 'embed' in x.get('_source', {})}
+
+def fuse_rrf(rankings: Sequence[List[str]], weights: Sequence[float], rrf_k: int = NEWS_SEARCH_RRF_K) -> Dict[str, float]:
+    """Reciprocal rank fusion: sum of weight / (rrf_k + rank) over the rankings"""
+    fused = {}
+    for ranking, weight in zip(rankings, weights):
+        for rank, doc_id in enumerate(ranking, start=1):
+            fused[doc_id] = fused.get(doc_id, 0.0) + weight / (rrf_k + rank)
+    return fused
+
+def fuse_scores(scored: Sequence[Dict[str, float]], weights: Sequence[float]) -> Dict[str, float]:
+    """Weighted sum of min-max normalized scores (a missing doc scores 0 in that list)"""
+    fused = {}
+    for scores, weight in zip(scored, weights):
+        if not scores:
+            continue
+        low, high = min(scores.values()), max(scores.values())
+        for doc_id, score in scores.items():
+            normalized = (score - low) / (high - low) if high > low else 1.0
+            fused[doc_id] = fused.get(doc_id, 0.0) + weight * normalized
+    return fused
+
+def diversify(query_embed, docs, scores, k, mmr_lambda=NEWS_SEARCH_MMR_LAMBDA):
+    """2단계: 후보들을 MMR로 다시 골라 비슷한 토픽이 context를 채우지 않게 함"""
+    if len(docs) <= k or any('embed' not in doc for doc in docs):
+        return docs[:k]
+
+    t0 = time.perf_counter()
+    vectors = np.asarray([doc['embed'] for doc in docs], dtype=np.float32)
+    relevance = np.asarray(scores, dtype=np.float32)
+    spread = relevance.max() - relevance.min()
+    relevance = (relevance - relevance.min()) / spread if spread > 0 else np.ones_like(relevance)
+    picked = mmr_rerank(query_embed, vectors, k, mmr_lambda, relevance)
+    print(f"[News Search] MMR rerank of {len(docs)} candidates: {(time.perf_counter() - t0) * 1000:.2f} ms")
+    return [docs[i] for i in picked]
+
+def hybrid_search(
+    text,
+    k=NEWS_SEARCH_K,
+    candidates=None,
+    lexical_weight=NEWS_SEARCH_LEXICAL_WEIGHT,
+    vector_weight=NEWS_SEARCH_VECTOR_WEIGHT,
+    fusion=NEWS_SEARCH_FUSION,
+    rerank=NEWS_SEARCH_RERANK,
+    mmr_lambda=NEWS_SEARCH_MMR_LAMBDA,
+    index=TOPICS_INDEX,
+):
+    if candidates is None: # rerank할 때는 후보를 더 많이 가져옴
+        candidates = NEWS_SEARCH_RERANK_CANDIDATES if rerank else NEWS_SEARCH_CANDIDATES
+    query_embed = embedding_service.embed(text)
+    embed = query_embed.tolist()
+    searches = [make_lexical_query(text, candidates), make_knn_query(embed, candidates)]
+    lines = [line for body in searches for line in ({}, body)] # 헤더 줄({}) + 쿼리 줄
+
+    resp = opensearch.post(f"{index}/_msearch", lines, ndjson=True)
+    assert resp.status_code == 200
+
+    docs, rankings, scored = {}, [], []
+    for result in resp.json()['responses']:
+        hits = result.get('hits', {}).get('hits', []) # 실패한 쪽은 빈 결과로 취급
+        for x in hits:
+            docs.setdefault(x['_id'], dict(x['_source'], _id=x['_id']))
+        rankings.append([x['_id'] for x in hits])
+        scored.append({x['_id']: x['_score'] for x in hits})
+
+    weights = [lexical_weight, vector_weight]
+    if fusion == 'rrf':
+        fused = fuse_rrf(rankings, weights)
+    elif fusion == 'score':
+        fused = fuse_scores(scored, weights)
+    else:
+        raise ValueError(f"Unknown fusion: {fusion}")
+
+    ranked = sorted(fused, key=lambda doc_id: fused[doc_id], reverse=True)
+    if rerank:
+        # 두 랭킹을 합치면 최대 2 * candidates개 -> 상위 candidates개만 embedding을 가져와서 MMR
+        ranked = ranked[:candidates]
+        embeds = fetch_embeddings(index, ranked) if len(ranked) > k else {}
+        pool = [dict(docs[doc_id], embed=embeds[doc_id]) if doc_id in embeds else docs[doc_id] for doc_id in ranked]
+        results = diversify(query_embed, pool, [fused[doc_id] for doc_id in ranked], k, mmr_lambda)
+    else:
+        results = [docs[doc_id] for doc_id in ranked[:k]]
+    # embedding은 답변 생성에 필요 없으므로 제거
+    return [{key: value for key, value in doc.items() if key != 'embed'} for doc in results]
+
 def semantic_search(text):
+    # 로컬 벡터 인덱스가 설정되어 있으면 OpenSearch 없이 kNN 검색
+    local_index = get_local_index()
+    if local_index is not None:
+        query_embed = embedding_service.embed(text)
+        if not NEWS_SEARCH_RERANK:
+            return local_index.search_docs(query_embed, k=NEWS_SEARCH_K, mode=VECTOR_INDEX_MODE)
+        hits = local_index.search(query_embed, k=NEWS_SEARCH_RERANK_CANDIDATES, mode=VECTOR_INDEX_MODE)
+        docs = [dict(local_index.docs[i], embed=local_index.vectors[i]) for i, _ in hits]
+        docs = diversify(query_embed, docs, [score for _, score in hits], NEWS_SEARCH_K)
+        return [{key: value for key, value in doc.items() if key != 'embed'} for doc in docs]
+
+    if NEWS_SEARCH_MODE == 'hybrid':
+        return hybrid_search(text)
+
     # query = make_basic_query(text)
     query = make_advanced_query(text)
 
-    resp = requests.get(
-        url = f"{OPENSEARCH_URL}/topics/_search",
-        data = json.dumps(query),
-        headers = OPENSEARCH_HEADERS,
-        auth = OPENSEARCH_AUTH,
-    )
+    resp = opensearch.get(f"{TOPICS_INDEX}/_search", query)
 
     assert resp.status_code == 200
 
     results = resp.json()
     hits = results['hits']['hits'] # 검색 결과는 hits에 저장되어 있음
-    docs = [x['_source'] for x in hits] # _source에는 실제 데이터가 저장되어 있음
+    docs = [dict(x['_source'], _id=x['_id']) for x in hits] # _source에는 실제 데이터가 저장되어 있음, _id는 응답 캐시 키에 사용
 
     return docs
 
@@ -119,27 +251,39 @@ def generate_answer(topics, utterance):
     """
     print(prompt)
 
-    client = OpenAI()
-    messages = [
-        {
-            'role': 'system',
-            'content': '아래 뉴스기사들을 바탕으로 사용자의 질문에 대답해줘.'
-        },
-        {
-            'role': 'user',
-            'content': prompt,
-        }
-    ]
-    resp = client.chat.completions.create(
-	        model = "gpt-4o-mini",
-	        messages = messages,
-	    )
-    answer = resp.choices[0].message.content.strip()
+    def ask_llm():
+        client = get_openai_client()
+        messages = [
+            {
+                'role': 'system',
+                'content': '아래 뉴스기사들을 바탕으로 사용자의 질문에 대답해줘.'
+            },
+            {
+                'role': 'user',
+                'content': prompt,
+            }
+        ]
+        resp = client.chat.completions.create(
+                model = "gpt-4o-mini",
+                messages = messages,
+            )
+        return resp.choices[0].message.content.strip()
+
+    # 같은 기사에 대한 같은 질문은 LLM을 다시 부르지 않음 (거의 같은 질문은 RESPONSE_CACHE_SIMILARITY_ENABLED일 때만)
+    answer = response_cache.get_or_compute(
+        intent = 'news',
+        template = 'news_search.generate_answer',
+        inputs = {'utterance': utterance},
+        compute = ask_llm,
+        doc_ids = [x.get('_id') or x['title'] for x in topics],
+        similar_text = utterance,
+    )
 
     print(answer)
     return answer
 
-def answer_news_search(utterance):
-    topics = semantic_search(utterance) # 사용자 발화를 바탕으로 semantic search를 통해 관련 기사를 가져옴
+def answer_news_search(utterance, topics=None):
+    if topics is None: # 미리 검색해둔 기사가 없으면
+        topics = semantic_search(utterance) # 사용자 발화를 바탕으로 semantic search를 통해 관련 기사를 가져옴
     answer = generate_answer(topics, utterance) # 가져온 기사를 바탕으로 답변 생성
     return answer
\ No newline at end of file
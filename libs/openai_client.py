@@ -0,0 +1,11 @@
+from functools import lru_cache
+
+from openai import OpenAI
+
+@lru_cache(maxsize=1)
+def get_openai_client() -> OpenAI:
+    """
+    Shared OpenAI client. Its HTTP connection pool is kept across calls and
+    across warm Lambda invocations instead of reconnecting for every request.
+    """
+    return OpenAI()
@@ -0,0 +1,163 @@
+from typing import Dict, Iterable, Optional, Union
+import json
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from config import (
+    OPENSEARCH_URL,
+    OPENSEARCH_AUTH,
+    OPENSEARCH_HEADERS,
+    OPENSEARCH_POOL_SIZE,
+    OPENSEARCH_CONNECT_TIMEOUT,
+    OPENSEARCH_READ_TIMEOUT,
+    OPENSEARCH_MAX_RETRIES,
+    OPENSEARCH_RETRY_BACKOFF,
+)
+
+NDJSON_HEADERS = {"Content-Type": "application/x-ndjson"}
+
+def dumps(body) -> bytes:
+    """Compact UTF-8 JSON; Korean text is sent as-is instead of \\uXXXX escapes"""
+    return json.dumps(body, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+def endpoint_name(method: str, path: str) -> str:
+    """'PUT chat-history/_doc/abc' -> 'PUT /chat-history/_doc' (ids and query strings dropped)"""
+    parts = []
+    for part in path.split('?')[0].strip('/').split('/'):
+        parts.append(part)
+        if part.startswith('_'):
+            break
+    return f"{method} /{'/'.join(parts)}"
+
+class OpenSearchClient:
+    """
+    One pooled keep-alive Session for every OpenSearch call, kept at module level
+    so warm Lambda invocations reuse open TLS connections.
+
+    429 and 5xx responses and connection errors are retried with exponential
+    backoff (honouring Retry-After) for every method: reads are safe to repeat
+    and writes here always carry an explicit document id.
+    """
+
+    def __init__(
+        self,
+        url: str = OPENSEARCH_URL,
+        auth=OPENSEARCH_AUTH,
+        pool_size: int = OPENSEARCH_POOL_SIZE,
+        connect_timeout: float = OPENSEARCH_CONNECT_TIMEOUT,
+        read_timeout: float = OPENSEARCH_READ_TIMEOUT,
+        max_retries: int = OPENSEARCH_MAX_RETRIES,
+        retry_backoff: float = OPENSEARCH_RETRY_BACKOFF,
+    ):
+        self.url = url.rstrip('/') if url else url
+        self.timeout = (connect_timeout, read_timeout)
+
+        retry = Retry(
+            total = max_retries,
+            backoff_factor = retry_backoff,
+            status_forcelist = (429, 500, 502, 503, 504),
+            allowed_methods = None,  # 모든 메서드 재시도
+            raise_on_status = False,  # 재시도 후에도 실패하면 마지막 응답을 그대로 반환
+            respect_retry_after_header = True,
+        )
+        self.adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.auth = auth
+        self.session.mount('http://', self.adapter)
+        self.session.mount('https://', self.adapter)
+
+        self._lock = threading.Lock()
+        self._endpoints: Dict[str, Dict] = {}
+
+    def request(
+        self,
+        method: str,
+        path: str,
+        body: Union[None, Dict, Iterable[Dict], bytes] = None,
+        ndjson: bool = False,
+    ) -> requests.Response:
+        """
+        Send one request to OPENSEARCH_URL/path. `body` is a dict (JSON), a list of
+        dicts when `ndjson` (one line each, for _bulk/_msearch) or raw bytes.
+        """
+        if body is None or isinstance(body, bytes):
+            data = body
+        elif ndjson:
+            data = b''.join(dumps(line) + b'\n' for line in body)
+        else:
+            data = dumps(body)
+
+        name = endpoint_name(method, path)
+        t0 = time.perf_counter()
+        try:
+            resp = self.session.request(
+                method,
+                f"{self.url}/{path.lstrip('/')}",
+                data = data,
+                headers = NDJSON_HEADERS if ndjson else OPENSEARCH_HEADERS,
+                timeout = self.timeout,
+            )
+        except requests.RequestException:
+            self._record(name, time.perf_counter() - t0, error=True, sent=len(data or b''), received=0)
+            raise
+        self._record(name, time.perf_counter() - t0, error=resp.status_code >= 400,
+                     sent=len(data or b''), received=len(resp.content))
+        return resp
+
+    def get(self, path: str, body=None) -> requests.Response:
+        return self.request('GET', path, body)
+
+    def put(self, path: str, body=None) -> requests.Response:
+        return self.request('PUT', path, body)
+
+    def post(self, path: str, body=None, ndjson: bool = False) -> requests.Response:
+        return self.request('POST', path, body, ndjson)
+
+    def _record(self, name: str, seconds: float, error: bool, sent: int, received: int) -> None:
+        with self._lock:
+            stats = self._endpoints.setdefault(name, {'count': 0, 'errors': 0, 'total_seconds': 0.0, 'max_seconds': 0.0,
+                                                      'bytes_sent': 0, 'bytes_received': 0})
+            stats['count'] += 1
+            stats['errors'] += int(error)
+            stats['bytes_sent'] += sent
+            stats['bytes_received'] += received
+            stats['total_seconds'] += seconds
+            stats['max_seconds'] = max(stats['max_seconds'], seconds)
+
+    def connection_stats(self) -> Dict:
+        """Requests sent vs TCP/TLS connections opened by the pool (the rest reused a connection)"""
+        opened = sent = 0
+        pools = self.adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is not None:
+                opened += pool.num_connections
+                sent += pool.num_requests
+        return {'requests': sent, 'connections_opened': opened, 'connections_reused': max(sent - opened, 0)}
+
+    def stats(self) -> Dict:
+        with self._lock:
+            endpoints = {
+                name: {
+                    'count': s['count'],
+                    'errors': s['errors'],
+                    'avg_ms': s['total_seconds'] / s['count'] * 1000,
+                    'max_ms': s['max_seconds'] * 1000,
+                    'bytes_sent': s['bytes_sent'],
+                    'bytes_received': s['bytes_received'],
+                }
+                for name, s in self._endpoints.items()
+            }
+        return {'endpoints': endpoints, **self.connection_stats()}
+
+    def log_stats(self) -> None:
+        stats = self.stats()
+        summary = ", ".join(f"{name} x{s['count']} avg {s['avg_ms']:.0f}ms" for name, s in stats['endpoints'].items())
+        print(f"[OpenSearch] {summary} | connections opened {stats['connections_opened']}, reused {stats['connections_reused']}")
+
+# Singleton instance shared by every module that talks to OpenSearch
+opensearch = OpenSearchClient()
@@ -1,11 +1,15 @@
 import json
 import pdb
-import requests
+import re
+import time
+import threading
 import datetime as dt
 import shortuuid
+from collections import OrderedDict
 
 from openai import OpenAI
 from config import *
+from libs.opensearch_client import opensearch
 
 ##############################################
 # OpenSearch 데이터 업로드
@@ -15,21 +19,17 @@ from config import *
 # /user-photos: 사용자의 사진을 저장하는 인덱스
 ##############################################
 def upload_photo(user_id, photo_url, description=None):
+    doc_id = shortuuid.uuid() # doc의 uuid 생성
     doc = {
         'user_id': user_id,
+        'photo_id': doc_id,           # 같은 시각에 올린 사진의 정렬 순서 (search_after tiebreaker)
         'photo_url': photo_url,       # 저장된 사진의 URL
         'description': description or "사용자가 업로드한 사진",   # 설명
         'timestamp': dt.datetime.now().isoformat() # 업로드 시간
     }
-    doc_id = shortuuid.uuid() # doc의 uuid 생성
 
     try:
-        resp = requests.put(
-        url = f"{OPENSEARCH_URL}/user-photos/_doc/{doc_id}",
-        data = json.dumps(doc),
-        headers = OPENSEARCH_HEADERS,
-        auth = OPENSEARCH_AUTH,
-        )
+        resp = opensearch.put(f"user-photos/_doc/{doc_id}", doc)
         
         print(f"Status Code: {resp.status_code}")
         assert resp.status_code // 100 == 2  # 성공 상태 코드 확인
@@ -45,105 +45,193 @@ def upload_photo(user_id, photo_url, description=None):
 ##############################################
 # OpenSearch 데이터 조회
 # --------------------------------------------
-# 1) fetch_photo_by_date
-# : 특정 날짜에 업로드된 사용자의 사진 조회
+# 1) fetch_photos
+# : 기간(start_date ~ end_date) 동안 업로드된 사용자의 사진을 한 페이지씩 조회
+#   (timestamp 내림차순, photo_id) + search_after로 다음 페이지를 이어서 가져옴
+# 2) photo_cursors
+# : "더 보여줘"로 이어볼 수 있도록 사용자별 마지막 조회 위치를 보관
 # /user-photos: 사용자의 사진을 저장하는 인덱스
 ##############################################
-def fetch_photo_by_date(user_id, date):
+PHOTO_FIELDS = ["photo_url", "description", "timestamp"]  # 카드에 그리는 필드만 가져옴
+
+# "더 보여줘", "사진 더 줘", "다음 사진", "계속" (직전 사진 조회가 있을 때만 이어보기로 처리)
+MORE_PATTERN = re.compile(r'^\s*(?:사진\s*)?(?:더|계속|다음(?:\s*(?:거|것|사진|페이지))?)\s*(?:보여|볼래|보자|줘|$)')
+
+def fetch_photos(user_id, start_date, end_date, size=PHOTO_PAGE_SIZE, search_after=None):
     """
-    특정 날짜에 업로드된 사용자의 사진을 검색합니다.
+    start_date ~ end_date(YYYY-MM-DD, 포함)에 업로드된 사용자의 사진 최대 size장을 최신순으로 검색합니다.
+    (photos, 다음 페이지의 search_after 값 또는 None)을 반환합니다.
     """
-    start_date = f"{date}T00:00:00"
-    end_date = f"{date}T23:59:59"
-
+    end_exclusive = dt.date.fromisoformat(end_date) + dt.timedelta(days=1)
     query = {
         "query": {
             "bool": {
-                "must": [
-                    {"term": {"user_id": {"value": user_id}}},
-                    {"range": {"timestamp": {"gte": start_date, "lte": end_date}}}
+                "filter": [  # 점수가 필요 없는 조건 -> filter context
+                    {"term": {"user_id": user_id}},
+                    {"range": {"timestamp": {"gte": f"{start_date}T00:00:00", "lt": f"{end_exclusive}T00:00:00"}}}
                 ]
             }
         },
+        # 같은 시각에 올린 사진도 photo_id로 순서가 정해져서 페이지 경계에서 빠지거나 겹치지 않음
         "sort": [
             {
                 "timestamp": {
                     "order": "desc"
                 }
+            },
+            {
+                "photo_id": {
+                    "order": "asc"
+                }
             }
         ],
-        "size": 100  # 최대 100개의 결과 반환
+        "_source": PHOTO_FIELDS,
+        "size": size + 1  # 한 장 더 가져와서 다음 페이지가 있는지 확인
     }
+    if search_after:
+        query["search_after"] = search_after
 
-    resp = requests.get(
-        url=f"{OPENSEARCH_URL}/user-photos/_search",
-        data=json.dumps(query),
-        headers=OPENSEARCH_HEADERS,
-        auth=OPENSEARCH_AUTH,
-    )
+    resp = opensearch.get("user-photos/_search", query)
 
     assert resp.status_code == 200
 
-    results = resp.json()
+    hits = resp.json()['hits']['hits']
+    photos = [x['_source'] for x in hits[:size]]
+    next_after = hits[size - 1]['sort'] if len(hits) > size else None
+    return photos, next_after
 
-    hits = results['hits']['hits']
-    photos = [x['_source'] for x in hits]
-    return photos
+def fetch_photo_by_date(user_id, date):
+    """
+    특정 날짜에 업로드된 사용자의 사진(첫 페이지)을 검색합니다.
+    """
+    return fetch_photos(user_id, date, date)[0]
+
+class PhotoCursors:
+    """
+    Where each user's last photo lookup stopped, so "더 보여줘" can continue it.
+    Kept in the container's memory; an expired or evicted cursor just means the
+    user has to ask for the dates again.
+    """
+
+    def __init__(self, ttl_seconds=PHOTO_CURSOR_TTL_SECONDS, max_users=PHOTO_CURSOR_MAX_USERS):
+        self.ttl_seconds = ttl_seconds
+        self.max_users = max_users
+        self._cursors = OrderedDict()  # user_id -> (cursor, expires_at)
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        with self._lock:
+            item = self._cursors.get(user_id)
+            if item is None:
+                return None
+            if item[1] < time.monotonic():
+                del self._cursors[user_id]
+                return None
+            return item[0]
+
+    def set(self, user_id, cursor):
+        with self._lock:
+            self._cursors[user_id] = (cursor, time.monotonic() + self.ttl_seconds)
+            self._cursors.move_to_end(user_id)
+            while len(self._cursors) > self.max_users:
+                self._cursors.popitem(last=False)
+
+    def clear(self, user_id):
+        with self._lock:
+            self._cursors.pop(user_id, None)
+
+def wants_more_photos(user_id, utterance):
+    """직전 사진 조회에 다음 페이지가 남아 있고 사용자가 이어보기를 요청했는지"""
+    return MORE_PATTERN.search(utterance) is not None and photo_cursors.get(user_id) is not None
+
+def text_body(text):
+    return {
+        "version": "2.0",
+        "template": {
+            "outputs": [
+                {
+                    "simpleText": {
+                        "text": text
+                    }
+                }
+            ]
+        }
+    }
+
+def photo_carousel_body(photos, has_more):
+    """사진 한 페이지를 basicCard 캐러셀로 (다음 페이지가 있으면 "더 보여줘" 바로가기 버튼)"""
+    items = [
+        {
+            "title": photo['timestamp'][:16].replace('T', ' '),  # 업로드 시각 (YYYY-MM-DD HH:mm)
+            "description": photo.get('description') or '설명 없음',
+            "thumbnail": {
+                "imageUrl": photo['photo_url'],  # 원본 URL 사용
+                "link": {"web": photo['photo_url']}
+            }
+        }
+        for photo in photos
+    ]
+    template = {
+        "outputs": [
+            {
+                "carousel": {
+                    "type": "basicCard",
+                    "items": items
+                }
+            }
+        ]
+    }
+    if has_more:
+        template["quickReplies"] = [{"label": "더 보여줘", "action": "message", "messageText": "더 보여줘"}]
+    return {
+        "version": "2.0",
+        "template": template
+    }
+
+def photo_page_answer(user_id, cursor):
+    """cursor가 가리키는 페이지를 조회하고, 남은 사진이 있으면 다음 위치를 저장"""
+    photos, next_after = fetch_photos(user_id, cursor['start'], cursor['end'], search_after=cursor['search_after'])
+    label = cursor['start'] if cursor['start'] == cursor['end'] else f"{cursor['start']} ~ {cursor['end']}"
+
+    if next_after:
+        photo_cursors.set(user_id, dict(cursor, search_after=next_after, shown=cursor['shown'] + len(photos)))
+    else:
+        photo_cursors.clear(user_id)
+
+    if not photos:
+        log_message = f"{label}에 업로드된 사진이 없습니다."
+        return text_body(log_message), log_message
+
+    first, last = cursor['shown'] + 1, cursor['shown'] + len(photos)
+    log_message = f"{label}에 업로드된 사진 {first}~{last}번째를 표시합니다."
+    if next_after:
+        log_message += " 더 보려면 '더 보여줘'라고 말해 주세요."
+    return photo_carousel_body(photos, has_more=next_after is not None), log_message
 
 
 def generate_photo_answer(user_id, params):
     """
-    사용자의 사진 업로드 요청에 대한 응답을 생성합니다.
+    사용자의 사진 업로드/조회 요청에 대한 응답을 생성합니다.
     """
     photo_url = params.get("photo_url")
     description = params.get("description")
     photo_date = params.get("photo_date")  # 날짜가 제공된 경우
+    photo_end_date = params.get("photo_end_date")  # 기간으로 조회하는 경우 마지막 날짜
+
+    if params.get("photo_more"): # "더 보여줘": 직전 조회의 다음 페이지
+        cursor = photo_cursors.get(user_id)
+        if cursor is None:
+            log_message = "이어서 보여드릴 사진이 없습니다. 날짜와 함께 다시 요청해 주세요."
+            return text_body(log_message), log_message
+        return photo_page_answer(user_id, cursor)
 
     if photo_date: # photo 의도에 날짜가 포함된 경우
-        photos = fetch_photo_by_date(user_id, photo_date)
-        if not photos:
-            log_message = f"{photo_date}에 업로드된 사진이 없습니다."
-            body = {
-                "version": "2.0",
-                "template": {
-                    "outputs": [
-                        {
-                            "simpleText": {
-                                "text": log_message
-                            }
-                        }
-                    ]
-                }
-            }
-        else:
-            photo = photos[0]  # 첫 번째 사진
-            log_message = f"{photo_date}에 업로드된 첫 번째 사진을 표시합니다."
-            body = {
-                "version": "2.0",
-                "template": {
-                    "outputs": [
-                        {
-                            "simpleImage": {
-                                "imageUrl": photo['photo_url'],  # 원본 URL 사용
-                                "altText": f"미리보기: {photo.get('description', '설명 없음')}"
-                            }
-                        }
-                    ]
-                }
-            }
-    else:
-        upload_result = upload_photo(user_id, photo_url, description)
-        log_message = upload_result
-        body = {
-            "version": "2.0",
-            "template": {
-                "outputs": [
-                    {
-                        "simpleText": {
-                            "text": log_message  # 업로드 결과 메시지 반환
-                        }
-                    }
-                ]
-            }
-        }
-    return body, log_message
\ No newline at end of file
+        cursor = {'start': photo_date, 'end': photo_end_date or photo_date, 'search_after': None, 'shown': 0}
+        return photo_page_answer(user_id, cursor)
+
+    upload_result = upload_photo(user_id, photo_url, description)
+    log_message = upload_result  # 업로드 결과 메시지 반환
+    return text_body(log_message), log_message
+
+# Singleton instance shared by the photo handlers
+photo_cursors = PhotoCursors()
@@ -1,14 +1,18 @@
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 import datetime as dt
 from langchain_openai import ChatOpenAI
 from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain.memory import ConversationBufferMemory
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
 from langchain.chains import LLMChain, SequentialChain
 from langchain.output_parsers import PydanticOutputParser
 from pydantic import BaseModel, Field
 
 from config import *
 from libs.translation_handler import translator
+from libs.intent_classifier import intent_classifier
+from libs.chat_memory import ChatMemoryStore
+from libs.token_budget import estimate_tokens
+from libs.response_cache import response_cache
 
 # Output parsers for structured responses
 class IntentOutput(BaseModel):
@@ -18,8 +22,31 @@ class IntentOutput(BaseModel):
 class PhotoOutput(BaseModel):
     description: str = Field(description="Description of the photo or photo request")
     photo_date: str = Field(description="Date in YYYY-MM-DD format if specified")
+    photo_end_date: str = Field(description="Last day (YYYY-MM-DD) when a period of photos is requested")
     photo_url: str = Field(description="URL of the photo if uploaded")
 
+class RequestContext:
+    """
+    Per-turn state shared by every stage that handles one Kakao message, so the
+    utterance is translated and its intent detected once per turn.
+    """
+    def __init__(self, user_id: Optional[str], utterance: str):
+        self.user_id = user_id
+        self.utterance = utterance
+        self.intent: Optional[Tuple[str, Dict]] = None
+        self._translations: Dict[str, Tuple[str, bool]] = {}
+
+    def translate_batch(self, texts: List[str]) -> List[Tuple[str, bool]]:
+        """translator.translate_batch, skipping texts already translated this turn"""
+        missing = [text for text in dict.fromkeys(texts) if text not in self._translations]
+        if missing:
+            for text, result in zip(missing, translator.translate_batch(missing)):
+                self._translations[text] = result
+        return [self._translations[text] for text in texts]
+
+    def translate(self, text: str) -> Tuple[str, bool]:
+        return self.translate_batch([text])[0]
+
 # Initialize LLM
 llm = ChatOpenAI(model=LLM_MODEL_NAME, temperature=LLM_TEMPERATURE)
 
@@ -36,6 +63,7 @@ Available intents are:
 For photos:
 - If image file is uploaded, extract photo_url and description
 - If requesting photos by date, extract photo_date in YYYY-MM-DD format
+- If requesting photos over a period (this week, last month), extract photo_date (first day) and photo_end_date (last day)
 - Convert relative dates (today, tomorrow, this week) to actual dates
 
 {format_instructions}"""),
@@ -62,63 +90,112 @@ Example responses:
     ("human", "{utterance}")
 ])
 
-chat_memory = ConversationBufferMemory(
-    memory_key="history",
-    return_messages=True
-)
-
 chat_chain = LLMChain(
     llm=llm,
     prompt=chat_prompt,
-    memory=chat_memory,
     output_key="response"
 )
 
-def detect_intent(utterance: str) -> Tuple[str, Dict]:
-    """Detect intent from user utterance"""
-    # Translate if needed
-    translated_text, was_translated = translator.process_text(utterance)
-    
-    result = intent_chain.invoke({
-        "utterance": translated_text,
-        "format_instructions": intent_parser.get_format_instructions()
-    })
-    
-    parsed = intent_parser.parse(result["intent_output"])
-    return parsed.intent, parsed.params
+# Rolling summary of turns that no longer fit the chat memory window
+summary_prompt = ChatPromptTemplate.from_messages([
+    ("system", """Summarize the conversation between a user and the chatbot Jarvis in a few English sentences.
+Keep facts about the user (names, plans, preferences) and drop small talk."""),
+    ("human", """Summary so far:
+{summary}
+
+New messages:
+{messages}""")
+])
+
+summary_chain = LLMChain(
+    llm=llm,
+    prompt=summary_prompt,
+    output_key="summary"
+)
+
+def summarize_history(previous_summary: str, chats: List[Dict]) -> str:
+    """Fold chats evicted from the memory window into the user's rolling summary"""
+    messages = "\n".join(f"{chat['role']}: {chat['text']}" for chat in chats)
+    result = summary_chain.invoke({"summary": previous_summary or "(none)", "messages": messages})
+    return result["summary"].strip()
+
+# Per-user, token-bounded chat memory
+chat_memory = ChatMemoryStore(summarize=summarize_history if CHAT_MEMORY_SUMMARY_ENABLED else None)
+
+def detect_intent(utterance: str, ctx: Optional[RequestContext] = None) -> Tuple[str, Dict]:
+    """Detect intent from user utterance (once per turn when ctx is given)"""
+    ctx = ctx or RequestContext(None, utterance)
+    if ctx.intent is not None and ctx.utterance == utterance:
+        return ctx.intent
+
+    # Confidently classified utterances skip both translation and the LLM
+    local = intent_classifier.predict(utterance) if INTENT_FAST_PATH_ENABLED else None
+    if local is not None:
+        intent, params = local
+    else:
+        # Translate if needed
+        translated_text, was_translated = ctx.translate(utterance)
+        
+        # Keyed by date as well, since relative dates are resolved in the output
+        intent_output = response_cache.get_or_compute(
+            intent="intent",
+            template="intent_chain",
+            inputs={"utterance": translated_text, "date": dt.date.today().isoformat()},
+            compute=lambda: intent_chain.invoke({
+                "utterance": translated_text,
+                "format_instructions": intent_parser.get_format_instructions()
+            })["intent_output"],
+        )
+        
+        parsed = intent_parser.parse(intent_output)
+        intent, params = parsed.intent, parsed.params
+
+    if ctx.utterance == utterance:
+        ctx.intent = (intent, params)
+    return intent, params
 
-def generate_chat_response(user_id: str, utterance: str, chat_history: List[Dict]) -> str:
+def generate_chat_response(user_id: str, utterance: str, chat_history: List[Dict], ctx: Optional[RequestContext] = None) -> str:
     """Generate chat response with memory"""
-    # Translate if needed
-    translated_text, was_translated = translator.process_text(utterance)
+    ctx = ctx or RequestContext(user_id, utterance)
+    # Only this user's newest messages that fit the token budget are sent
+    window, summary = chat_memory.select_window(user_id, chat_history)
+
+    # Translate the utterance and Korean historical user messages in one batch
+    user_texts = [chat["text"] for chat in window if chat["role"] == "user"]
+    translations = ctx.translate_batch([utterance] + user_texts)
+    translated_text, was_translated = translations[0]
+    hist_translations = iter(translations[1:])
     
     # Convert chat history to messages format
-    for chat in chat_history:
-        # Translate historical messages if they're in Korean
+    history = []
+    if summary:
+        history.append(SystemMessage(content=f"Summary of the earlier conversation: {summary}"))
+    for chat in window:
         if chat["role"] == "user":
-            hist_text, _ = translator.process_text(chat["text"])
+            hist_text, _ = next(hist_translations)
+            history.append(HumanMessage(content=hist_text))
         else:
-            hist_text = chat["text"]
-            
-        chat_memory.save_context(
-            {"input": hist_text if chat["role"] == "user" else ""},
-            {"output": hist_text if chat["role"] == "assistant" else ""}
-        )
+            history.append(AIMessage(content=chat["text"]))
+
+    chat_memory.record_prompt(user_id, sum(estimate_tokens(m.content) for m in history), len(history))
     
+    # Not cached: the history grows every turn, so the same prompt never repeats
     result = chat_chain.invoke({
-        "utterance": translated_text
+        "utterance": translated_text,
+        "history": history
     })
     
     return result["response"]  # Response will be in Korean due to system prompt
 
-def process_user_message(user_id: str, utterance: str, chat_history: List[Dict]) -> Tuple[str, Dict]:
+def process_user_message(user_id: str, utterance: str, chat_history: List[Dict], ctx: Optional[RequestContext] = None) -> Tuple[str, Dict]:
     """Main entry point for processing user messages"""
-    # First detect intent
-    intent, params = detect_intent(utterance)
+    ctx = ctx or RequestContext(user_id, utterance)
+    # First detect intent (reused if the caller already detected it with ctx)
+    intent, params = detect_intent(utterance, ctx)
     
     # For chat intent, generate response with memory
     if intent == "chat":
-        response = generate_chat_response(user_id, utterance, chat_history)
+        response = generate_chat_response(user_id, utterance, chat_history, ctx)
         return response, {"version": "2.0", "template": {"outputs": [{"simpleText": {"text": response}}]}}
     
     # Return intent and params for other handlers
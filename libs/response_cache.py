@@ -0,0 +1,138 @@
+from typing import Callable, Dict, List, Optional, Sequence
+from collections import OrderedDict
+import hashlib
+import json
+import threading
+import time
+
+import numpy as np
+
+from config import (
+    RESPONSE_CACHE_ENABLED,
+    RESPONSE_CACHE_MAX_ENTRIES,
+    RESPONSE_CACHE_SIMILARITY_ENABLED,
+    RESPONSE_CACHE_SIMILARITY_THRESHOLD,
+    RESPONSE_CACHE_TTLS,
+)
+from libs.intent_classifier import intent_classifier
+from libs.translation_cache import normalize_text
+
+class ResponseCache:
+    """
+    Cache for LLM answers.
+
+    Entries are keyed by (intent, prompt template, normalized inputs, retrieved
+    document ids, scope). `scope` is the user id for answers built from personal
+    context, so those are never reused across users. Each intent has its own TTL;
+    intents without a TTL are not cached.
+
+    When `similar_text` is passed and an `embed` function is set, a miss falls
+    back to the most similar cached utterance with the same intent, template,
+    documents and scope (cosine similarity of `embed` vectors). Similarity only
+    measures shared wording, so questions with opposite meaning ("금리 인상" vs
+    "금리 인하") can score above the threshold; the singleton leaves it off
+    unless RESPONSE_CACHE_SIMILARITY_ENABLED is set.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = RESPONSE_CACHE_ENABLED,
+        max_entries: int = RESPONSE_CACHE_MAX_ENTRIES,
+        ttls: Dict[str, float] = RESPONSE_CACHE_TTLS,
+        similarity_threshold: float = RESPONSE_CACHE_SIMILARITY_THRESHOLD,
+        embed: Optional[Callable[[str], np.ndarray]] = None,
+    ):
+        self.enabled = enabled
+        self.max_entries = max_entries
+        self.ttls = ttls
+        self.similarity_threshold = similarity_threshold
+        self.embed = embed
+        # key -> (answer, expires_at, bucket, vector)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters: Dict[str, Dict[str, int]] = {}
+
+    @staticmethod
+    def _digest(payload) -> str:
+        raw = json.dumps(payload, ensure_ascii=False, sort_keys=True, default=str)
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def _normalize(self, inputs: Dict) -> Dict:
+        return {k: normalize_text(v) if isinstance(v, str) else v for k, v in inputs.items()}
+
+    def _count(self, intent: str, name: str) -> None:
+        counter = self.counters.setdefault(intent, {'hits': 0, 'similar_hits': 0, 'misses': 0})
+        counter[name] += 1
+
+    def get_or_compute(
+        self,
+        intent: str,
+        template: str,
+        inputs: Dict,
+        compute: Callable[[], str],
+        doc_ids: Sequence[str] = (),
+        scope: Optional[str] = None,
+        similar_text: Optional[str] = None,
+    ) -> str:
+        """Return the cached answer for these inputs, or call compute() and cache it"""
+        ttl = self.ttls.get(intent)
+        if not self.enabled or not ttl:
+            return compute()
+
+        bucket = self._digest([intent, template, list(doc_ids), scope])
+        key = self._digest([bucket, self._normalize(inputs)])
+        vector = None
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > now:
+                self._entries.move_to_end(key)
+                self._count(intent, 'hits')
+                return entry[0]
+
+            if similar_text is not None and self.embed is not None:
+                vector = self.embed(similar_text)
+                answer = self._most_similar(bucket, vector, now)
+                if answer is not None:
+                    self._count(intent, 'similar_hits')
+                    return answer
+            self._count(intent, 'misses')
+
+        answer = compute()
+
+        with self._lock:
+            self._entries[key] = (answer, time.time() + ttl, bucket, vector)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return answer
+
+    def _most_similar(self, bucket: str, vector: np.ndarray, now: float) -> Optional[str]:
+        candidates = [
+            (entry[0], entry[3]) for entry in self._entries.values()
+            if entry[2] == bucket and entry[3] is not None and entry[1] > now
+        ]
+        if not candidates:
+            return None
+        scores = np.stack([v for _, v in candidates]) @ vector
+        best = int(np.argmax(scores))
+        if scores[best] >= self.similarity_threshold:
+            return candidates[best][0]
+        return None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.counters.clear()
+
+    def stats(self) -> Dict:
+        """Hit/miss counters and hit rate per intent"""
+        stats = {}
+        for intent, counter in self.counters.items():
+            total = counter['hits'] + counter['similar_hits'] + counter['misses']
+            stats[intent] = dict(counter, hit_rate=(counter['hits'] + counter['similar_hits']) / total if total else 0.0)
+        return stats
+
+# Singleton instance; exact-key hits only unless near-duplicate matching is enabled
+response_cache = ResponseCache(embed=intent_classifier.embed if RESPONSE_CACHE_SIMILARITY_ENABLED else None)
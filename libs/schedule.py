@@ -1,140 +1,229 @@
 import json
 import pdb
-import requests
 import datetime as dt
 import shortuuid
 import datetime
 
-from openai import OpenAI
+from libs.openai_client import get_openai_client
 from config import *
+from libs.opensearch_client import opensearch
+from libs.schedule_parser import parse_schedule_request
+from libs.schedule_index import SCHEDULE_FIELDS, schedule_index, schedule_interval, search_schedules
 
-def fetch_schedule(user_id, date):
+dateDict = {0: '월요일', 1:'화요일', 2:'수요일', 3:'목요일', 4:'금요일', 5:'토요일', 6:'일요일'}
+
+def fetch_schedules(user_id, start_date, end_date, size=SCHEDULE_MAX_RESULTS):
+    # user_id/date는 점수가 필요 없는 정확한 조건 -> filter context (점수 계산 없음, filter cache 사용)
+    # 하루든 일주일이든 range 쿼리 한 번, 날짜/시간 순으로 정렬
+    # (time 정렬/비교는 schema/schedule.json의 keyword 매핑이 필요 -> scripts/manage_schema.py로 먼저 마이그레이션)
     query = {
+        "query": {
+            "bool": {
+                "filter": [
+                    {"term": {"user_id": user_id}},
+                    {"range": {"date": {"gte": start_date, "lte": end_date}}}
+                ]
+            }
+        },
+        "sort": [
+            {"date": {"order": "asc"}},
+            {"time": {"order": "asc"}}
+        ],
+        "_source": SCHEDULE_FIELDS,
+        "size": size
+    }
+
+    return search_schedules(opensearch, "schedule", query)
 
+def fetch_schedule(user_id, date):
+    return fetch_schedules(user_id, date, date)
+
+def fetch_upcoming_schedules(user_id, now, limit):
+    """오늘 남은 일정(시간 없는 일정 포함)과 내일 이후 일정 중 가장 가까운 limit개"""
+    today = now.date().isoformat()
+    query = {
         "query": {
             "bool": {
-            "must": [
-                {"match": {"user_id": user_id}},
-                {"match": {"date": date}}
-            ]
+                "filter": [
+                    {"term": {"user_id": user_id}},
+                    {"bool": {
+                        "should": [
+                            {"range": {"date": {"gt": today}}},
+                            {"bool": {"filter": [
+                                {"term": {"date": today}},
+                                {"bool": {"should": [
+                                    {"range": {"time": {"gte": now.strftime('%H:%M')}}},
+                                    {"term": {"time": ""}}
+                                ], "minimum_should_match": 1}}
+                            ]}}
+                        ],
+                        "minimum_should_match": 1
+                    }}
+                ]
             }
         },
         "sort": [
-            {"timestamp": {"order": "desc"}}
+            {"date": {"order": "asc"}},
+            {"time": {"order": "asc"}}
         ],
-        "size": 10
+        "_source": SCHEDULE_FIELDS,
+        "size": limit
+    }
+
+    return search_schedules(opensearch, "schedule", query)
+
+def describe_schedule(schedule):
+    day = dt.date.fromisoformat(schedule['date'][:10])
+    return f"{day.isoformat()} ({dateDict[day.weekday()][0]}) {(schedule.get('time') or '').strip()}".strip()
+
+def text_body(text):
+    return {
+        "version": "2.0",
+        "template": {
+            "outputs": [
+                {
+                    "simpleText": {
+                        "text": text
+                    }
+                }
+            ]
         }
-    
-    # print(query)
-    resp = requests.get(
-        url = f"{OPENSEARCH_URL}/schedule/_search",
-        data = json.dumps(query),
-        headers = OPENSEARCH_HEADERS,
-        auth = OPENSEARCH_AUTH,
-    )
+    }
 
-    # assert resp.status_code == 200
-    
-    results = resp.json()
-    print(results)
-    hits = results['hits']['hits']
-    schedules = [x['_source'] for x in hits]
-    schedules.sort(key=lambda x: x['timestamp'])
+def schedule_list_body(title, schedules):
+    """일정 목록을 Kakao 리스트 카드로 (한 카드에 5개, 넘으면 리스트 카드 캐러셀)"""
+    if not schedules:
+        return text_body(f"{title}이 없습니다")
 
+    items = [{"title": x['text'], "description": describe_schedule(x)} for x in schedules]
+    cards = [
+        {
+            "header": {"title": f"{title} ({len(items)}개)" if len(items) > 5 else title},
+            "items": items[i:i + 5]
+        }
+        for i in range(0, len(items), 5)
+    ]
+    if len(cards) == 1:
+        output = {"listCard": cards[0]}
+    else:
+        output = {"carousel": {"type": "listCard", "items": cards}}
+    return {
+        "version": "2.0",
+        "template": {
+            "outputs": [output]
+        }
+    }
+
+SCHEDULE_REQUEST_SCHEMA = {
+    "name": "schedule_request",
+    "strict": True,
+    "schema": {
+        "type": "object",
+        "properties": {
+            "action": {"type": "string", "enum": ["save", "lookup", "upcoming"]},
+            "title": {"type": "string"},
+            "date": {"type": "string", "description": "YYYY-MM-DD"},
+            "end_date": {"type": ["string", "null"], "description": "lookup: last day of the range (YYYY-MM-DD); otherwise null"},
+            "time": {"type": ["string", "null"], "description": "HH:mm (24h), null if not mentioned"},
+            "limit": {"type": ["integer", "null"], "description": "upcoming: number of schedules asked for; otherwise null"},
+        },
+        "required": ["action", "title", "date", "end_date", "time", "limit"],
+        "additionalProperties": False,
+    },
+}
 
-    return schedules
-
-def generate_schedule_answer(user_id, utterance):
-    nowtime = datetime.datetime.now()
-    dateDict = {0: '월요일', 1:'화요일', 2:'수요일', 3:'목요일', 4:'금요일', 5:'토요일', 6:'일요일'}
+def parse_schedule_with_llm(utterance, now):
+    """로컬 파서가 처리하지 못한 발화만 LLM에 structured output으로 요청"""
+    client = get_openai_client() # 공유 클라이언트 (연결 풀 재사용)
 
-    client = OpenAI()
-    
     messages = [
         {
         'role': 'system',
         'content': f"""
-        답변은 반드시 주어진 두 가지 중 한가지 방식으로 해야돼.
+        오늘은 {now.date()} {dateDict[now.weekday()]}이고 지금 시각은 {now.strftime('%H:%M')}이야.
+        사용자의 대사가 아래 셋 중 무엇인지 파악해줘.
+        - save: 일정을 기억하려는 것. date는 일정 날짜, title은 일정의 이름
+          (날짜와 관련된 단어는 빼고 핵심 키워드로 요약)
+        - lookup: 특정 날짜나 기간의 일정을 확인하려는 것. date~end_date는 조회할 기간 (하루면 같은 날짜)
+        - upcoming: 날짜 없이 다음/앞으로의 일정을 확인하려는 것. date는 오늘, limit은 원하는 개수 (모르면 1)
+        time은 언급된 시각 (HH:mm, 24시간제), 없으면 null. save가 아니면 title은 빈 문자열.
         """
         },
-        {'role': 'user',
-        'content': f"""
-        다음 대사가 아래 둘 중 어떤 상황인지 파악하고 그것에 맞는 답변을 줘.
-        (1)이나 (2)같은 표시는 빼고.
-        대사: "{utterance}"
-
-        (1) 일정을 기억하려는 경우 아래와 같이 한다.
-        만약 일정을 기억하려는 것이라면, 오늘 날짜가 {nowtime.date()} {dateDict[nowtime.weekday()]} 이니까 
-        '{utterance}' 라고 한 이 일정의 이름과 실제 날짜를 '[이름] YYYY-MM-DD HH:mm' 형식으로 알려줘. 
-        [이름]에는 날짜와 관련된 단어가 들어가면 안되고 네가 요약한 키워드를 대신 넣어줘.
-        답변 양식: '[이름] YYYY-MM-DD HH:mm'
-
-        (2) 일정은 확인하려는 경우 아래와 같이 한다
-        '{utterance} 라는 내용이 언제 어떤 일정이 있는지 궁금하다는 내용이면,
-        우리의 데이터 중에서 그 일정을 찾을 수 있도록 중요한 키워드로 요약해줘.
-        이때는 "['일정검색'] YYYY-MM-DD" 형식으로 알려줘. '일정검색'은 그대로 유지해야돼.
-        답변 양식: "['일정검색'] YYYY-MM-DD"
-        """
-        }
+        {'role': 'user', 'content': utterance}
     ]
 
     resp = client.chat.completions.create(
-    model="gpt-4o",
+    model=SCHEDULE_LLM_MODEL,
     messages=messages,
+    response_format={"type": "json_schema", "json_schema": SCHEDULE_REQUEST_SCHEMA},
     )
 
-    answer  = resp.choices[0].message.content.strip()
-
-    print(answer)
-
-
-    if "일정검색" in answer:
-        date = answer[-11:].strip()
-        # print(date)
-        # 일정이 궁금하면 opensearch schedule에서 검색
-        schedules = fetch_schedule(user_id, date)
-        print(schedules)
-        if schedules == []:
-            answer = "일정이 없습니다"
-            return answer
+    request = json.loads(resp.choices[0].message.content)
+    dt.date.fromisoformat(request['date'])  # 형식이 틀리면 ValueError
+    if request['action'] == 'lookup':
+        request['end_date'] = request['end_date'] or request['date']
+    if request['action'] == 'upcoming':
+        request['time'] = now.strftime('%H:%M')
+        request['limit'] = request['limit'] or 1
+    return request
 
-        answer = f"{schedules[0]['date']} {schedules[0]['time']} 일정은 {schedules[0]['text']}입니다."
+def generate_schedule_answer(user_id, utterance):
+    """
+    일정 발화에 대한 (Kakao 응답 body, 대화 기록용 답변 text)
+    - 저장: 저장 결과 (인터벌 인덱스가 켜져 있으면 시간이 겹치는 일정도 알려줌)
+    - 조회/다음 일정: 해당하는 일정 전부를 리스트 카드로
+    """
+    nowtime = datetime.datetime.now()
 
-        return answer
+    # 흔한 표현(오늘/내일/다음 주 화요일/오후 7시 ...)은 로컬에서 바로 파싱하고, 실패할 때만 LLM 호출
+    request = parse_schedule_request(utterance, nowtime) if SCHEDULE_LOCAL_PARSER_ENABLED else None
+    source = 'local'
+    if request is None:
+        request = parse_schedule_with_llm(utterance, nowtime)
+        source = 'llm'
+    print(f"[Schedule] Parsed ({source}): {request}")
 
-    
-    else: # opensearch schedule 문서에 해당 일정 저장
+    if request['action'] == 'save': # opensearch schedule 문서에 해당 일정 저장
         doc = {
             'user_id': user_id,
-            'date': answer[-16:-6],
-            'time': answer[-6:],
-            'text':answer[1:-18],        
+            'date': request['date'],
+            'time': request['time'] or '',
+            'text': request['title'],
             'timestamp': dt.datetime.now().isoformat() # 현재 시간을 isoformat으로 저장
         }
         doc_id = shortuuid.uuid() # doc의 uuid 생성
 
-        resp = requests.put(
-            url = f"{OPENSEARCH_URL}/schedule/_doc/{doc_id}",
-            data = json.dumps(doc),
-            headers = OPENSEARCH_HEADERS,
-            auth = OPENSEARCH_AUTH,
-        )
-
-        answer = f"다음 일정을 저장했습니다. {answer}"
-        return answer
-
-    assert resp.status_code // 100 == 2  # 성공 상태 코드 확인
-
-
-
-    # print(resp)
-
-
-
-
-
-
-
-
-
-
+        conflicts = schedule_index.overlaps(user_id, *schedule_interval(doc)) if schedule_index.enabled else []
+
+        resp = opensearch.put(f"schedule/_doc/{doc_id}", doc)
+        assert resp.status_code // 100 == 2  # 성공 상태 코드 확인
+        if schedule_index.enabled:
+            schedule_index.note_save(user_id, doc)
+
+        answer = f"다음 일정을 저장했습니다. [{doc['text']}] {doc['date']} {doc['time']}".strip()
+        if conflicts:
+            answer += "\n같은 시간에 다른 일정이 있어요: " + ", ".join(f"[{x['text']}] {describe_schedule(x)}" for x in conflicts)
+        return text_body(answer), answer
+
+    # 일정이 궁금하면 인터벌 인덱스 -> (꺼져 있거나 범위 밖이면) opensearch schedule에서 검색
+    schedules = None
+    if request['action'] == 'upcoming':
+        title = "다가오는 일정"
+        if schedule_index.enabled:
+            schedules = schedule_index.upcoming(user_id, nowtime, request['limit'])
+        if schedules is None:
+            schedules = fetch_upcoming_schedules(user_id, nowtime, request['limit'])
+    else:
+        start, end = request['date'], request['end_date'] or request['date']
+        title = f"{start} ~ {end} 일정" if start != end else f"{start} 일정"
+        if schedule_index.enabled:
+            schedules = schedule_index.between(user_id, dt.date.fromisoformat(start), dt.date.fromisoformat(end), nowtime.date())
+        if schedules is None:
+            schedules = fetch_schedules(user_id, start, end)
+        schedules = schedules[:SCHEDULE_MAX_RESULTS]
+
+    if not schedules:
+        answer = f"{title}이 없습니다"
+    else:
+        answer = f"{title}: " + ", ".join(f"{describe_schedule(x)} {x['text']}" for x in schedules)
+    return schedule_list_body(title, schedules), answer
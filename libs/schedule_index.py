@@ -0,0 +1,178 @@
+from typing import Dict, List, Optional, Tuple
+from collections import OrderedDict
+import bisect
+import datetime as dt
+import threading
+import time
+
+from config import (
+    SCHEDULE_INDEX_ENABLED,
+    SCHEDULE_INDEX_TTL_SECONDS,
+    SCHEDULE_INDEX_PAST_DAYS,
+    SCHEDULE_INDEX_MAX_USERS,
+    SCHEDULE_INDEX_MAX_EVENTS,
+    SCHEDULE_DEFAULT_DURATION_MINUTES,
+)
+from libs.opensearch_client import opensearch
+
+SCHEDULE_FIELDS = ["date", "time", "text", "timestamp"]
+
+# Longest interval a schedule can cover (all-day); bounds the overlap scan
+MAX_INTERVAL = dt.timedelta(days=1)
+
+##############################################
+# 사용자별 일정 인터벌 인덱스
+# --------------------------------------------
+# - 사용자의 일정(최근 SCHEDULE_INDEX_PAST_DAYS일 이후)을 한 번 가져와 시작 시각 순으로 보관
+# - "다음 일정", 기간 조회, 시간 겹침 확인을 OpenSearch 왕복 없이 bisect로 처리
+# - SCHEDULE_INDEX_TTL_SECONDS가 지나면 다시 가져와서 다른 컨테이너의 저장도 반영
+##############################################
+
+def search_schedules(client, index: str, query: Dict) -> List[Dict]:
+    """_source of the hits; a 400 (sorting on a legacy text `time`) points at the schema migration"""
+    resp = client.get(f"{index}/_search", query)
+    if resp.status_code == 400:
+        raise RuntimeError(
+            f"[Schedule] {index} search rejected: date/time sorting needs the schema/schedule.json mapping "
+            f"(run `python scripts/manage_schema.py apply --index schedule --migrate-existing`): {resp.text[:300]}"
+        )
+    assert resp.status_code == 200
+    return [hit['_source'] for hit in resp.json()['hits']['hits']]
+
+def schedule_interval(doc: Dict, default_minutes: int = SCHEDULE_DEFAULT_DURATION_MINUTES) -> Tuple[dt.datetime, dt.datetime]:
+    """(start, end) of a schedule document; without a time it covers the whole day"""
+    day = dt.date.fromisoformat(doc['date'][:10])
+    try:
+        clock = dt.time.fromisoformat((doc.get('time') or '').strip())
+    except ValueError:  # 시간이 없거나 예전 LLM 답변에서 잘못 잘린 값
+        start = dt.datetime.combine(day, dt.time.min)
+        return start, start + MAX_INTERVAL
+    start = dt.datetime.combine(day, clock)
+    return start, start + dt.timedelta(minutes=default_minutes)
+
+class _UserSchedules:
+    def __init__(self, loaded_from: dt.date, docs: List[Dict], complete: bool):
+        self.loaded_at = time.monotonic()
+        self.loaded_from = loaded_from
+        # max_events에 걸려 잘렸으면 마지막으로 가져온 날짜까지만 믿을 수 있음
+        self.loaded_until = None if complete or not docs else dt.date.fromisoformat(docs[-1]['date'][:10])
+        self.starts: List[dt.datetime] = []  # 정렬된 시작 시각 (events와 같은 순서)
+        self.events: List[Tuple[dt.datetime, dt.datetime, Dict]] = []
+        for doc in docs:
+            self.add(doc)
+
+    def add(self, doc: Dict) -> None:
+        start, end = schedule_interval(doc)
+        i = bisect.bisect_right(self.starts, start)
+        self.starts.insert(i, start)
+        self.events.insert(i, (start, end, doc))
+
+class ScheduleIndex:
+    """
+    Per-user schedules sorted by start time, kept across warm invocations.
+    Queries reaching outside the loaded window return None so the caller can
+    ask OpenSearch instead.
+    """
+
+    def __init__(
+        self,
+        index: str = 'schedule',
+        enabled: bool = SCHEDULE_INDEX_ENABLED,
+        ttl_seconds: float = SCHEDULE_INDEX_TTL_SECONDS,
+        past_days: int = SCHEDULE_INDEX_PAST_DAYS,
+        max_users: int = SCHEDULE_INDEX_MAX_USERS,
+        max_events: int = SCHEDULE_INDEX_MAX_EVENTS,
+        client=opensearch,
+    ):
+        self.index = index
+        self.enabled = enabled
+        self.ttl_seconds = ttl_seconds
+        self.past_days = past_days
+        self.max_users = max_users
+        self.max_events = max_events
+        self.client = client
+        self._users: "OrderedDict[str, _UserSchedules]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.loads = 0
+        self.lookups = 0
+
+    def _load(self, user_id: str, loaded_from: dt.date) -> List[Dict]:
+        query = {
+            "query": {
+                "bool": {
+                    "filter": [
+                        {"term": {"user_id": user_id}},
+                        {"range": {"date": {"gte": loaded_from.isoformat()}}}
+                    ]
+                }
+            },
+            "sort": [{"date": {"order": "asc"}}, {"time": {"order": "asc"}}],
+            "_source": SCHEDULE_FIELDS,
+            "size": self.max_events,
+        }
+        return search_schedules(self.client, self.index, query)
+
+    def _entry(self, user_id: str, today: dt.date) -> _UserSchedules:
+        with self._lock:
+            entry = self._users.get(user_id)
+            self.lookups += 1
+        if entry is None or time.monotonic() - entry.loaded_at > self.ttl_seconds:
+            loaded_from = today - dt.timedelta(days=self.past_days)
+            docs = self._load(user_id, loaded_from)
+            entry = _UserSchedules(loaded_from, docs, complete=len(docs) < self.max_events)
+            with self._lock:
+                self.loads += 1
+                self._users[user_id] = entry
+        with self._lock:
+            self._users.move_to_end(user_id)
+            while len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+        return entry
+
+    def between(self, user_id: str, start: dt.date, end: dt.date, today: Optional[dt.date] = None) -> Optional[List[Dict]]:
+        """Schedules from start to end (inclusive days) in time order, or None if the range isn't fully loaded"""
+        entry = self._entry(user_id, today or dt.date.today())
+        if start < entry.loaded_from or (entry.loaded_until and end >= entry.loaded_until):
+            return None
+        lo = bisect.bisect_left(entry.starts, dt.datetime.combine(start, dt.time.min))
+        hi = bisect.bisect_left(entry.starts, dt.datetime.combine(end + dt.timedelta(days=1), dt.time.min))
+        return [doc for _, _, doc in entry.events[lo:hi]]
+
+    def upcoming(self, user_id: str, now: dt.datetime, limit: int) -> Optional[List[Dict]]:
+        """The next `limit` schedules that haven't ended yet (today's all-day schedules included), or None if unsure"""
+        entry = self._entry(user_id, now.date())
+        i = bisect.bisect_left(entry.starts, now - MAX_INTERVAL)
+        results = []
+        for start, end, doc in entry.events[i:]:
+            if end > now and (start >= now or start.time() == dt.time.min and end - start == MAX_INTERVAL):
+                results.append(doc)
+                if len(results) == limit:
+                    return results
+        return None if entry.loaded_until else results
+
+    def overlaps(self, user_id: str, start: dt.datetime, end: dt.datetime) -> List[Dict]:
+        """Schedules whose interval intersects [start, end)"""
+        entry = self._entry(user_id, start.date())
+        lo = bisect.bisect_left(entry.starts, start - MAX_INTERVAL)
+        hi = bisect.bisect_left(entry.starts, end)
+        return [doc for s, e, doc in entry.events[lo:hi] if e > start and s < end]
+
+    def note_save(self, user_id: str, doc: Dict) -> None:
+        """Make a schedule we just wrote visible before OpenSearch refreshes"""
+        with self._lock:
+            entry = self._users.get(user_id)
+            if entry is not None and dt.date.fromisoformat(doc['date'][:10]) >= entry.loaded_from:
+                entry.add(doc)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'users': len(self._users),
+                'events': sum(len(entry.events) for entry in self._users.values()),
+                'loads': self.loads,
+                'lookups': self.lookups,
+            }
+
+# Singleton instance shared by the schedule handlers
+schedule_index = ScheduleIndex()
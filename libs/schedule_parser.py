@@ -0,0 +1,295 @@
+from typing import Dict, Optional, Tuple
+import datetime as dt
+import re
+
+##############################################
+# 로컬 일정 파서
+# --------------------------------------------
+# 일정 발화에서 (저장/조회, 일정 이름, 날짜, 시간)을 정규식으로 추출
+# - 날짜: 오늘/내일/모레, (이번/다음/지난) 주 O요일, 3일 뒤, 3월 5일, 2024-03-05 ...
+# - 시간: 오후 7시, 3시 반, 10시 20분, 14:30, 정오/자정 ...
+# - 조회 범위: 이번 주, 다음 달, 3월, 주말, 앞으로 3일 / 다음 일정, 앞으로 일정 3개
+# 확신할 수 없는 발화는 None을 돌려주고 LLM(structured output)이 처리
+##############################################
+
+# Optional particle after a date/time expression ("3시에", "내일은", "금요일까지")
+_PARTICLE = r'(?:(?:에는|에|엔|은|는|부터|까지)(?![가-힣]))?'
+
+KOREAN_NUMBERS = {
+    '한': 1, '두': 2, '세': 3, '네': 4, '다섯': 5, '여섯': 6, '일곱': 7, '여덟': 8,
+    '아홉': 9, '열': 10, '열한': 11, '열두': 12,
+}
+_NUMBER = r'\d{1,2}|열한|열두|다섯|여섯|일곱|여덟|아홉|열|한|두|세|네'
+
+WEEKDAYS = {'월': 0, '화': 1, '수': 2, '목': 3, '금': 4, '토': 5, '일': 6}
+
+RELATIVE_DAYS = {'그저께': -2, '그제': -2, '어제': -1, '오늘': 0, '금일': 0, '내일': 1, '낼': 1, '모레': 2, '글피': 3}
+
+WEEK_OFFSETS = [
+    (re.compile(r'다다음'), 2),
+    (re.compile(r'다음|담|차'), 1),
+    (re.compile(r'지난|저번'), -1),
+]
+
+ISO_DATE = re.compile(r'(\d{4})\s*[-./년]\s*(\d{1,2})\s*[-./월]\s*(\d{1,2})\s*일?' + _PARTICLE)
+MONTH_DAY = re.compile(r'(\d{1,2})\s*월\s*(\d{1,2})\s*일' + _PARTICLE)
+SLASH_DATE = re.compile(r'(?<![\d:])(\d{1,2})/(\d{1,2})(?![\d/])' + _PARTICLE)
+NATIVE_DAYS = {'이틀': 2, '사흘': 3, '나흘': 4}
+DAYS_LATER = re.compile(r'(?:(' + _NUMBER + r')\s*(일|주|달|개월)|(이틀|사흘|나흘))\s*(?:후|뒤)' + _PARTICLE)
+RELATIVE_MONTH_DAY = re.compile(r'(이번|다음|담|지난|저번)\s*달\s*(\d{1,2})\s*일' + _PARTICLE)
+WEEKDAY = re.compile(
+    r'(?:(이번|금|다다음|다음|담|차|지난|저번)\s*주\s*)?([월화수목금토일])요일' + _PARTICLE
+    + r'|(?:(이번|다다음|다음|지난|저번)\s*)?주말' + _PARTICLE
+)
+# 다른 단어 안의 '낼'/'금일'(보낼, 지금일)은 날짜가 아님
+RELATIVE_DAY = re.compile(r'(?<![가-힣])(' + '|'.join(sorted(RELATIVE_DAYS, key=len, reverse=True)) + r')' + _PARTICLE)
+
+MERIDIEM = r'(오전|아침|새벽|오후|낮|점심|저녁|밤)?\s*'
+CLOCK_TIME = re.compile(MERIDIEM + r'(\d{1,2}):(\d{2})' + _PARTICLE)
+HOUR_TIME = re.compile(MERIDIEM + r'(' + _NUMBER + r')\s*시(?!간)(?:\s*(반)|\s*(\d{1,2})\s*분)?' + _PARTICLE)
+NAMED_TIME = re.compile(r'(정오|자정)' + _PARTICLE)
+
+# Lookup ranges: a whole week/month, the weekend, or the next N days
+WEEK_RANGE = re.compile(r'(이번|금|다다음|다음|담|차|지난|저번)\s*주(?!\s*[월화수목금토일]요일|\s*말|\s*\d)' + _PARTICLE)
+MONTH_RANGE = re.compile(r'(?:(이번|다음|담|지난|저번)\s*달|(\d{1,2})\s*월)(?!\s*\d{1,2}\s*일)' + _PARTICLE)
+WEEKEND_RANGE = re.compile(r'(?:(이번|다다음|다음|지난|저번)\s*)?주말' + _PARTICLE)
+NEXT_DAYS = re.compile(r'앞으로\s*(' + _NUMBER + r')\s*(일|주)\s*(?:간|동안)?' + _PARTICLE)
+# Upcoming events regardless of date ("다음 일정 뭐야?", "앞으로 일정 3개 알려줘")
+UPCOMING = re.compile(r'다음\s*(?:일정|스케줄|약속)|앞으로|남은\s*(?:일정|스케줄|약속)|예정된|다가오는')
+UPCOMING_COUNT = re.compile(r'(' + _NUMBER + r')\s*(?:개|건|가지)')
+UPCOMING_DEFAULT = 5  # "앞으로 일정" without a count; "다음 일정" asks for one
+
+SAVE_PATTERN = re.compile(r'기억|저장|추가|등록|잡아|넣어|적어|메모|잊지|알림|리마인드|예약해')
+LOOKUP_PATTERN = re.compile(r'뭐|무슨|언제|몇\s*시|알려|보여|확인|궁금|검색|찾아|있나|있니|있었|있는지|\?')
+GENERIC_TITLES = ('일정', '스케줄')  # Not a schedule name on their own ("내일 일정 추가해줘")
+
+# Words left over once date, time and action are removed that aren't part of the schedule name
+TITLE_NOISE = re.compile(
+    r'(?:을|를)?\s*(?:기억|저장|추가|등록|메모)\s*(?:해|하)?\S*'
+    r'|(?:잡아|넣어|적어|알려)\S*'
+    r'|(?<=[가-힣])해\s*줘\S*'
+    r'|잊지\s*않게\S*'
+    r'|\s(?:좀|꼭)(?=\s|$)'
+    r'|(?:이|가)?\s*(?:있어요|있습니다|있음|있다|있어)\S*'
+    r'|(?<=\S)(?:이에요|예요|이야)(?=\s|$)'
+)
+
+def _number(text: str) -> int:
+    return int(text) if text.isdigit() else KOREAN_NUMBERS[text]
+
+def _monday(day: dt.date) -> dt.date:
+    return day - dt.timedelta(days=day.weekday())
+
+def _add_months(day: dt.date, months: int) -> dt.date:
+    month = day.month - 1 + months
+    year, month = day.year + month // 12, month % 12 + 1
+    for last in (31, 30, 29, 28):
+        try:
+            return dt.date(year, month, min(day.day, last))
+        except ValueError:
+            continue
+
+def _week_offset(word: Optional[str]) -> Optional[int]:
+    if not word:
+        return None
+    for pattern, offset in WEEK_OFFSETS:
+        if pattern.fullmatch(word):
+            return offset
+    return 0  # 이번/금
+
+def parse_date(text: str, today: dt.date) -> Optional[Tuple[dt.date, Tuple[int, int]]]:
+    """First date expression in text as (date, (start, end) of the match)"""
+    match = ISO_DATE.search(text)
+    if match:
+        try:
+            return dt.date(*map(int, match.groups())), match.span()
+        except ValueError:
+            return None
+
+    for pattern in (MONTH_DAY, SLASH_DATE):
+        match = pattern.search(text)
+        if match:
+            try:
+                return dt.date(today.year, int(match.group(1)), int(match.group(2))), match.span()
+            except ValueError:
+                return None
+
+    match = RELATIVE_MONTH_DAY.search(text)
+    if match:
+        offset = _week_offset(match.group(1))  # 이번/다음/지난은 주와 같은 규칙
+        first = _add_months(today.replace(day=1), offset)
+        try:
+            return first.replace(day=int(match.group(2))), match.span()
+        except ValueError:
+            return None
+
+    match = DAYS_LATER.search(text)
+    if match:
+        if match.group(3):
+            count, unit = NATIVE_DAYS[match.group(3)], '일'
+        else:
+            count, unit = _number(match.group(1)), match.group(2)
+        if unit == '일':
+            day = today + dt.timedelta(days=count)
+        elif unit == '주':
+            day = today + dt.timedelta(weeks=count)
+        else:
+            day = _add_months(today, count)
+        return day, match.span()
+
+    match = WEEKDAY.search(text)
+    if match:
+        if match.group(2):
+            offset, weekday = _week_offset(match.group(1)), WEEKDAYS[match.group(2)]
+        else:
+            offset, weekday = _week_offset(match.group(3)), 5  # 주말은 토요일
+        if offset is None:
+            # "금요일" 같이 주가 없으면 오늘부터 가장 가까운 그 요일
+            day = today + dt.timedelta(days=(weekday - today.weekday()) % 7)
+        else:
+            day = _monday(today) + dt.timedelta(weeks=offset, days=weekday)
+        return day, match.span()
+
+    match = RELATIVE_DAY.search(text)
+    if match:
+        return today + dt.timedelta(days=RELATIVE_DAYS[match.group(1)]), match.span()
+    return None
+
+def parse_range(text: str, today: dt.date) -> Optional[Tuple[dt.date, dt.date]]:
+    """Date range (first, last day inclusive) of a week/month/weekend/next-N-days expression"""
+    match = NEXT_DAYS.search(text)
+    if match:
+        days = _number(match.group(1)) * (7 if match.group(2) == '주' else 1)
+        return today, today + dt.timedelta(days=days - 1)
+
+    match = WEEKEND_RANGE.search(text)
+    if match:
+        offset = _week_offset(match.group(1)) or 0
+        saturday = _monday(today) + dt.timedelta(weeks=offset, days=5)
+        return saturday, saturday + dt.timedelta(days=1)
+
+    match = WEEK_RANGE.search(text)
+    if match:
+        monday = _monday(today) + dt.timedelta(weeks=_week_offset(match.group(1)))
+        return monday, monday + dt.timedelta(days=6)
+
+    match = MONTH_RANGE.search(text)
+    if match:
+        if match.group(1):
+            first = _add_months(today.replace(day=1), _week_offset(match.group(1)))
+        elif 1 <= int(match.group(2)) <= 12:
+            first = dt.date(today.year, int(match.group(2)), 1)
+        else:
+            return None
+        return first, _add_months(first, 1) - dt.timedelta(days=1)
+    return None
+
+def _to_24h(meridiem: Optional[str], hour: int) -> int:
+    if meridiem in ('오전', '아침', '새벽'):
+        return 0 if hour == 12 else hour
+    if meridiem == '밤' and hour == 12:
+        return 0
+    if meridiem in ('오후', '저녁', '밤') or (meridiem in ('낮', '점심') and hour < 6):
+        return hour + 12 if hour < 12 else hour
+    if meridiem is None and 1 <= hour <= 6:
+        # "3시 회의"처럼 오전/오후가 없으면 1~6시는 오후로 봄
+        return hour + 12
+    return hour
+
+def parse_time(text: str) -> Optional[Tuple[str, Tuple[int, int]]]:
+    """First time expression in text as ('HH:mm', (start, end) of the match)"""
+    match = CLOCK_TIME.search(text)
+    if match:
+        hour, minute = int(match.group(2)), int(match.group(3))
+        if hour > 23 or minute > 59:
+            return None
+        return f"{_to_24h(match.group(1), hour) if hour <= 12 else hour:02d}:{minute:02d}", match.span()
+
+    match = HOUR_TIME.search(text)
+    if match:
+        hour = _number(match.group(2))
+        minute = 30 if match.group(3) else int(match.group(4) or 0)
+        if hour > 24 or minute > 59:
+            return None
+        hour = 0 if hour == 24 else _to_24h(match.group(1), hour) if hour <= 12 else hour
+        return f"{hour:02d}:{minute:02d}", match.span()
+
+    match = NAMED_TIME.search(text)
+    if match:
+        return ('12:00' if match.group(1) == '정오' else '00:00'), match.span()
+    return None
+
+def _remove_spans(text: str, spans) -> str:
+    for start, end in sorted(spans, reverse=True):
+        text = text[:start] + ' ' + text[end:]
+    return text
+
+def extract_title(text: str) -> str:
+    title = TITLE_NOISE.sub(' ', f' {text} ')
+    return re.sub(r'\s+', ' ', re.sub(r'[?!.~,]', ' ', title)).strip()
+
+def parse_schedule_request(utterance: str, now: Optional[dt.datetime] = None) -> Optional[Dict]:
+    """
+    Parse a schedule utterance into
+    {'action': 'save' | 'lookup' | 'upcoming', 'title': str, 'date': 'YYYY-MM-DD',
+     'end_date': 'YYYY-MM-DD' | None, 'time': 'HH:mm' | None, 'limit': int | None}:
+    - save: one schedule named title on date (at time)
+    - lookup: every schedule from date to end_date (inclusive)
+    - upcoming: the next `limit` schedules from date/time (now) on
+    or None when it can't be parsed with confidence (no date or time, no schedule
+    name to save, or both save and lookup cues).
+    """
+    now = now or dt.datetime.now()
+    text = re.sub(r'\s+', ' ', utterance).strip().replace('일주일', '1주')
+    save, lookup = SAVE_PATTERN.search(text), LOOKUP_PATTERN.search(text)
+
+    if lookup and not save:
+        # 조회는 하루가 아니라 기간이나 "다음 일정"일 수 있음
+        span = parse_range(text, now.date())
+        if span is not None:
+            return {'action': 'lookup', 'title': '', 'date': span[0].isoformat(), 'end_date': span[1].isoformat(),
+                    'time': None, 'limit': None}
+        if UPCOMING.search(text) and parse_date(text, now.date()) is None:
+            count = UPCOMING_COUNT.search(text)
+            limit = _number(count.group(1)) if count else (1 if re.search(r'다음\s*(?:일정|스케줄|약속)', text) else UPCOMING_DEFAULT)
+            return {'action': 'upcoming', 'title': '', 'date': now.date().isoformat(), 'end_date': None,
+                    'time': now.strftime('%H:%M'), 'limit': limit}
+
+    date = parse_date(text, now.date())
+    rest = _remove_spans(text, [date[1]]) if date else text
+    time = parse_time(rest)
+    if time is not None:
+        rest = _remove_spans(rest, [time[1]])
+    if date is None:
+        if time is None:
+            return None
+        # 날짜 없이 시간만 있으면 다가오는 그 시각 ("3시 반에 회의" -> 오늘, 이미 지났으면 내일)
+        day = now.date() if time[0] > now.strftime('%H:%M') else now.date() + dt.timedelta(days=1)
+    else:
+        day = date[0]
+
+    title = extract_title(rest)
+    if save and lookup:
+        return None
+    if save or (not lookup and time is not None and title and title not in GENERIC_TITLES):
+        action = 'save'
+        if not title or title in GENERIC_TITLES:
+            # "내일 일정 추가해줘"처럼 이름 없이 저장하라는 말은 무엇을 저장할지 LLM에 맡김
+            return None
+        if day < now.date() and not ISO_DATE.search(text) and (MONTH_DAY.search(text) or SLASH_DATE.search(text)):
+            # 연도 없이 지난 날짜를 저장하면 내년 일정 (내년에 2월 29일이 없으면 2월 28일)
+            try:
+                day = day.replace(year=day.year + 1)
+            except ValueError:
+                day = day.replace(year=day.year + 1, day=28)
+    else:
+        action = 'lookup'
+
+    return {
+        'action': action,
+        'title': title if action == 'save' else '',
+        'date': day.isoformat(),
+        'end_date': None if action == 'save' else day.isoformat(),
+        'time': time[0] if time else None,
+        'limit': None,
+    }
@@ -0,0 +1,124 @@
+from typing import Any, Iterable, Optional, Tuple
+import sqlite3
+import threading
+import time
+
+##############################################
+# SQLite 파일 하나에 저장하는 작은 key-value 캐시 계층
+# --------------------------------------------
+# - TranslationCache, EmbeddingService의 디스크 계층이 같이 사용
+#   (Lambda에서는 /tmp에 두어 warm 컨테이너 재사용 동안 유지)
+# - 행은 (namespace, key, value, created_at), namespace로 모델별 값을 분리
+# - 읽기/쓰기 실패(읽기 전용, 디스크 가득 참, 깨진 파일)는 캐시 miss로 처리
+##############################################
+
+class SQLiteKV:
+    """
+    Bounded key-value table in a SQLite file, used as the disk level of the
+    in-process caches. Entries older than `ttl_seconds` (if set) are misses,
+    and every TRIM_INTERVAL writes expired rows and the oldest rows beyond
+    `max_entries` are deleted. SQLite errors are printed and never raised.
+    """
+
+    # Trim the table every N written rows instead of on every write
+    TRIM_INTERVAL = 100
+
+    def __init__(
+        self,
+        path: str,
+        table: str,
+        namespace: str,
+        max_entries: int,
+        ttl_seconds: Optional[float] = None,
+        log_name: str = 'SQLiteKV',
+    ):
+        self.table = table
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.log_name = log_name
+        self._lock = threading.Lock()
+        self._writes = 0
+
+        try:
+            self.conn: Optional[sqlite3.Connection] = sqlite3.connect(path, check_same_thread=False)
+            self.conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} ("
+                "namespace TEXT, key TEXT, value, created_at REAL, "
+                "PRIMARY KEY (namespace, key))"
+            )
+            self.conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_created_at ON {table} (created_at)")
+            self.conn.commit()
+        except sqlite3.Error as e:
+            # A read-only or full filesystem only costs us the disk level
+            print(f"[{log_name}] Disk cache disabled: {str(e)}")
+            self.conn = None
+
+    @property
+    def available(self) -> bool:
+        return self.conn is not None
+
+    def _is_expired(self, created_at: float) -> bool:
+        return self.ttl_seconds is not None and time.time() - created_at > self.ttl_seconds
+
+    def get(self, key: str) -> Optional[Tuple[Any, float]]:
+        """(value, created_at) for key, or None on a miss, an expired row or a read error"""
+        if self.conn is None:
+            return None
+        try:
+            with self._lock:
+                row = self.conn.execute(
+                    f"SELECT value, created_at FROM {self.table} WHERE namespace = ? AND key = ?",
+                    (self.namespace, key),
+                ).fetchone()
+        except sqlite3.Error as e:
+            # A corrupt or locked cache file is a miss, not a failed request
+            print(f"[{self.log_name}] Disk read failed: {str(e)}")
+            return None
+        if row is None or self._is_expired(row[1]):
+            return None
+        return row[0], row[1]
+
+    def put_many(self, items: Iterable[Tuple[str, Any]], created_at: Optional[float] = None) -> None:
+        """Insert or replace (key, value) rows in one transaction"""
+        if self.conn is None:
+            return
+        created_at = time.time() if created_at is None else created_at
+        rows = [(self.namespace, key, value, created_at) for key, value in items]
+        try:
+            with self._lock:
+                self.conn.executemany(
+                    f"INSERT OR REPLACE INTO {self.table} (namespace, key, value, created_at) VALUES (?, ?, ?, ?)",
+                    rows,
+                )
+                self._writes += len(rows)
+                if self._writes >= self.TRIM_INTERVAL:
+                    self._writes = 0
+                    self._trim()
+                self.conn.commit()
+        except sqlite3.Error as e:
+            print(f"[{self.log_name}] Disk write failed: {str(e)}")
+
+    def put(self, key: str, value: Any, created_at: Optional[float] = None) -> None:
+        self.put_many([(key, value)], created_at)
+
+    def _trim(self) -> None:
+        """Drop expired rows, then the oldest rows beyond max_entries"""
+        if self.ttl_seconds is not None:
+            self.conn.execute(f"DELETE FROM {self.table} WHERE created_at < ?", (time.time() - self.ttl_seconds,))
+        self.conn.execute(
+            f"DELETE FROM {self.table} WHERE rowid IN ("
+            f"SELECT rowid FROM {self.table} ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+
+    def clear(self) -> None:
+        """Delete this namespace's rows"""
+        if self.conn is None:
+            return
+        try:
+            with self._lock:
+                self.conn.execute(f"DELETE FROM {self.table} WHERE namespace = ?", (self.namespace,))
+                self.conn.commit()
+        except sqlite3.Error as e:
+            print(f"[{self.log_name}] Disk clear failed: {str(e)}")
@@ -0,0 +1,43 @@
+from typing import Callable, Dict
+from contextlib import contextmanager
+import threading
+import time
+
+class StageTimer:
+    """Wall-clock durations of the stages of one request; stages may overlap across threads"""
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _record(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    @contextmanager
+    def stage(self, name: str):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._record(name, time.perf_counter() - t0)
+
+    def wrap(self, name: str, fn: Callable, *args, **kwargs) -> Callable:
+        """Return a no-argument callable (for an executor) that times fn(*args, **kwargs)"""
+        def timed():
+            with self.stage(name):
+                return fn(*args, **kwargs)
+        return timed
+
+    def report(self) -> Dict[str, float]:
+        """
+        Milliseconds per stage, plus 'serial' (what the work stages would take back
+        to back; 'wait_*' stages are excluded) and 'total' (elapsed so far).
+        """
+        with self._lock:
+            report = {name: round(seconds * 1000, 1) for name, seconds in self.stages.items()}
+            serial = sum(seconds for name, seconds in self.stages.items() if not name.startswith('wait_'))
+        report['serial'] = round(serial * 1000, 1)
+        report['total'] = round((time.perf_counter() - self.started_at) * 1000, 1)
+        return report
@@ -0,0 +1,32 @@
+from typing import List
+
+# Chat APIs add a few tokens of framing (role, separators) per message
+MESSAGE_OVERHEAD_TOKENS = 4
+
+def estimate_tokens(text: str) -> int:
+    """
+    Fast local token estimate without a tokenizer: about 4 ASCII characters per
+    token, and about one token per non-ASCII character (Hangul syllables).
+    """
+    ascii_chars = len(text.encode('ascii', 'ignore'))
+    return (ascii_chars + 3) // 4 + (len(text) - ascii_chars)
+
+def truncate_to_tokens(text: str, max_tokens: int, marker: str = '…') -> str:
+    """Cut text so estimate_tokens(result) <= max_tokens, keeping the beginning and appending marker"""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    budget = (max_tokens - estimate_tokens(marker)) * 4  # 토큰 1개 = ASCII 4자 = 한글 1자(4)로 계산
+    for end, char in enumerate(text):
+        budget -= 1 if char.isascii() else 4
+        if budget < 0:
+            return text[:end].rstrip() + marker
+    return text
+
+def pack_newest_first(texts: List[str], budget: int, overhead: int = MESSAGE_OVERHEAD_TOKENS) -> int:
+    """Return the index of the oldest text such that texts[index:] fits in budget"""
+    used = 0
+    for index in range(len(texts) - 1, -1, -1):
+        used += estimate_tokens(texts[index]) + overhead
+        if used > budget:
+            return index + 1
+    return 0
@@ -0,0 +1,126 @@
+from typing import Dict, Optional
+from collections import OrderedDict
+import re
+import threading
+import time
+import unicodedata
+
+from config import (
+    TRANSLATION_CACHE_ENABLED,
+    TRANSLATION_CACHE_MAX_ENTRIES,
+    TRANSLATION_CACHE_TTL_SECONDS,
+    TRANSLATION_CACHE_DISK_PATH,
+    TRANSLATION_CACHE_DISK_MAX_ENTRIES,
+)
+from libs.sqlite_kv import SQLiteKV
+
+def normalize_text(text: str) -> str:
+    """Normalize text so trivially different utterances share a cache entry"""
+    text = unicodedata.normalize('NFC', text)
+    return re.sub(r'\s+', ' ', text).strip()
+
+class TranslationCache:
+    """
+    Two-level translation cache.
+
+    1) In-process LRU (OrderedDict) for the current container
+    2) Optional SQLite store on disk (under /tmp on Lambda) that survives
+       warm reuse of the container and is shared by handlers in it
+
+    Both levels expire entries after `ttl_seconds` and are bounded in size.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        enabled: bool = TRANSLATION_CACHE_ENABLED,
+        max_entries: int = TRANSLATION_CACHE_MAX_ENTRIES,
+        ttl_seconds: float = TRANSLATION_CACHE_TTL_SECONDS,
+        disk_path: Optional[str] = TRANSLATION_CACHE_DISK_PATH,
+        disk_max_entries: int = TRANSLATION_CACHE_DISK_MAX_ENTRIES,
+    ):
+        # namespace keeps translations of different models apart on disk
+        self.namespace = namespace
+        self.enabled = enabled
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.disk_max_entries = disk_max_entries
+
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk: Optional[SQLiteKV] = None
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if enabled and disk_path:
+            disk = SQLiteKV(disk_path, 'translations', namespace, disk_max_entries, ttl_seconds, log_name='TranslationCache')
+            self._disk = disk if disk.available else None
+
+    def _is_expired(self, created_at: float) -> bool:
+        return time.time() - created_at > self.ttl_seconds
+
+    def get(self, text: str) -> Optional[str]:
+        """Return the cached translation for text, or None on a miss"""
+        if not self.enabled:
+            return None
+        key = normalize_text(text)
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                value, created_at = entry
+                if not self._is_expired(created_at):
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    return value
+                del self._memory[key]
+
+            row = self._disk.get(key) if self._disk is not None else None
+            if row is not None:
+                self._remember(key, row[0], row[1])
+                self.disk_hits += 1
+                return row[0]
+
+            self.misses += 1
+            return None
+
+    def set(self, text: str, translation: str) -> None:
+        """Store a translation in both cache levels"""
+        if not self.enabled:
+            return
+        key = normalize_text(text)
+        created_at = time.time()
+
+        with self._lock:
+            self._remember(key, translation, created_at)
+            if self._disk is not None:
+                self._disk.put(key, translation, created_at)
+
+    def _remember(self, key: str, value: str, created_at: float) -> None:
+        self._memory[key] = (value, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def clear(self) -> None:
+        """Empty both levels and reset the counters"""
+        with self._lock:
+            self._memory.clear()
+            if self._disk is not None:
+                self._disk.clear()
+            self.memory_hits = self.disk_hits = self.misses = 0
+
+    def stats(self) -> Dict:
+        """Hit/miss counters for logging"""
+        hits = self.memory_hits + self.disk_hits
+        total = hits + self.misses
+        return {
+            'enabled': self.enabled,
+            'memory_hits': self.memory_hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'hit_rate': hits / total if total else 0.0,
+            'memory_size': len(self._memory),
+        }
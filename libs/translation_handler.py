@@ -1,14 +1,120 @@
-from typing import Dict, Tuple
+from typing import Dict, List, Optional, Tuple
+import os
 import re
-from transformers import MarianMTModel, MarianTokenizer
-from config import KOREAN_DETECTION_THRESHOLD, TRANSLATION_MODEL_NAME
+import threading
+from config import (
+    KOREAN_DETECTION_THRESHOLD,
+    TRANSLATION_MODEL_NAME,
+    TRANSLATION_BATCH_SIZE,
+    TRANSLATION_CHUNK_MAX_CHARS,
+    TRANSLATION_QUANTIZED,
+    TRANSLATION_QUANTIZED_MODEL_PATH,
+)
+from libs.translation_cache import TranslationCache
+
+# Whitespace after sentence-final punctuation, or a line break
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?。！？~])\s+|\n+')
+
+def split_into_chunks(text: str, max_chars: int = TRANSLATION_CHUNK_MAX_CHARS) -> List[str]:
+    """Split text at sentence boundaries into chunks of at most max_chars characters"""
+    pieces = []
+    for sentence in SENTENCE_BOUNDARY.split(text):
+        sentence = sentence.strip()
+        # A single sentence longer than a chunk is cut at the last space that fits
+        while len(sentence) > max_chars:
+            cut = sentence.rfind(' ', 0, max_chars + 1)
+            if cut <= 0:
+                cut = max_chars
+            pieces.append(sentence[:cut].strip())
+            sentence = sentence[cut:].strip()
+        if sentence:
+            pieces.append(sentence)
+
+    # Merge consecutive short sentences so short inputs stay a single chunk
+    chunks = []
+    for piece in pieces:
+        if chunks and len(chunks[-1]) + 1 + len(piece) <= max_chars:
+            chunks[-1] = f"{chunks[-1]} {piece}"
+        else:
+            chunks.append(piece)
+    return chunks
 
 class TranslationHandler:
-    def __init__(self):
-        # Initialize Korean to English translation model
+    def __init__(
+        self,
+        cache: Optional[TranslationCache] = None,
+        quantized: bool = TRANSLATION_QUANTIZED,
+        quantized_model_path: str = TRANSLATION_QUANTIZED_MODEL_PATH,
+        chunk_max_chars: int = TRANSLATION_CHUNK_MAX_CHARS,
+    ):
+        # Korean to English translation model is loaded lazily on first use,
+        # so importing this module does not pay for torch, the MarianMT modules
+        # or the weights (transformers itself is imported by langchain_core anyway)
         self.ko_en_model_name = TRANSLATION_MODEL_NAME
-        self.ko_en_tokenizer = MarianTokenizer.from_pretrained(self.ko_en_model_name)
-        self.ko_en_model = MarianMTModel.from_pretrained(self.ko_en_model_name)
+        self.ko_en_tokenizer = None
+        self.ko_en_model = None
+        self._load_lock = threading.Lock()
+        self.chunk_max_chars = chunk_max_chars
+        # Int8 dynamically quantized Linear layers for CPU-only Lambdas
+        self.quantized = quantized
+        self.quantized_model_path = quantized_model_path
+        # Repeated and historical utterances are served from the cache.
+        # Quantized outputs can differ slightly, so they get their own namespace
+        namespace = f"{self.ko_en_model_name}-int8" if quantized else self.ko_en_model_name
+        self.cache = cache if cache is not None else TranslationCache(namespace=namespace)
+
+    @property
+    def is_loaded(self) -> bool:
+        """Whether the MarianMT tokenizer and model are already in memory"""
+        return self.ko_en_model is not None
+
+    def _ensure_model(self) -> None:
+        """Import the MarianMT modules and load the model on first use"""
+        if self.ko_en_model is not None:
+            return
+        with self._load_lock:
+            if self.ko_en_model is not None:
+                return
+            from transformers import MarianMTModel, MarianTokenizer
+            self.ko_en_tokenizer = MarianTokenizer.from_pretrained(self.ko_en_model_name)
+            if self.quantized:
+                self.ko_en_model = self._load_quantized_model()
+            else:
+                self.ko_en_model = MarianMTModel.from_pretrained(self.ko_en_model_name)
+
+    def _load_quantized_model(self):
+        """
+        Quantize the model and load its int8 weights from local disk, saving them on first use.
+
+        Only the state_dict (tensors) is cached and read back with weights_only=True,
+        so a file in /tmp can't run code on load; any save/load error is a cache miss.
+        """
+        import torch
+        from transformers import MarianMTModel
+
+        model = MarianMTModel.from_pretrained(self.ko_en_model_name).eval()
+        model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+        if os.path.exists(self.quantized_model_path):
+            try:
+                model.load_state_dict(torch.load(self.quantized_model_path, weights_only=True))
+                return model
+            except Exception as e:
+                # e.g. written by another torch/transformers version; keep the fresh weights
+                print(f"[TranslationHandler] Ignoring quantized model cache: {str(e)}")
+
+        try:
+            # Write to a temp file first so concurrent cold starts never read a partial file
+            tmp_path = f"{self.quantized_model_path}.{os.getpid()}.tmp"
+            torch.save(model.state_dict(), tmp_path)
+            os.replace(tmp_path, self.quantized_model_path)
+        except Exception as e:
+            print(f"[TranslationHandler] Could not cache quantized model: {str(e)}")
+        return model
+
+    def warmup(self) -> None:
+        """Load the model ahead of the first request (e.g. on provisioned instances)"""
+        self._ensure_model()
 
     def detect_language(self, text: str) -> Tuple[bool, float]:
         """Detect if text contains Korean characters using regex"""
@@ -20,17 +126,75 @@ class TranslationHandler:
 
     def translate_to_english(self, text: str) -> str:
         """Translate Korean text to English using MarianMT"""
-        inputs = self.ko_en_tokenizer(text, return_tensors="pt", padding=True, truncation=True)
-        translated = self.ko_en_model.generate(**inputs)
-        return self.ko_en_tokenizer.decode(translated[0], skip_special_tokens=True)
+        return self._translate_many([text], TRANSLATION_BATCH_SIZE)[0]
+
+    def _translate_many(self, texts: List[str], batch_size: int) -> List[str]:
+        """
+        Translate Korean texts in padded mini-batches, one generate() per batch.
+
+        Long texts are split into sentence chunks first, so nothing is lost to
+        truncation and chunks of one text decode in parallel within a batch.
+        """
+        self._ensure_model()
+        chunks, owners = [], []
+        for owner, text in enumerate(texts):
+            for chunk in split_into_chunks(text, self.chunk_max_chars):
+                chunks.append(chunk)
+                owners.append(owner)
+
+        # Sorting by length keeps similarly sized chunks together, so less padding is decoded
+        order = sorted(range(len(chunks)), key=lambda i: len(chunks[i]))
+        translated_chunks = [None] * len(chunks)
+        for start in range(0, len(order), batch_size):
+            indices = order[start:start + batch_size]
+            batch = [chunks[i] for i in indices]
+            inputs = self.ko_en_tokenizer(batch, return_tensors="pt", padding=True, truncation=True)
+            translated = self.ko_en_model.generate(**inputs)
+            decoded = self.ko_en_tokenizer.batch_decode(translated, skip_special_tokens=True)
+            for i, text in zip(indices, decoded):
+                translated_chunks[i] = text
+
+        # Reassemble chunks in their original order
+        results = [[] for _ in texts]
+        for owner, text in zip(owners, translated_chunks):
+            results[owner].append(text)
+        return [' '.join(parts) for parts in results]
+
+    def translate_batch(self, texts: List[str], batch_size: int = TRANSLATION_BATCH_SIZE) -> List[Tuple[str, bool]]:
+        """Batched process_text: returns (text, was_translated) per input, in input order"""
+        results: List[Optional[Tuple[str, bool]]] = [None] * len(texts)
+        pending: Dict[str, List[int]] = {}  # Korean cache misses, deduplicated
+
+        for i, text in enumerate(texts):
+            is_korean, _ = self.detect_language(text)
+            if not is_korean:
+                results[i] = (text, False)
+                continue
+            cached = self.cache.get(text)
+            if cached is not None:
+                results[i] = (cached, True)
+            else:
+                pending.setdefault(text, []).append(i)
+
+        if pending:
+            misses = list(pending)
+            for text, translated in zip(misses, self._translate_many(misses, batch_size)):
+                self.cache.set(text, translated)
+                for i in pending[text]:
+                    results[i] = (translated, True)
+
+        return results
 
     def process_text(self, text: str) -> Tuple[str, bool]:
         """Process input text, translating if necessary"""
         is_korean, _ = self.detect_language(text)
         if is_korean:
-            translated = self.translate_to_english(text)
+            translated = self.cache.get(text)
+            if translated is None:
+                translated = self.translate_to_english(text)
+                self.cache.set(text, translated)
             return translated, True
         return text, False
 
-# Singleton instance
-translator = TranslationHandler() 
\ No newline at end of file
+# Singleton instance (cheap to create; the model loads on the first Korean text)
+translator = TranslationHandler()
@@ -0,0 +1,161 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+from functools import lru_cache
+from pathlib import Path
+import json
+
+import numpy as np
+
+from config import VECTOR_INDEX_PATH, VECTOR_INDEX_NPROBE
+
+##############################################
+# In-process vector index over the topics index
+# --------------------------------------------
+# Layout of an index directory:
+# - vectors.npy:   float32 (N, D), L2-normalized, memory-mapped on load
+# - docs.jsonl:    _source of each topic (without the embedding) plus _id
+# - ivf.npz:       optional IVF centroids and per-list offsets; vectors are
+#                  stored grouped by list so each list is a contiguous slice
+##############################################
+
+# Fields returned by semantic_search, same as its OpenSearch _source filter
+DOC_FIELDS = ["title", "summary", "sources"]
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+def spherical_kmeans(vectors: np.ndarray, nlist: int, iterations: int = 10, seed: int = 0) -> np.ndarray:
+    """Cluster unit vectors by cosine similarity; returns (nlist, D) unit centroids"""
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), size=nlist, replace=False)].copy()
+    for _ in range(iterations):
+        assign = np.argmax(vectors @ centroids.T, axis=1)
+        for c in range(nlist):
+            members = vectors[assign == c]
+            if len(members):
+                centroids[c] = members.sum(axis=0)
+            else:
+                # Re-seed empty lists with a random vector
+                centroids[c] = vectors[rng.integers(len(vectors))]
+        centroids = _normalize_rows(centroids)
+    return centroids.astype(np.float32)
+
+class LocalVectorIndex:
+    """
+    NumPy-backed kNN over topic embeddings (dot product on unit vectors, i.e.
+    cosine similarity). `exact` scans every vector; `ivf` only scans the
+    `nprobe` inverted lists whose centroids are closest to the query.
+    """
+
+    def __init__(
+        self,
+        vectors: np.ndarray,
+        docs: List[Dict],
+        centroids: Optional[np.ndarray] = None,
+        offsets: Optional[np.ndarray] = None,
+    ):
+        self.vectors = vectors
+        self.docs = docs
+        self.centroids = centroids
+        self.offsets = offsets
+
+    @classmethod
+    def from_records(
+        cls,
+        records: Iterable[Dict],
+        nlist: int = 0,
+        seed: int = 0,
+        dimensions: Optional[int] = None,
+    ) -> "LocalVectorIndex":
+        """
+        Build from topics documents: OpenSearch hits ({'_id', '_source'}) or plain
+        _source dicts, each with an `embed` vector. `dimensions` keeps only the
+        leading components (text-embedding-3 vectors stay usable when shortened).
+        """
+        vectors, docs = [], []
+        for record in records:
+            source = dict(record.get('_source', record))
+            vectors.append(np.asarray(source.pop('embed'), dtype=np.float32))
+            doc = {field: source.get(field) for field in DOC_FIELDS}
+            doc['_id'] = record.get('_id', source.get('_id'))
+            docs.append(doc)
+        vectors = np.stack(vectors)
+        if dimensions:
+            vectors = vectors[:, :dimensions]
+        index = cls(_normalize_rows(vectors).astype(np.float32), docs)
+        if nlist:
+            index.build_ivf(nlist, seed=seed)
+        return index
+
+    def build_ivf(self, nlist: int, iterations: int = 10, seed: int = 0) -> None:
+        """Cluster the vectors into nlist inverted lists and regroup storage by list"""
+        vectors = np.asarray(self.vectors)
+        centroids = spherical_kmeans(vectors, nlist, iterations, seed)
+        assign = np.argmax(vectors @ centroids.T, axis=1)
+        order = np.argsort(assign, kind='stable')
+        self.vectors = np.ascontiguousarray(vectors[order])
+        self.docs = [self.docs[i] for i in order]
+        self.centroids = centroids
+        self.offsets = np.concatenate([[0], np.cumsum(np.bincount(assign, minlength=nlist))]).astype(np.int64)
+
+    def save(self, path: str) -> None:
+        out = Path(path)
+        out.mkdir(parents=True, exist_ok=True)
+        np.save(out / 'vectors.npy', np.asarray(self.vectors, dtype=np.float32))
+        with open(out / 'docs.jsonl', 'w', encoding='utf-8') as f:
+            for doc in self.docs:
+                f.write(json.dumps(doc, ensure_ascii=False) + '\n')
+        if self.centroids is not None:
+            np.savez(out / 'ivf.npz', centroids=self.centroids, offsets=self.offsets)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "LocalVectorIndex":
+        """Load an index directory; vectors are memory-mapped so startup doesn't read them all"""
+        src = Path(path)
+        vectors = np.load(src / 'vectors.npy', mmap_mode='r' if mmap else None)
+        with open(src / 'docs.jsonl', encoding='utf-8') as f:
+            docs = [json.loads(line) for line in f]
+        centroids = offsets = None
+        if (src / 'ivf.npz').exists():
+            ivf = np.load(src / 'ivf.npz')
+            centroids, offsets = ivf['centroids'], ivf['offsets']
+        return cls(vectors, docs, centroids, offsets)
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    @staticmethod
+    def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        return top[np.argsort(-scores[top])]
+
+    def search(self, query: np.ndarray, k: int = 2, mode: str = 'exact', nprobe: int = VECTOR_INDEX_NPROBE) -> List[Tuple[int, float]]:
+        """Return [(position, score)] of the k most similar vectors, best first"""
+        query = np.asarray(query, dtype=np.float32)
+        query = query / (np.linalg.norm(query) or 1.0)
+
+        if mode == 'exact' or self.centroids is None:
+            scores = self.vectors @ query
+            return [(int(i), float(scores[i])) for i in self._top_k(scores, k)]
+
+        if mode != 'ivf':
+            raise ValueError(f"Unknown vector index mode: {mode}")
+        lists = self._top_k(self.centroids @ query, nprobe)
+        positions = np.concatenate([np.arange(self.offsets[c], self.offsets[c + 1]) for c in lists])
+        if len(positions) == 0:
+            return []
+        scores = self.vectors[positions] @ query
+        return [(int(positions[i]), float(scores[i])) for i in self._top_k(scores, k)]
+
+    def search_docs(self, query: np.ndarray, k: int = 2, mode: str = 'exact') -> List[Dict]:
+        """Same shape as semantic_search's results"""
+        return [self.docs[i] for i, _ in self.search(query, k, mode)]
+
+@lru_cache(maxsize=1)
+def get_local_index() -> Optional[LocalVectorIndex]:
+    """The index at VECTOR_INDEX_PATH, loaded once per container; None when unset"""
+    if not VECTOR_INDEX_PATH:
+        return None
+    return LocalVectorIndex.load(VECTOR_INDEX_PATH)
@@ -0,0 +1,87 @@
+"""
+Build the in-process vector index used by semantic_search (VECTOR_INDEX_PATH).
+
+    # 1) Dump the topics index (with embeddings) to JSONL via the scroll API
+    python scripts/build_vector_index.py dump --out topics.jsonl
+
+    # 2) Build the index directory from the dump; --nlist enables IVF
+    python scripts/build_vector_index.py build --dump topics.jsonl --out /opt/topics-index --nlist 64
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import requests
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config import *
+from libs.vector_index import LocalVectorIndex
+
+def dump_topics(out_path, index=TOPICS_INDEX, batch_size=500):
+    query = {
+        "query": {"match_all": {}},
+        "size": batch_size,
+        "_source": ["title", "summary", "sources", "embed"],
+    }
+    resp = requests.post(
+        url = f"{OPENSEARCH_URL}/{index}/_search?scroll=2m",
+        data = json.dumps(query),
+        headers = OPENSEARCH_HEADERS,
+        auth = OPENSEARCH_AUTH,
+    )
+    assert resp.status_code == 200
+
+    count = 0
+    with open(out_path, 'w', encoding='utf-8') as f:
+        while True:
+            results = resp.json()
+            hits = results['hits']['hits']
+            if not hits:
+                break
+            for hit in hits:
+                f.write(json.dumps({'_id': hit['_id'], '_source': hit['_source']}, ensure_ascii=False) + '\n')
+            count += len(hits)
+            resp = requests.post(
+                url = f"{OPENSEARCH_URL}/_search/scroll",
+                data = json.dumps({"scroll": "2m", "scroll_id": results['_scroll_id']}),
+                headers = OPENSEARCH_HEADERS,
+                auth = OPENSEARCH_AUTH,
+            )
+            assert resp.status_code == 200
+    print(f"[dump] {count} documents from /{index} -> {out_path}")
+
+def read_dump(path):
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    dump = sub.add_parser('dump', help='dump the topics index to JSONL')
+    dump.add_argument('--out', required=True)
+    dump.add_argument('--index', default=TOPICS_INDEX)
+
+    build = sub.add_parser('build', help='build an index directory from a JSONL dump')
+    build.add_argument('--dump', required=True)
+    build.add_argument('--out', required=True)
+    build.add_argument('--nlist', type=int, default=0, help='IVF lists (0 = exact search only)')
+    build.add_argument('--dimensions', type=int, default=EMBEDDING_DIMENSIONS, help='truncate vectors (default: EMBEDDING_DIMENSIONS)')
+
+    args = parser.parse_args()
+    if args.command == 'dump':
+        dump_topics(args.out, args.index)
+    else:
+        t0 = time.perf_counter()
+        index = LocalVectorIndex.from_records(read_dump(args.dump), nlist=args.nlist, dimensions=args.dimensions)
+        index.save(args.out)
+        print(f"[build] {len(index)} vectors of dim {index.vectors.shape[1]} -> {args.out} "
+              f"({'IVF nlist=' + str(args.nlist) if args.nlist else 'exact'}) in {time.perf_counter() - t0:.1f}s")
+
+if __name__ == '__main__':
+    main()
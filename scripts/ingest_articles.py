@@ -0,0 +1,66 @@
+"""
+Ingest articles (or topics) from JSONL into OpenSearch with embeddings.
+
+    # news articles: {"id": ..., "title": ..., "content": ..., "created_at": ...} per line
+    python scripts/ingest_articles.py --input articles.jsonl --index news
+
+    # topics: embed title + summary
+    python scripts/ingest_articles.py --input topics.jsonl --index topics --text-fields title summary
+
+Progress is checkpointed to <input>.checkpoint; re-running the same command
+continues after the last fully processed line (--restart ignores it).
+Documents OpenSearch rejects (e.g. mapping errors) don't stop the run; they
+are appended to <input>.checkpoint.failed.jsonl and can be ingested again
+from that file once the cause is fixed. To try it
+without network access, start scripts/local_standin.py and point
+OPENSEARCH_URL and OPENAI_BASE_URL at it.
+"""
+import argparse
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config import *
+from libs.ingestion import BulkIngester
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--input', required=True, help='JSONL file, one document per line')
+    parser.add_argument('--index', default='news')
+    parser.add_argument('--text-fields', nargs='+', default=['title', 'content'], help='fields joined and embedded')
+    parser.add_argument('--id-field', default='id', help='document id field (default: hash of the line)')
+    parser.add_argument('--batch-size', type=int, default=INGEST_EMBED_BATCH_SIZE, help='texts per embeddings call')
+    parser.add_argument('--bulk-max-bytes', type=int, default=INGEST_BULK_MAX_BYTES)
+    parser.add_argument('--max-in-flight', type=int, default=INGEST_MAX_IN_FLIGHT)
+    parser.add_argument('--checkpoint', help='checkpoint file (default: <input>.checkpoint)')
+    parser.add_argument('--restart', action='store_true', help='ignore an existing checkpoint')
+    args = parser.parse_args()
+
+    checkpoint = args.checkpoint or args.input + '.checkpoint'
+    if args.restart:
+        for path in (checkpoint, checkpoint + '.failed.jsonl'):
+            if os.path.exists(path):
+                os.remove(path)
+
+    ingester = BulkIngester(
+        index = args.index,
+        text_fields = args.text_fields,
+        id_field = args.id_field,
+        embed_batch_size = args.batch_size,
+        bulk_max_bytes = args.bulk_max_bytes,
+        max_in_flight = args.max_in_flight,
+        checkpoint_path = checkpoint,
+    )
+    stats = ingester.ingest_file(args.input)
+    print(f"[Ingest] {stats['docs']} docs -> /{args.index} in {stats['elapsed_s']:.1f}s "
+          f"({stats['docs_per_sec']:.0f} docs/s), {stats['skipped']} skipped, {stats['failed']} failed")
+    if stats['dead_letter_path']:
+        print(f"[Ingest] Failed documents written to {stats['dead_letter_path']}")
+    print(f"[Ingest] {stats['embed_calls']} embedding calls (avg {stats['avg_embed_latency_ms']:.0f} ms), "
+          f"{stats['bulk_requests']} bulk requests / {stats['bulk_mb']:.1f} MB (avg {stats['avg_bulk_latency_ms']:.0f} ms), "
+          f"{stats['retries']} retries")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,309 @@
+"""
+Local stand-in for OpenSearch and the OpenAI embeddings API, for running the
+ingestion pipeline and benchmarks without network access.
+
+    python scripts/local_standin.py --port 9250 --embed-ms 200 --bulk-ms 30
+
+    OPENSEARCH_URL=http://localhost:9250 OPENAI_BASE_URL=http://localhost:9250/v1 \\
+        python scripts/ingest_articles.py --input articles.jsonl --index news
+
+Supported endpoints:
+    POST /v1/embeddings          deterministic pseudo-random unit vectors per text
+    POST /_bulk, /{index}/_bulk  stores documents in memory
+    GET/POST /{index}/_search    match_all/term/match/range/bool queries, sort,
+                                 search_after, size and _source filtering
+    GET  /{index}/_count         document count
+    GET  /{index}/_doc/{id}      stored document
+    PUT  /{index}/_doc/{id}      stores one document
+    PUT  /{index}                creates an index; settings/mappings are kept but
+                                 not enforced
+    DELETE /{index}              drops an index
+    HEAD /{index or alias}       existence check
+    GET  /_alias/{alias}, /{index}/_mapping
+    POST /_aliases               add, remove and remove_index actions
+    POST /_reindex               copies every document of source into dest
+    POST /{index}/_mget          documents by {"ids": [...]}, ?_source=a,b filtering
+
+Index names in document and search requests resolve through aliases.
+    POST /callback/{anything}    Kakao callbackUrl receiver; payloads are kept
+                                 in state.callbacks as (received time, path, body)
+
+`--reject-rate` answers that fraction of bulk items with 429 so retry paths
+can be exercised.
+"""
+import argparse
+import hashlib
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+class StandinState:
+    def __init__(self, dimensions=3072, embed_ms=0.0, bulk_ms=0.0, search_ms=0.0, reject_rate=0.0, seed=0):
+        self.dimensions = dimensions
+        self.embed_ms = embed_ms
+        self.bulk_ms = bulk_ms
+        self.search_ms = search_ms
+        self.reject_rate = reject_rate
+        self.random = random.Random(seed)
+        self.indices = {}
+        self.schemas = {}  # index -> body of PUT /{index}
+        self.aliases = {}  # alias -> index
+        self.requests = []  # (method, path, body bytes)
+        self.callbacks = []  # (time.time(), path, payload) posted to /callback/...
+        self.callback_received = threading.Event()
+        self.lock = threading.Lock()
+
+    def embed(self, text, dimensions):
+        seed = int.from_bytes(hashlib.sha1(text.encode('utf-8')).digest()[:8], 'little')
+        vector = np.random.default_rng(seed).standard_normal(dimensions)
+        return (vector / np.linalg.norm(vector)).round(6).tolist()
+
+    def resolve(self, name):
+        return self.aliases.get(name, name)
+
+    def bulk(self, body, default_index=None):
+        lines = [line for line in body.decode('utf-8').split('\n') if line.strip()]
+        items = []
+        for action_line, source_line in zip(lines[::2], lines[1::2]):
+            op, meta = next(iter(json.loads(action_line).items()))
+            index, doc_id = self.resolve(meta.get('_index', default_index)), meta.get('_id')
+            with self.lock:
+                if self.random.random() < self.reject_rate:
+                    items.append({op: {'_index': index, '_id': doc_id, 'status': 429,
+                                       'error': {'type': 'es_rejected_execution_exception'}}})
+                    continue
+                docs = self.indices.setdefault(index, {})
+                created = doc_id not in docs
+                docs[doc_id] = json.loads(source_line)
+            items.append({op: {'_index': index, '_id': doc_id, 'status': 201 if created else 200,
+                               'result': 'created' if created else 'updated'}})
+        return {'took': 1, 'errors': any('error' in next(iter(i.values())) for i in items), 'items': items}
+
+    def matches(self, doc, query):
+        kind, spec = next(iter(query.items()))
+        if kind == 'match_all':
+            return True
+        if kind == 'bool':
+            clauses = [c for key in ('must', 'filter') for c in spec.get(key, [])]
+            should = spec.get('should', [])
+            required = spec.get('minimum_should_match', 0 if clauses else 1) if should else 0
+            return all(self.matches(doc, c) for c in clauses) and \
+                sum(self.matches(doc, c) for c in should) >= required and \
+                not any(self.matches(doc, c) for c in spec.get('must_not', []))
+        field, value = next(iter(spec.items()))
+        if kind in ('term', 'match'):
+            value = value.get('value', value.get('query')) if isinstance(value, dict) else value
+            return doc.get(field) == value
+        if kind == 'range':
+            current = doc.get(field)
+            if current is None:
+                return False
+            checks = {'gte': current.__ge__, 'gt': current.__gt__, 'lte': current.__le__, 'lt': current.__lt__}
+            return all(checks[op](bound) for op, bound in value.items() if op in checks)
+        raise ValueError(f'unsupported query: {kind}')
+
+    def search(self, index, request):
+        """Enough of _search for the app's queries; sort values are the raw field values"""
+        docs = list(self.indices.get(self.resolve(index), {}).items())
+        hits = [(doc_id, doc) for doc_id, doc in docs if self.matches(doc, request.get('query', {'match_all': {}}))]
+
+        sort = [next(iter(s.items())) for s in request.get('sort', [])]
+        sort = [(field, order['order'] if isinstance(order, dict) else order) for field, order in sort]
+        for field, order in reversed(sort):
+            hits.sort(key=lambda hit: hit[1].get(field) or '', reverse=order == 'desc')
+        if 'search_after' in request and sort:
+            def is_after(doc):
+                # Compare sort values field by field, like OpenSearch does for tiebreakers
+                for (field, order), bound in zip(sort, request['search_after']):
+                    value, bound = doc.get(field) or '', '' if bound is None else bound
+                    if value != bound:
+                        return value < bound if order == 'desc' else value > bound
+                return False
+            hits = [hit for hit in hits if is_after(hit[1])]
+
+        fields = request.get('_source', True)
+        results = []
+        for doc_id, doc in hits[:request.get('size', 10)]:
+            hit = {'_index': index, '_id': doc_id, '_score': None if sort else 1.0}
+            if fields is not False:
+                hit['_source'] = doc if fields is True else {f: doc[f] for f in fields if f in doc}
+            if sort:
+                hit['sort'] = [doc.get(field) for field, _ in sort]
+            results.append(hit)
+        return {'took': 1, 'hits': {'total': {'value': len(hits), 'relation': 'eq'}, 'hits': results}}
+
+def make_handler(state):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'  # keep-alive, like the real services
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status, payload):
+            body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _body(self):
+            return self.rfile.read(int(self.headers.get('Content-Length') or 0))
+
+        def do_POST(self):
+            path = urlparse(self.path).path.strip('/').split('/')
+            body = self._body()
+            with state.lock:
+                state.requests.append(('POST', self.path, body))
+
+            if path[0] == 'callback':
+                with state.lock:
+                    state.callbacks.append((time.time(), self.path, json.loads(body)))
+                state.callback_received.set()
+                return self._send(200, {'taskId': path[-1], 'status': 'SUCCESS', 'message': ''})
+            if path[-1] == 'embeddings':
+                request = json.loads(body)
+                texts = request['input'] if isinstance(request['input'], list) else [request['input']]
+                time.sleep(state.embed_ms / 1000)
+                dimensions = request.get('dimensions') or state.dimensions
+                return self._send(200, {
+                    'object': 'list',
+                    'model': request.get('model'),
+                    'data': [{'object': 'embedding', 'index': i, 'embedding': state.embed(t, dimensions)} for i, t in enumerate(texts)],
+                    'usage': {'prompt_tokens': 0, 'total_tokens': 0},
+                })
+            if path[-1] == '_search':
+                return self._search(path[0], body)
+            if path[-1] == '_mget':
+                fields = parse_qs(urlparse(self.path).query).get('_source', [None])[0]
+                with state.lock:
+                    docs = state.indices.get(state.resolve(path[0]), {})
+                    found = [(doc_id, docs.get(doc_id)) for doc_id in json.loads(body)['ids']]
+                return self._send(200, {'docs': [
+                    {'_index': path[0], '_id': doc_id, 'found': doc is not None,
+                     **({'_source': doc if fields is None else {f: doc[f] for f in fields.split(',') if f in doc}} if doc is not None else {})}
+                    for doc_id, doc in found
+                ]})
+            if path[0] == '_aliases':
+                return self._aliases(json.loads(body))
+            if path[0] == '_reindex':
+                request = json.loads(body)
+                with state.lock:
+                    source = dict(state.indices.get(state.resolve(request['source']['index']), {}))
+                    state.indices.setdefault(state.resolve(request['dest']['index']), {}).update(source)
+                return self._send(200, {'took': 1, 'total': len(source), 'created': len(source), 'failures': []})
+            if path[-1] == '_bulk':
+                time.sleep(state.bulk_ms / 1000)
+                return self._send(200, state.bulk(body, path[0] if len(path) == 2 else None))
+            self._send(404, {'error': f'unsupported endpoint {self.path}'})
+
+        def _search(self, index, body):
+            time.sleep(state.search_ms / 1000)
+            with state.lock:
+                result = state.search(index, json.loads(body or b'{}'))
+            self._send(200, result)
+
+        def _aliases(self, request):
+            with state.lock:
+                for action in request['actions']:
+                    kind, spec = next(iter(action.items()))
+                    if kind == 'add':
+                        state.aliases[spec['alias']] = spec['index']
+                    elif kind == 'remove':
+                        state.aliases.pop(spec['alias'], None)
+                    elif kind == 'remove_index':
+                        state.indices.pop(spec['index'], None)
+                        state.schemas.pop(spec['index'], None)
+            self._send(200, {'acknowledged': True})
+
+        def do_PUT(self):
+            path = urlparse(self.path).path.strip('/').split('/')
+            body = self._body()
+            with state.lock:
+                state.requests.append(('PUT', self.path, body))
+                if len(path) == 1:
+                    if path[0] in state.indices or path[0] in state.aliases:
+                        return self._send(400, {'error': {'type': 'resource_already_exists_exception'}})
+                    state.indices[path[0]] = {}
+                    state.schemas[path[0]] = json.loads(body or b'{}')
+                    return self._send(200, {'acknowledged': True, 'index': path[0]})
+                if len(path) == 3 and path[1] == '_doc':
+                    docs = state.indices.setdefault(state.resolve(path[0]), {})
+                    created = path[2] not in docs
+                    docs[path[2]] = json.loads(body)
+                    return self._send(201 if created else 200, {'_id': path[2], 'result': 'created' if created else 'updated'})
+            self._send(404, {'error': f'unsupported endpoint {self.path}'})
+
+        def do_DELETE(self):
+            index = urlparse(self.path).path.strip('/')
+            with state.lock:
+                found = state.indices.pop(index, None) is not None
+                state.schemas.pop(index, None)
+            self._send(200 if found else 404, {'acknowledged': found})
+
+        def do_HEAD(self):
+            name = urlparse(self.path).path.strip('/')
+            exists = name in state.indices or name in state.aliases
+            self.send_response(200 if exists else 404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+
+        def do_GET(self):
+            path = urlparse(self.path).path.strip('/').split('/')
+            body = self._body()
+            with state.lock:
+                state.requests.append(('GET', self.path, body))
+            if path[-1] == '_search':
+                return self._search(path[0], body)
+            if path[0] == '_alias':
+                indices = [index for alias, index in state.aliases.items() if alias == path[1]]
+                if not indices:
+                    return self._send(404, {'error': f'alias [{path[1]}] missing', 'status': 404})
+                return self._send(200, {index: {'aliases': {path[1]: {}}} for index in indices})
+            index = state.resolve(path[0])
+            if len(path) == 2 and path[1] == '_mapping' and index in state.indices:
+                return self._send(200, {index: {'mappings': state.schemas.get(index, {}).get('mappings', {})}})
+            docs = state.indices.get(index)
+            if docs is None:
+                return self._send(404, {'error': {'type': 'index_not_found_exception'}})
+            if len(path) == 2 and path[1] == '_count':
+                return self._send(200, {'count': len(docs)})
+            if len(path) == 3 and path[1] == '_doc' and path[2] in docs:
+                return self._send(200, {'_index': index, '_id': path[2], 'found': True, '_source': docs[path[2]]})
+            self._send(404, {'found': False})
+
+    return Handler
+
+def start_standin(port=0, **kwargs):
+    """Start the stand-in in a daemon thread; returns (server, state). Port 0 picks a free port."""
+    state = StandinState(**kwargs)
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(state))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--port', type=int, default=9250)
+    parser.add_argument('--dimensions', type=int, default=3072)
+    parser.add_argument('--embed-ms', type=float, default=0.0, help='latency of each embeddings call')
+    parser.add_argument('--bulk-ms', type=float, default=0.0, help='latency of each _bulk call')
+    parser.add_argument('--search-ms', type=float, default=0.0, help='latency of each _search call')
+    parser.add_argument('--reject-rate', type=float, default=0.0, help='fraction of bulk items answered with 429')
+    args = parser.parse_args()
+
+    server, _ = start_standin(args.port, dimensions=args.dimensions, embed_ms=args.embed_ms,
+                              bulk_ms=args.bulk_ms, search_ms=args.search_ms, reject_rate=args.reject_rate)
+    print(f"[standin] listening on http://127.0.0.1:{server.server_address[1]}", file=sys.stderr)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == '__main__':
+    main()
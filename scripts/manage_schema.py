@@ -0,0 +1,56 @@
+"""
+Create or upgrade every OpenSearch index the code uses from schema/*.json.
+
+    # Show alias -> index, schema version and document count
+    python scripts/manage_schema.py status
+
+    # Create missing indices (<name>-v<version> behind an alias called <name>)
+    # and reindex aliases whose schema_version went up; safe to re-run
+    python scripts/manage_schema.py apply [--index schedule user-photos] [--dry-run]
+
+    # Also move legacy concrete indices (created by dynamic mapping) behind an
+    # alias: reindex into <name>-v<version>, then delete the old index and add the
+    # alias in one _aliases call
+    python scripts/manage_schema.py apply --migrate-existing
+
+The schedule lookups sort and compare on a keyword `time`, so a legacy
+dynamically mapped `schedule` index must be migrated before deploying them;
+the reindex also trims legacy times stored as " 14:00" (_meta.reindex_script).
+
+knn_vector dimensions follow EMBEDDING_DIMENSIONS when it is set. Writers keep
+using the plain names (chat-history, schedule, ...), which now resolve to the
+alias; stop writers during --migrate-existing, since documents written to the
+old index after the reindex started are not copied.
+"""
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config import *
+from libs.index_schema import SchemaManager
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('command', choices=['status', 'apply'])
+    parser.add_argument('--index', nargs='+', help='aliases to apply (default: every schema/*.json)')
+    parser.add_argument('--migrate-existing', action='store_true', help='replace legacy concrete indices with aliases')
+    parser.add_argument('--dry-run', action='store_true', help='print the plan only')
+    args = parser.parse_args()
+
+    manager = SchemaManager()
+    if args.command == 'status':
+        print(f"{'alias':<16}{'state':<14}{'index':<20}{'version':>8}{'wanted':>8}{'docs':>10}")
+        for row in manager.status():
+            print(f"{row['alias']:<16}{row['state']:<14}{row['index'] or '-':<20}{row['version'] if row['version'] is not None else '-':>8}"
+                  f"{row['wanted']:>8}{row['docs'] if row['docs'] is not None else '-':>10}")
+        return
+
+    unknown = set(args.index or []) - set(manager.schemas)
+    if unknown:
+        raise SystemExit(f"No schema for {', '.join(sorted(unknown))}; available: {', '.join(manager.schemas)}")
+    manager.apply_all(args.index, migrate_existing=args.migrate_existing, dry_run=args.dry_run)
+
+if __name__ == '__main__':
+    main()
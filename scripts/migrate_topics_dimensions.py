@@ -0,0 +1,121 @@
+"""
+Copy the topics index into a new index with reduced-dimension embeddings and
+point an alias at it, so search can switch over with TOPICS_INDEX=<alias>.
+
+    # Truncate + renormalize the stored 3072-dim vectors (no API calls)
+    python scripts/migrate_topics_dimensions.py --dimensions 512
+
+    # Re-embed title + summary with the model's `dimensions` parameter instead
+    python scripts/migrate_topics_dimensions.py --dimensions 512 --mode reembed
+
+    # Then deploy with EMBEDDING_DIMENSIONS=512 TOPICS_INDEX=topics-live
+
+The new index copies the source mapping and settings, with only the `embed`
+knn_vector dimension changed. The alias is swapped in one _aliases call, so
+readers see either the old or the new index, never neither. Compare sizes,
+latency and recall with benchmarks/embedding_dimensions.py.
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import requests
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config import *
+from libs.embedding_service import EmbeddingService, reduce_dimensions
+
+def opensearch(method, path, body=None, ndjson=False):
+    resp = requests.request(
+        method,
+        url = f"{OPENSEARCH_URL}/{path}",
+        data = body if ndjson or body is None else json.dumps(body),
+        headers = {"Content-Type": "application/x-ndjson"} if ndjson else OPENSEARCH_HEADERS,
+        auth = OPENSEARCH_AUTH,
+    )
+    return resp
+
+def scroll(index, batch_size):
+    """Yield batches of hits (with embeddings) from index"""
+    resp = opensearch('POST', f"{index}/_search?scroll=5m", {"query": {"match_all": {}}, "size": batch_size})
+    assert resp.status_code == 200, resp.text
+    while True:
+        results = resp.json()
+        hits = results['hits']['hits']
+        if not hits:
+            break
+        yield hits
+        resp = opensearch('POST', "_search/scroll", {"scroll": "5m", "scroll_id": results['_scroll_id']})
+        assert resp.status_code == 200, resp.text
+
+def create_target(source, target, dimensions):
+    """Create target with source's mapping, `embed` resized to dimensions"""
+    mappings = next(iter(opensearch('GET', f"{source}/_mapping").json().values()))['mappings']
+    settings = next(iter(opensearch('GET', f"{source}/_settings").json().values()))['settings']['index']
+    mappings['properties']['embed']['dimension'] = dimensions
+
+    # uuid, creation_date 등 생성 시 지정할 수 없는 설정은 제외
+    keep = {key: settings[key] for key in ('knn', 'number_of_shards', 'number_of_replicas') if key in settings}
+    resp = opensearch('PUT', target, {"settings": {"index": keep}, "mappings": mappings})
+    assert resp.status_code == 200, resp.text
+
+def migrate(source, target, dimensions, mode, text_fields, batch_size):
+    create_target(source, target, dimensions)
+    service = EmbeddingService(dimensions=dimensions, disk_path=None) if mode == 'reembed' else None
+
+    count, t0 = 0, time.perf_counter()
+    for hits in scroll(source, batch_size):
+        if mode == 'reembed':
+            texts = ["\n".join(str(hit['_source'].get(field) or '') for field in text_fields) for hit in hits]
+            vectors = service.embed_many(texts)
+        else:
+            vectors = reduce_dimensions([hit['_source']['embed'] for hit in hits], dimensions)
+
+        lines = []
+        for hit, vector in zip(hits, vectors):
+            lines.append(json.dumps({"index": {"_index": target, "_id": hit['_id']}}))
+            lines.append(json.dumps(dict(hit['_source'], embed=[float(x) for x in vector]), ensure_ascii=False))
+        resp = opensearch('POST', "_bulk", "\n".join(lines) + "\n", ndjson=True)
+        assert resp.status_code == 200 and not resp.json()['errors'], resp.text[:1000]
+        count += len(hits)
+        print(f"[migrate] {count} documents ({count / (time.perf_counter() - t0):.0f} docs/s)")
+
+    opensearch('POST', f"{target}/_refresh")
+    return count
+
+def point_alias(alias, target):
+    """Atomically move alias to target, removing it from whatever it pointed at"""
+    resp = opensearch('GET', f"_alias/{alias}")
+    current = list(resp.json()) if resp.status_code == 200 else []
+    if not current and opensearch('HEAD', alias).status_code == 200:
+        raise SystemExit(f"'{alias}' is a concrete index, not an alias; pick another --alias")
+
+    actions = [{"remove": {"index": index, "alias": alias}} for index in current]
+    actions.append({"add": {"index": target, "alias": alias}})
+    resp = opensearch('POST', "_aliases", {"actions": actions})
+    assert resp.status_code == 200, resp.text
+    print(f"[alias] {alias}: {current or '(new)'} -> {target}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dimensions', type=int, required=True)
+    parser.add_argument('--mode', choices=['truncate', 'reembed'], default='truncate')
+    parser.add_argument('--source', default='topics', help='index holding full-size embeddings')
+    parser.add_argument('--target', help='new index name (default: <source>-<dimensions>)')
+    parser.add_argument('--alias', default='topics-live')
+    parser.add_argument('--text-fields', nargs='+', default=['title', 'summary'], help='fields embedded in reembed mode')
+    parser.add_argument('--batch-size', type=int, default=200)
+    parser.add_argument('--no-alias', action='store_true', help='build the index only')
+    args = parser.parse_args()
+
+    target = args.target or f"{args.source}-{args.dimensions}"
+    count = migrate(args.source, target, args.dimensions, args.mode, args.text_fields, args.batch_size)
+    print(f"[migrate] {count} documents {args.source} -> {target} ({args.mode}, {args.dimensions} dims)")
+    if not args.no_alias:
+        point_alias(args.alias, target)
+
+if __name__ == '__main__':
+    main()
@@ -1,73 +1,45 @@
 import json
 import datetime as dt
-import shortuuid # shortuuid 라이브러리를 사용하여 uuid 생성
-import requests
 
 from config import *
-from openai import OpenAI
+from libs.openai_client import get_openai_client
 from libs.news_search import answer_news_search
-
-
-# server에 chat-history를 저장하는 함수
-def upload_chat_history(user_id, role, text):
-    doc = {
-        'user_id': user_id,
-        'role': role,
-        'text': text,
-        'timestamp': dt.datetime.now().isoformat() # 현재 시간을 isoformat으로 저장
-    }
-    doc_id = shortuuid.uuid() # doc의 uuid 생성
-
-    resp = requests.put(
-        url = f"{OPENSEARCH_URL}/chat-history/_doc/{doc_id}",
-        data = json.dumps(doc),
-        headers = OPENSEARCH_HEADERS,
-        auth = OPENSEARCH_AUTH,
+from libs.chat_history_writer import chat_history_writer
+from libs.chat_history_cache import chat_history_cache
+from libs.kakao_async import callback_dispatcher
+from libs.chat_memory import ChatMemoryStore
+from libs.token_budget import MESSAGE_OVERHEAD_TOKENS, estimate_tokens
+
+# 토큰 예산 밖으로 밀려난 오래된 대화를 기존 요약에 합쳐 새 요약을 만드는 함수
+def summarize_chats(previous_summary, chats):
+    client = get_openai_client() # 공유 클라이언트 (연결 풀 재사용)
+    conversation = "\n".join(f"{x['role']}: {x['text']}" for x in chats)
+    resp = client.chat.completions.create(
+        model="gpt-4o-mini",
+        messages=[
+            {'role': 'system', 'content': '이전 요약과 새 대화를 합쳐 3문장 이내로 요약해줘. 사용자에 대한 사실(이름, 계획, 취향)은 남기고 잡담은 빼줘.'},
+            {'role': 'user', 'content': f"이전 요약: {previous_summary or '없음'}\n\n새 대화:\n{conversation}"},
+        ],
     )
+    return resp.choices[0].message.content.strip()
+
+# 사용자별로 CHAT_MEMORY_TOKEN_BUDGET 안에 들어가는 최근 대화만 보냄 (요약은 CHAT_MEMORY_SUMMARY_ENABLED일 때만)
+chat_memory = ChatMemoryStore(summarize=summarize_chats if CHAT_MEMORY_SUMMARY_ENABLED else None)
 
-    print(f"Status Code: {resp.status_code}")
 
-    # assert resp.status_code >=200 and resp.status_code < 300
-    assert resp.status_code //100 == 2
+# chat-history 문서를 버퍼에 추가하는 함수 (chat_history_writer.end_turn()에서 _bulk 한 번으로 저장)
+def upload_chat_history(user_id, role, text):
+    timestamp = dt.datetime.now().isoformat() # 현재 시간을 isoformat으로 저장
+    chat_history_writer.add(user_id, role, text, timestamp)
 
 # server에서 과거 chat-history를 가져오는 함수(최근 대화 100개)
+# 컨테이너가 재사용되면 이전 턴 이후에 추가된 문서만 가져옴 (chat_history_cache)
 def fetch_chat_history(user_id):
-    query = {
-            "query": {
-                "term": {
-                    "user_id": {
-                        "value": user_id
-                    }
-                }
-            },
-            "sort": [
-                {
-                    "timestamp": {
-                        "order": "desc" # timestamp를 기준으로 내림차순 정렬
-                    }
-                }
-            ],
-            "size": 100
-        }
-    resp = requests.get(
-        url = f"{OPENSEARCH_URL}/chat-history/_search",
-        data = json.dumps(query),
-        headers = OPENSEARCH_HEADERS,
-        auth = OPENSEARCH_AUTH,
-    )
-
-    assert resp.status_code == 200
-
-    results = resp.json()
-    hits = results['hits']['hits'] # 검색 결과는 hits에 저장되어 있음
-    chats = [x['_source'] for x in hits] # _source에는 실제 데이터가 저장되어 있음
-    chats.sort(key=lambda x: x['timestamp']) # timestamp를 기준으로 오름차순 정렬
-
-    return chats
+    return chat_history_cache.get(user_id) # timestamp 기준 오름차순
 
 # 꺼내온 chat-history를 바탕으로 prompt를 생성하고 OpenAI API를 사용하여 답변 생성
 def generate_answer(user_id, utterance):
-    client = OpenAI()
+    client = get_openai_client() # 공유 클라이언트 (연결 풀 재사용)
 
     # 1) System message
     messages = [
@@ -79,8 +51,16 @@ def generate_answer(user_id, utterance):
 
     # 2) User message
     chats = fetch_chat_history(user_id) # 사용자의 chat-history를 가져옴
+    window, summary = chat_memory.select_window(user_id, chats) # 최신 대화부터 토큰 예산만큼만 (긴 메시지는 잘라냄)
 
-    for x in chats:
+    if summary: # 예산 밖으로 밀려난 대화의 요약
+        messages.append({
+            'role': 'system',
+            'content': f'이전 대화 요약: {summary}'
+        })
+
+    history_start = len(messages)
+    for x in window:
         entry = {
             'role': x['role'],
             'content': x['text']
@@ -93,11 +73,18 @@ def generate_answer(user_id, utterance):
     }
     messages.append(entry)
 
+    chat_memory.record_prompt(user_id, sum(estimate_tokens(m['content']) for m in messages[history_start:-1]), len(window))
+    prompt_tokens = sum(estimate_tokens(m['content']) + MESSAGE_OVERHEAD_TOKENS for m in messages)
+    print(f"[Kakao Callback] Prompt tokens (estimated): {prompt_tokens} ({len(window)}/{len(chats)} history messages)")
+
     resp = client.chat.completions.create(
-	        model="gpt-4o-mini",
-	        messages=messages,
-	    ) # OpenAI API의 채팅에 completion 요청을 보냄
-    
+            model="gpt-4o-mini",
+            messages=messages,
+        ) # OpenAI API의 채팅에 completion 요청을 보냄
+    if resp.usage is not None:
+        print(f"[Kakao Callback] Prompt tokens (actual): {resp.usage.prompt_tokens}")
+
+    # 대화 내역이 매 턴 늘어나 같은 프롬프트가 반복되지 않으므로 chat 답변은 캐시하지 않음
     answer = resp.choices[0].message.content.strip() # OpenAI API의 응답이 여러개일 수 있으니 첫번째것의 메시지의 컨텐트에 공백 제거해서 저장
 
     return answer
@@ -109,6 +96,7 @@ def generate_chat_talk(user_id, utterance):
 
     upload_chat_history(user_id, 'user', utterance) # user의 chat-history 업로드
     upload_chat_history(user_id, 'assistant', answer) # assistant의 chat-history 업로드
+    chat_history_writer.end_turn() # 두 문서를 _bulk 한 번으로 저장 (CHAT_HISTORY_DURABILITY에 따라 응답 전/백그라운드)
 
     body = {
                 'version': '2.0',
@@ -125,7 +113,7 @@ def generate_chat_talk(user_id, utterance):
             }
     return body
 
-def main(event, context):
+def handle_turn(event, context):
     body = json.loads(event['body']) # event['body']는 string이므로 json.loads를 사용하여 dict로 변환
 
     user_id = body['userRequest']['user']['id'] # 사용자 id를 가져옴
@@ -146,3 +134,7 @@ def main(event, context):
 
     return response
 
+def main(event, context):
+    # callbackUrl이 있고 KAKAO_CALLBACK_MODE가 켜져 있으면 바로 useCallback으로 응답하고
+    # handle_turn의 결과는 callbackUrl로 보냄
+    return callback_dispatcher.handle(event, context, handle_turn)
@@ -1,67 +1,44 @@
+import os
 import json
-import shortuuid
-import requests
 import datetime as dt
+from concurrent.futures import ThreadPoolExecutor
 
 from config import *
-from libs.photo import generate_photo_answer
+from libs.photo import generate_photo_answer, wants_more_photos
 from libs.schedule import generate_schedule_answer
-from libs.news_search import answer_news_search
-from libs.prompt_chains import process_user_message, detect_intent
-
-def upload_chat_history(user_id, role, text):
-    doc = {
-        'user_id': user_id,
-        'role': role,
-        'text': text,
-        'timestamp': dt.datetime.now().isoformat()
-    }
-    doc_id = shortuuid.uuid()
+from libs.news_search import answer_news_search, semantic_search
+from libs.prompt_chains import RequestContext, process_user_message, detect_intent
+from libs.translation_handler import translator
+from libs.intent_classifier import intent_classifier
+from libs.stage_timer import StageTimer
+from libs.opensearch_client import opensearch
+from libs.chat_history_writer import chat_history_writer
+from libs.chat_history_cache import chat_history_cache
+from libs.kakao_async import callback_dispatcher
 
-    resp = requests.put(
-        url = f"{OPENSEARCH_URL}/chat-history/_doc/{doc_id}",
-        data = json.dumps(doc),
-        headers = OPENSEARCH_HEADERS,
-        auth = OPENSEARCH_AUTH,
-    )
-    print(f"Status Code: {resp.status_code}")
-    assert resp.status_code // 100 == 2
+# Provisioned instances load the translation model during init so the first
+# Korean message doesn't pay for it; on-demand instances load it lazily
+if os.getenv("AWS_LAMBDA_INITIALIZATION_TYPE") == "provisioned-concurrency":
+    translator.warmup()
 
-def fetch_chat_history(user_id):
-    query = {
-            "query": {
-                "term": {
-                    "user_id": {
-                        "value": user_id
-                    }
-                }
-            },
-            "sort": [
-                {
-                    "timestamp": {
-                        "order": "desc"
-                    }
-                }
-            ],
-            "size": 100
-        }
-    resp = requests.get(
-        url = f"{OPENSEARCH_URL}/chat-history/_search",
-        data = json.dumps(query),
-        headers = OPENSEARCH_HEADERS,
-        auth = OPENSEARCH_AUTH,
-    )
+# Reused by warm invocations: history fetch and speculative news retrieval
+executor = ThreadPoolExecutor(max_workers=KAKAO_CALLBACK_WORKERS)
 
-    assert resp.status_code == 200
+def upload_chat_history(user_id, role, text, timestamp=None):
+    """Queue a chat-history document; chat_history_writer.end_turn() writes the turn with one _bulk"""
+    chat_history_writer.add(user_id, role, text, timestamp)
 
-    results = resp.json()
-    hits = results['hits']['hits']
-    chats = [x['_source'] for x in hits]
-    chats.sort(key=lambda x: x['timestamp'])
+def fetch_chat_history(user_id):
+    """Recent chat history, oldest first; only documents newer than the cached window are fetched"""
+    return chat_history_cache.get(user_id)
 
-    return chats
+def looks_like_news(utterance):
+    """Cheap local check used to start news retrieval before the intent is known"""
+    intent, _, source = intent_classifier.classify(utterance)
+    return intent == 'news' and source == 'rule'
 
-def main(event, context):
+def handle_turn(event, context):
+    timer = StageTimer()
     body = json.loads(event['body'])
     user_id = body['userRequest']['user']['id']
     utterance = body['userRequest']['utterance']
@@ -69,34 +46,44 @@ def main(event, context):
     print(f"[Kakao Callback] User ID: {user_id}")
     print(f"[Kakao Callback] Utterance: {utterance}")
 
-    # Get chat history for context
-    chat_history = fetch_chat_history(user_id)
+    received_at = dt.datetime.now().isoformat()
+
+    # Chat history (and news retrieval, when the utterance looks like news) are
+    # fetched in the background while the intent is detected
+    history_future = executor.submit(timer.wrap('fetch_history', fetch_chat_history, user_id))
+    topics_future = None
+    if looks_like_news(utterance):
+        topics_future = executor.submit(timer.wrap('news_retrieval', semantic_search, utterance))
     
-    # Process the message using our prompt chains
-    intent, params = detect_intent(utterance)
+    # Translations and the detected intent are shared by every stage of this turn
+    ctx = RequestContext(user_id, utterance)
+
+    # Process the message using our prompt chains; "더 보여줘" right after a
+    # photo lookup continues it without detecting the intent
+    if wants_more_photos(user_id, utterance):
+        intent, params = 'photo', {'photo_more': True}
+    else:
+        with timer.stage('detect_intent'):
+            intent, params = detect_intent(utterance, ctx)
     print(f"[Kakao Callback] Intent: {intent}")
 
     # Handle different intents
     if intent == 'chat':
-        response, body = process_user_message(user_id, utterance, chat_history)
+        with timer.stage('wait_history'):
+            chat_history = history_future.result()
+        with timer.stage('chat'):
+            response, body = process_user_message(user_id, utterance, chat_history, ctx)
     elif intent == 'photo':
-        body, response = generate_photo_answer(user_id, params)
+        with timer.stage('photo'):
+            body, response = generate_photo_answer(user_id, params)
     elif intent == 'schedule':
-        response = generate_schedule_answer(user_id, utterance)
-        body = {
-            "version": "2.0",
-            "template": {
-                "outputs": [
-                    {
-                        "simpleText": {
-                            "text": response
-                        }
-                    }
-                ]
-            }
-        }
+        with timer.stage('schedule'):
+            body, response = generate_schedule_answer(user_id, utterance)
     elif intent == 'news':
-        response = answer_news_search(utterance)
+        with timer.stage('wait_news_retrieval'):
+            topics = topics_future.result() if topics_future else None
+        with timer.stage('news'):
+            response = answer_news_search(utterance, topics)
         body = {
             "version": "2.0",
             "template": {
@@ -126,12 +113,26 @@ def main(event, context):
 
     print(f"[Kakao Callback] Answer: {response}")
 
-    # Save chat history
-    upload_chat_history(user_id, 'user', utterance)
-    upload_chat_history(user_id, 'assistant', response)
+    # Both chat-history documents go out in one _bulk request, before returning
+    # with CHAT_HISTORY_DURABILITY='sync' and off the response path otherwise;
+    # timestamps are taken here so the two documents keep their order
+    upload_chat_history(user_id, 'user', utterance, received_at)
+    upload_chat_history(user_id, 'assistant', response, dt.datetime.now().isoformat())
+    with timer.stage('history_flush' if chat_history_writer.durability == 'sync' else 'history_enqueue'):
+        chat_history_writer.end_turn()
+
+    print(f"[Kakao Callback] Timings (ms): {timer.report()}")
+    opensearch.log_stats()
+    writes = chat_history_writer.stats()
+    print(f"[Kakao Callback] Chat history writes: {writes['flushes']} flushes, avg {writes['avg_flush_docs']:.1f} docs "
+          f"in {writes['avg_flush_ms']:.0f} ms (max {writes['max_flush_ms']:.0f} ms), {writes['pending']} pending")
 
     return {
         "statusCode": 200,
         "body": json.dumps(body)
     }
 
+def main(event, context):
+    # callbackUrl이 있고 KAKAO_CALLBACK_MODE가 켜져 있으면 바로 useCallback으로 응답하고
+    # handle_turn의 결과는 callbackUrl로 보냄
+    return callback_dispatcher.handle(event, context, handle_turn)
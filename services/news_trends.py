@@ -1,8 +1,8 @@
 import json
-import requests
 import pandas as pd
 
 from config import *
+from libs.opensearch_client import opensearch
  
 def query_new_trends(search):
     query = {
@@ -29,18 +29,7 @@ def query_new_trends(search):
             }
         }
 
-    query = json.dumps(query)
-
-    headers = {
-        'Content-Type': 'application/json'
-    }
-
-    resp = requests.get(
-        f"{OPENSEARCH_URL}/news/_search",
-        headers=headers,
-        data=query,
-        auth=OPENSEARCH_AUTH,
-    )
+    resp = opensearch.get("news/_search", query)
 
     print(f'Status code: {resp.status_code}')
 
@@ -2,6 +2,19 @@ import os
 import sys
 from pathlib import Path
 
+import pytest
+
 # Add project root directory to Python path
 project_root = str(Path(__file__).parent.parent)
-sys.path.insert(0, project_root) 
\ No newline at end of file
+sys.path.insert(0, project_root) 
+
+@pytest.fixture
+def standin():
+    """(client, state) of a fresh local OpenSearch stand-in (scripts/local_standin.py)"""
+    from libs.opensearch_client import OpenSearchClient
+    from scripts.local_standin import start_standin
+
+    server, state = start_standin()
+    client = OpenSearchClient(url=f"http://127.0.0.1:{server.server_address[1]}", auth=None, max_retries=0)
+    yield client, state
+    server.shutdown()
@@ -0,0 +1,82 @@
+import json
+import pytest
+from libs.chat_history_cache import ChatHistoryCache
+from libs.chat_history_writer import ChatHistoryWriter
+
+def store(state, doc_id, user_id, text, timestamp, role="user"):
+    state.indices.setdefault("chat-history", {})[doc_id] = {"user_id": user_id, "message_id": doc_id, "role": role, "text": text, "timestamp": timestamp}
+
+def searches(state):
+    return [json.loads(body) for _, path, body in state.requests if path.endswith("/_search")]
+
+def test_first_fetch_then_incremental(standin):
+    client, state = standin
+    for i in range(5):
+        store(state, f"d{i}", "u1", f"메시지 {i}", f"2024-01-01T00:00:0{i}")
+    store(state, "other", "u2", "다른 사용자", "2024-01-01T00:00:09")
+    cache = ChatHistoryCache(window=3, client=client)
+
+    assert [c["text"] for c in cache.get("u1")] == ["메시지 2", "메시지 3", "메시지 4"]
+    store(state, "d5", "u1", "메시지 5", "2024-01-01T00:00:05")
+    history = cache.get("u1")
+
+    assert [c["text"] for c in history] == ["메시지 3", "메시지 4", "메시지 5"]
+    assert set(history[0]) == {"role", "text", "timestamp"}
+    first, second = searches(state)
+    assert first["_source"] == ["role", "text", "timestamp"] and "search_after" not in first
+    assert second["search_after"] == ["2024-01-01T00:00:04", "d4"]
+    assert second["sort"] == [{"timestamp": {"order": "asc"}}, {"message_id": {"order": "asc"}}]
+    assert cache.stats()["fetched_docs"] == 4
+
+def test_messages_with_equal_timestamps_are_not_skipped(standin):
+    """A message stored later with the same timestamp as the last one seen is still fetched"""
+    client, state = standin
+    store(state, "b", "u1", "첫 메시지", "2024-01-01T00:00:00")
+    cache = ChatHistoryCache(window=5, client=client)
+    cache.get("u1")
+
+    store(state, "d", "u1", "답장 2", "2024-01-01T00:00:00", role="assistant")
+    store(state, "c", "u1", "답장 1", "2024-01-01T00:00:00", role="assistant")
+    history = cache.get("u1")
+
+    assert [c["text"] for c in history] == ["첫 메시지", "답장 1", "답장 2"]
+    assert searches(state)[1]["search_after"] == ["2024-01-01T00:00:00", "b"]
+    assert cache.stats()["incremental_fetches"] == 1
+
+def test_own_writes_are_visible_and_not_duplicated(standin):
+    client, state = standin
+    store(state, "d0", "u1", "안녕", "2024-01-01T00:00:00")
+    cache = ChatHistoryCache(client=client)
+    writer = ChatHistoryWriter(durability="sync", client=client)
+    writer.subscribe(cache.note_write)
+    cache.get("u1")
+
+    writer.add("u1", "user", "뉴스 보여줘", "2024-01-01T00:01:00")
+    writer.add("u1", "assistant", "환율 뉴스입니다", "2024-01-01T00:01:01")
+    # Visible before the flush
+    assert [c["text"] for c in cache.get("u1")] == ["안녕", "뉴스 보여줘", "환율 뉴스입니다"]
+
+    writer.end_turn()
+    assert [c["text"] for c in cache.get("u1")] == ["안녕", "뉴스 보여줘", "환율 뉴스입니다"]
+
+def test_large_gap_falls_back_to_full_fetch(standin):
+    client, state = standin
+    store(state, "d0", "u1", "처음", "2024-01-01T00:00:00")
+    cache = ChatHistoryCache(window=2, client=client)
+    cache.get("u1")
+    for i in range(1, 5):
+        store(state, f"d{i}", "u1", f"새 메시지 {i}", f"2024-01-01T00:00:0{i}")
+
+    assert [c["text"] for c in cache.get("u1")] == ["새 메시지 3", "새 메시지 4"]
+    assert cache.stats()["full_fetches"] == 2
+
+def test_disabled_cache_always_fetches_full_window(standin):
+    client, state = standin
+    store(state, "d0", "u1", "안녕", "2024-01-01T00:00:00")
+    cache = ChatHistoryCache(enabled=False, client=client)
+
+    cache.get("u1")
+    cache.get("u1")
+
+    assert all("search_after" not in s for s in searches(state))
+    assert cache.stats()["full_fetches"] == 2
@@ -0,0 +1,70 @@
+import threading
+import pytest
+from types import SimpleNamespace
+from libs.chat_history_writer import ChatHistoryWriter
+
+class FakeOpenSearch:
+    def __init__(self, fail_ids=()):
+        self.bulks = []
+        self.fail_ids = set(fail_ids)
+        self.flushed = threading.Event()
+
+    def post(self, path, lines, ndjson=False):
+        assert path == "_bulk" and ndjson
+        self.bulks.append(lines)
+        items = []
+        for action in lines[::2]:
+            doc_id = action["index"]["_id"]
+            if doc_id in self.fail_ids:
+                self.fail_ids.discard(doc_id)
+                items.append({"index": {"_id": doc_id, "status": 429, "error": {"type": "es_rejected_execution_exception"}}})
+            else:
+                items.append({"index": {"_id": doc_id, "status": 201}})
+        self.flushed.set()
+        return SimpleNamespace(status_code=200, json=lambda: {"errors": any("error" in i["index"] for i in items), "items": items})
+
+def test_sync_turn_is_one_bulk():
+    client = FakeOpenSearch()
+    writer = ChatHistoryWriter(durability="sync", client=client)
+
+    writer.add("u1", "user", "안녕", "2024-01-01T00:00:00")
+    writer.add("u1", "assistant", "반가워요", "2024-01-01T00:00:01")
+    assert writer.pending("u1")[0]["text"] == "안녕"
+    writer.end_turn()
+
+    assert len(client.bulks) == 1
+    assert [line["role"] for line in client.bulks[0][1::2]] == ["user", "assistant"]
+    assert client.bulks[0][0]["index"]["_index"] == "chat-history"
+    assert writer.pending() == []
+    assert writer.stats()["flushed_docs"] == 2 and writer.stats()["max_flush_docs"] == 2
+
+def test_background_batches_across_turns():
+    client = FakeOpenSearch()
+    writer = ChatHistoryWriter(durability="background", flush_interval=0.3, client=client)
+
+    for turn in range(3):
+        writer.add(f"u{turn}", "user", "질문")
+        writer.add(f"u{turn}", "assistant", "답변")
+        writer.end_turn()
+
+    assert client.flushed.wait(timeout=5)
+    assert len(client.bulks) == 1
+    assert len(client.bulks[0]) == 12  # 6 documents, action + source each
+
+def test_rejected_documents_are_retried_in_order():
+    writer = ChatHistoryWriter(durability="sync", client=None)
+    first = writer.add("u1", "user", "첫 번째")
+    writer.client = FakeOpenSearch(fail_ids=[first])
+    writer.add("u1", "assistant", "두 번째")
+
+    writer.end_turn()
+    assert [doc["text"] for doc in writer.pending()] == ["첫 번째"]
+
+    writer.add("u1", "user", "세 번째")
+    writer.end_turn()
+    assert [line["text"] for line in writer.client.bulks[1][1::2]] == ["첫 번째", "세 번째"]
+    assert writer.stats()["failed_flushes"] == 1 and writer.pending() == []
+
+def test_unknown_durability():
+    with pytest.raises(ValueError):
+        ChatHistoryWriter(durability="eventually")
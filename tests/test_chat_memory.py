@@ -0,0 +1,90 @@
+import pytest
+from libs.chat_memory import ChatMemoryStore
+from libs.token_budget import estimate_tokens, pack_newest_first, truncate_to_tokens
+
+def make_history(count: int):
+    return [
+        {"role": "user" if i % 2 == 0 else "assistant", "text": f"메시지 {i}", "timestamp": f"2024-01-01T00:00:{i:02d}"}
+        for i in range(count)
+    ]
+
+def test_estimate_tokens():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("hello world!") == 3
+    assert estimate_tokens("안녕하세요") == 5
+
+def test_pack_newest_first():
+    texts = ["가" * 10, "나" * 10, "다" * 10]
+    assert pack_newest_first(texts, budget=100) == 0
+    assert pack_newest_first(texts, budget=28) == 1
+    assert pack_newest_first(texts, budget=5) == 3
+
+def test_truncate_to_tokens():
+    assert truncate_to_tokens("짧은 글", 10) == "짧은 글"
+    cut = truncate_to_tokens("가" * 50, 10)
+    assert cut == "가" * 9 + "…"
+    assert estimate_tokens(truncate_to_tokens("hello world " * 20, 10)) <= 10
+
+def test_long_message_is_truncated_in_window():
+    history = make_history(3)
+    history[1] = dict(history[1], text="긴 메시지 " * 100)
+    store = ChatMemoryStore(token_budget=1000, max_message_tokens=20)
+
+    window, _ = store.select_window("user-1", history)
+
+    assert len(window) == 3
+    assert estimate_tokens(window[1]["text"]) <= 20 and window[1]["text"].endswith("…")
+    assert window[0] is history[0]
+    assert history[1]["text"] == "긴 메시지 " * 100  # the caller's history is not modified
+
+def test_window_fits_budget():
+    history = make_history(20)
+    per_message = estimate_tokens("메시지 10") + 4
+    store = ChatMemoryStore(token_budget=per_message * 5)
+
+    window, summary = store.select_window("user-1", history)
+
+    assert window == history[-5:]
+    assert summary == ""
+
+def test_rolling_summary_runs_once_per_evicted_chat():
+    calls = []
+    def summarize(previous, chats):
+        calls.append([chat["text"] for chat in chats])
+        return f"{previous}+{len(chats)}"
+
+    history = make_history(10)
+    # Room for three messages plus a couple of summary tokens
+    store = ChatMemoryStore(token_budget=(estimate_tokens("메시지 0") + 4) * 3 + 2, summarize=summarize)
+
+    window, summary = store.select_window("user-1", history)
+    assert calls == [[f"메시지 {i}" for i in range(7)]]
+    assert window == history[7:]
+    assert summary == "+7"
+
+    # Next turn: two new messages, only the newly evicted ones are summarized
+    history = make_history(12)
+    window, summary = store.select_window("user-1", history)
+    assert calls[1] == ["메시지 7", "메시지 8"]
+    assert summary == "+7+2"
+    # Other users never see this summary
+    assert store.select_window("user-2", make_history(2))[1] == ""
+
+def test_idle_users_are_evicted():
+    store = ChatMemoryStore(max_users=2, summarize=lambda previous, chats: "요약")
+    store.token_budget = 20
+    for user_id in ["a", "b", "c"]:
+        store.select_window(user_id, make_history(10))
+
+    assert store.stats()["users"] == 2
+    assert "a" not in store._users
+
+def test_prompt_metrics():
+    store = ChatMemoryStore()
+    store.record_prompt("user-1", 100, 4)
+    store.record_prompt("user-1", 300, 8)
+
+    stats = store.stats()
+    assert stats["turns"] == 2
+    assert stats["avg_prompt_tokens"] == 200
+    assert stats["max_prompt_tokens"] == 300
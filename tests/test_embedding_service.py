@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+from types import SimpleNamespace
+from libs.embedding_service import EmbeddingService, reduce_dimensions
+
+class FakeEmbeddings:
+    def __init__(self):
+        self.requests = []
+
+    def create(self, model, input, **kwargs):
+        self.requests.append({"model": model, "input": list(input), **kwargs})
+        return SimpleNamespace(data=[SimpleNamespace(embedding=[float(len(text)), 1.0, 0.5]) for text in input])
+
+def make_service(tmp_path=None, **kwargs):
+    client = SimpleNamespace(embeddings=FakeEmbeddings())
+    disk_path = str(tmp_path / "embeddings.sqlite3") if tmp_path else ""
+    return EmbeddingService(client=client, disk_path=disk_path, **kwargs), client.embeddings
+
+def test_repeated_query_hits_cache():
+    service, api = make_service()
+    first = service.embed("환율 뉴스")
+    second = service.embed(" 환율  뉴스")
+
+    assert first.dtype == np.float32
+    assert np.array_equal(first, second)
+    assert len(api.requests) == 1
+    assert service.stats()["memory_hits"] == 1
+
+def test_embed_many_batches_misses_once():
+    service, api = make_service()
+    service.embed("환율 뉴스")
+    vectors = service.embed_many(["금리", "환율 뉴스", "금리", "부동산"])
+
+    assert len(vectors) == 4
+    assert np.array_equal(vectors[0], vectors[2])
+    assert api.requests[1]["input"] == ["금리", "부동산"]
+
+def test_key_includes_model_and_dimensions(tmp_path):
+    full, _ = make_service(tmp_path)
+    full.embed("환율 뉴스")
+
+    reduced, api = make_service(tmp_path, dimensions=256)
+    reduced.embed("환율 뉴스")
+
+    assert api.requests == [{"model": "text-embedding-3-large", "input": ["환율 뉴스"], "dimensions": 256}]
+
+def test_disk_level_survives_new_instance(tmp_path):
+    first, _ = make_service(tmp_path)
+    vector = first.embed("환율 뉴스")
+
+    second, api = make_service(tmp_path)
+    assert np.array_equal(second.embed("환율 뉴스"), vector)
+    assert api.requests == []
+    assert second.stats()["disk_hits"] == 1
+
+def test_disk_read_error_counts_as_miss(tmp_path):
+    service, api = make_service(tmp_path)
+    service._disk.conn.execute("DROP TABLE embedding_cache")  # like a corrupt cache file
+
+    vector = service.embed("환율 뉴스")
+
+    assert vector[0] == float(len("환율 뉴스"))
+    assert len(api.requests) == 1 and service.stats()["misses"] == 1
+
+def test_reduce_dimensions_truncates_and_renormalizes():
+    vectors = np.array([[3.0, 4.0, 12.0], [0.0, 0.0, 1.0]])
+
+    reduced = reduce_dimensions(vectors, 2)
+
+    assert reduced.shape == (2, 2)
+    assert np.allclose(reduced[0], [0.6, 0.8])
+    assert np.allclose(reduced[1], [0.0, 0.0])  # zero vectors stay zero
+    assert np.allclose(reduce_dimensions(vectors[0], 2), reduced[0])
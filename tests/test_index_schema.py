@@ -0,0 +1,83 @@
+import json
+
+from libs.index_schema import SchemaManager, load_schemas
+
+def test_every_index_has_keyword_user_ids_and_date_types():
+    schemas = load_schemas(dimensions=None)
+
+    assert set(schemas) == {"chat-history", "schedule", "user-photos", "topics", "news"}
+    for name in ("chat-history", "schedule", "user-photos"):
+        properties = schemas[name]["mappings"]["properties"]
+        assert properties["user_id"]["type"] == "keyword"
+        assert properties["timestamp"]["type"] == "date"
+    assert schemas["schedule"]["mappings"]["properties"]["date"]["type"] == "date"
+    assert "_source" not in schemas["news"]["mappings"]  # _reindex copies embeddings from _source
+    assert schemas["topics"]["mappings"]["properties"]["embed"]["dimension"] == 3072
+    assert load_schemas(dimensions=512)["topics"]["mappings"]["properties"]["embed"]["dimension"] == 512
+
+def test_apply_creates_versioned_indices_behind_aliases_and_is_idempotent(standin):
+    client, state = standin
+    manager = SchemaManager(client=client)
+
+    first = manager.apply_all()
+    assert {step["action"] for step in first.values()} == {"create"}
+    assert state.aliases["schedule"] == "schedule-v1"
+    assert state.schemas["schedule-v1"]["mappings"]["properties"]["user_id"] == {"type": "keyword"}
+
+    # Writes and searches through the alias land in the versioned index
+    assert client.put("schedule/_doc/a", {"user_id": "u1", "date": "2024-02-20"}).status_code == 201
+    assert state.indices["schedule-v1"]["a"]["user_id"] == "u1"
+
+    second = manager.apply_all()
+    assert {step["action"] for step in second.values()} == {"up to date"}
+    assert len([r for r in state.requests if r[0] == "PUT" and "/_doc/" not in r[1]]) == len(first)
+
+def test_version_bump_reindexes_and_moves_alias(standin):
+    client, state = standin
+    manager = SchemaManager(client=client)
+    manager.apply("schedule")
+    client.put("schedule/_doc/a", {"user_id": "u1", "date": "2024-02-20"})
+
+    manager.schemas["schedule"]["mappings"]["_meta"]["schema_version"] = 2
+    step = manager.apply("schedule")
+
+    assert step["action"] == "reindex" and step["docs"] == 1
+    assert state.aliases["schedule"] == "schedule-v2"
+    assert "a" in state.indices["schedule-v2"]
+
+def test_legacy_index_is_only_replaced_with_migrate_existing(standin):
+    client, state = standin
+    manager = SchemaManager(client=client)
+    client.put("schedule/_doc/a", {"user_id": "u1", "date": "2024-02-20"})  # dynamic-mapping index
+
+    assert manager.apply("schedule")["action"] == "skip"
+    assert "schedule" in state.indices and "schedule" not in state.aliases
+
+    step = manager.apply("schedule", migrate_existing=True)
+    assert step["action"] == "reindex"
+    # Legacy times like " 14:00" are trimmed while copying (keyword sort/range need "14:00")
+    reindex = json.loads(next(body for method, path, body in state.requests if path.startswith("/_reindex")))
+    assert "trim()" in reindex["script"]["source"]
+    assert "schedule" not in state.indices
+    assert state.aliases["schedule"] == "schedule-v1"
+    assert state.indices["schedule-v1"]["a"]["user_id"] == "u1"
+
+def test_dry_run_changes_nothing(standin):
+    client, state = standin
+    steps = SchemaManager(client=client).apply_all(dry_run=True)
+
+    assert all(step["action"] == "create" for step in steps.values())
+    assert state.indices == {} and state.aliases == {}
+
+def test_index_excluding_fields_from_source_is_not_reindexed(standin):
+    client, state = standin
+    manager = SchemaManager(client=client)
+    legacy = dict(manager.schemas["news"], mappings=dict(manager.schemas["news"]["mappings"], _source={"excludes": ["embed"]}))
+    client.put("news", legacy)
+    client.put("news/_doc/a", {"title": "t", "embed": [0.1]})
+
+    step = manager.apply("news", migrate_existing=True)
+
+    assert step["action"] == "skip" and "embed" in step["reason"]
+    assert "news" in state.indices and "news-v1" not in state.indices
+    assert not [r for r in state.requests if r[1].startswith("/_reindex")]
@@ -0,0 +1,108 @@
+import json
+import pytest
+from types import SimpleNamespace
+import libs.ingestion as ingestion
+from libs.ingestion import BulkIngester, chunk_bulk_lines
+
+class FakeEmbeddings:
+    def __init__(self, fail_on_call=None):
+        self.calls = []
+        self.fail_on_call = fail_on_call
+
+    def create(self, model, input, **kwargs):
+        self.calls.append(list(input))
+        if len(self.calls) == self.fail_on_call:
+            raise RuntimeError("embedding API down")
+        return SimpleNamespace(data=[SimpleNamespace(index=i, embedding=[float(len(t)), 1.0]) for i, t in enumerate(input)])
+
+def make_lines(count):
+    return [json.dumps({"id": f"a{i}", "title": f"제목 {i}", "content": "본문"}, ensure_ascii=False) + "\n" for i in range(count)]
+
+def make_ingester(url, embeddings, **kwargs):
+    return BulkIngester(index="news", opensearch_url=url, client=SimpleNamespace(embeddings=embeddings), **kwargs)
+
+def test_chunk_bulk_lines_respects_max_bytes():
+    pairs = [(b"a" * 10, b"b" * 20)] * 5  # 32 bytes per pair with newlines
+    chunks = list(chunk_bulk_lines(pairs, max_bytes=70))
+
+    assert [len(c) for c in chunks] == [2, 2, 1]
+    # A single pair larger than the limit still goes out on its own
+    assert [len(c) for c in chunk_bulk_lines(pairs[:2], max_bytes=10)] == [1, 1]
+
+def test_ingest_batches_embeddings_and_writes_bulk(standin):
+    client, state = standin
+    url = client.url
+    embeddings = FakeEmbeddings()
+    lines = make_lines(7) + ["\n", json.dumps({"id": "empty"}) + "\n"]
+
+    stats = make_ingester(url, embeddings, embed_batch_size=3, max_in_flight=2).ingest(lines)
+
+    assert [len(c) for c in embeddings.calls] == [3, 3, 1]
+    assert stats["docs"] == 7 and stats["skipped"] == 1 and stats["failed"] == 0
+    assert stats["committed_lines"] == 9
+    assert state.indices["news"]["a3"] == {"id": "a3", "title": "제목 3", "content": "본문", "embed": [7.0, 1.0]}
+
+def test_resume_from_checkpoint_after_failure(standin, tmp_path):
+    client, state = standin
+    url = client.url
+    checkpoint = str(tmp_path / "articles.checkpoint")
+    lines = make_lines(6)
+
+    with pytest.raises(RuntimeError):
+        make_ingester(url, FakeEmbeddings(fail_on_call=2), embed_batch_size=2, max_in_flight=1,
+                      checkpoint_path=checkpoint).ingest(lines)
+    assert json.load(open(checkpoint))["lines"] == 2
+
+    embeddings = FakeEmbeddings()
+    stats = make_ingester(url, embeddings, embed_batch_size=2, checkpoint_path=checkpoint).ingest(lines)
+
+    assert embeddings.calls[0] == ["제목 2\n본문", "제목 3\n본문"]
+    assert stats["docs"] == 4
+    assert json.load(open(checkpoint))["lines"] == 6
+    assert len(state.indices["news"]) == 6
+
+def test_rejected_bulk_items_are_retried(standin, monkeypatch):
+    client, state = standin
+    url = client.url
+    state.reject_rate = 0.5
+    monkeypatch.setattr(ingestion.time, "sleep", lambda seconds: None)
+
+    stats = make_ingester(url, FakeEmbeddings(), embed_batch_size=10, max_retries=20).ingest(make_lines(20))
+
+    assert stats["docs"] == 20
+    assert stats["retries"] >= 1
+    assert len(state.indices["news"]) == 20
+
+class MappingErrorSession:
+    """_bulk that rejects the given document ids the way a mapping error does"""
+    def __init__(self, rejected):
+        self.rejected = rejected
+        self.timeouts = []
+
+    def post(self, url, data, headers, auth, timeout):
+        self.timeouts.append(timeout)
+        items = []
+        for line in data.decode("utf-8").splitlines()[::2]:
+            doc_id = json.loads(line)["index"]["_id"]
+            if self.rejected(doc_id):
+                items.append({"index": {"_id": doc_id, "status": 400, "error": {"type": "mapper_parsing_exception"}}})
+            else:
+                items.append({"index": {"_id": doc_id, "status": 201}})
+        return SimpleNamespace(status_code=200, json=lambda: {"errors": True, "items": items})
+
+def test_failed_items_go_to_the_dead_letter_file(tmp_path):
+    checkpoint = str(tmp_path / "articles.checkpoint")
+    lines = make_lines(4) + [json.dumps({"title": "아이디 없음", "content": "본문"}, ensure_ascii=False) + "\n"]
+    # a2 and the article without an id (its _id is a hash of the line) are rejected
+    session = MappingErrorSession(lambda doc_id: doc_id == "a2" or len(doc_id) == 40)
+
+    stats = make_ingester("http://opensearch", FakeEmbeddings(), checkpoint_path=checkpoint, session=session).ingest(lines)
+
+    assert stats["docs"] == 3 and stats["failed"] == 2
+    # The checkpoint moves past the rejected lines; they are kept in the dead-letter file instead
+    assert json.load(open(checkpoint))["lines"] == 5
+    assert stats["dead_letter_path"] == checkpoint + ".failed.jsonl"
+    dead = [json.loads(line) for line in open(stats["dead_letter_path"], encoding="utf-8")]
+    assert dead[0] == {"id": "a2", "title": "제목 2", "content": "본문"}
+    assert dead[1]["title"] == "아이디 없음" and len(dead[1]["id"]) == 40
+    assert session.timeouts and all(timeout[1] == ingestion.INGEST_BULK_TIMEOUT for timeout in session.timeouts)
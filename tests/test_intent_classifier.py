@@ -0,0 +1,52 @@
+import datetime as dt
+import json
+import pytest
+from pathlib import Path
+from libs.intent_classifier import IntentClassifier, extract_relative_date, intent_classifier
+
+TODAY = dt.date(2024, 2, 14)
+
+TEST_CASES = [
+    # (utterance, expected result of predict; None means fall back to the LLM)
+    ("환율 뉴스", ("news", {})),
+    ("내일 일정 알려줘", ("schedule", {"date": "2024-02-15"})),
+    ("어제 찍은 사진 보여줘", ("photo", {"photo_date": "2024-02-13"})),
+    ("안녕하세요", ("chat", {})),
+    ("사진 저장해줘", None),  # Upload needs photo_url from the LLM
+    ("지난주 사진 보여줘", ("photo", {"photo_date": "2024-02-05", "photo_end_date": "2024-02-11"})),
+    ("지난주 여행 사진", None),  # Not a lookup we can recognize locally
+    ("뉴스에 나온 사진 보여줘", None),  # Two rules fire
+    # Ambiguous words without a cue go to the LLM
+    ("택시 기사님이 친절했어", None),
+    ("식당 예약하는 법 알려줘", None),
+    ("회의하기 싫다", None),
+    ("오늘 회의 너무 힘들었어", None),
+    ("금리 관련 기사 보여줘", ("news", {})),
+    ("내일 3시에 치과 예약 기억해줘", ("schedule", {"date": "2024-02-15"})),
+]
+
+@pytest.mark.parametrize("utterance,expected", TEST_CASES)
+def test_predict(utterance, expected):
+    assert intent_classifier.predict(utterance, today=TODAY) == expected
+
+def test_extract_relative_date():
+    assert extract_relative_date("모레 약속", TODAY) == "2024-02-16"
+    assert extract_relative_date("그제 사진", TODAY) == "2024-02-12"
+    assert extract_relative_date("다음 일정", TODAY) is None
+
+def test_ambiguous_centroid_falls_back():
+    """A strict margin sends every non-rule utterance to the LLM"""
+    strict = IntentClassifier(min_margin=1.0)
+    assert strict.predict("안녕하세요") is None
+    assert strict.predict("환율 뉴스") == ("news", {})
+
+def test_eval_set_fast_path_accuracy():
+    """Whatever the fast path answers on the labeled set must be right"""
+    eval_path = Path(__file__).parent.parent / "benchmarks" / "intent_eval.jsonl"
+    examples = [json.loads(line) for line in eval_path.read_text(encoding="utf-8").splitlines() if line.strip()]
+
+    answered = [(e, intent_classifier.predict(e["utterance"], today=TODAY)) for e in examples]
+    answered = [(e, result) for e, result in answered if result is not None]
+
+    assert len(answered) >= len(examples) // 2
+    assert all(result[0] == e["intent"] for e, result in answered)
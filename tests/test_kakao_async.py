@@ -0,0 +1,119 @@
+import json
+import threading
+import time
+
+import pytest
+
+from libs.kakao_async import CallbackDispatcher, WORKER_EVENT_KEY
+
+# The stand-in receiver is plain http on loopback
+LOCAL = {"allowed_hosts": ["127.0.0.1"], "allowed_schemes": ["http"]}
+
+@pytest.fixture
+def receiver(standin):
+    client, state = standin
+    return client.url, state
+
+def make_event(callback_url=None, utterance="안녕"):
+    user_request = {"user": {"id": "user-1"}, "utterance": utterance}
+    if callback_url:
+        user_request["callbackUrl"] = callback_url
+    return {"body": json.dumps({"userRequest": user_request})}
+
+def slow_handler(delay, text="답변"):
+    def handler(event, context):
+        time.sleep(delay)
+        utterance = json.loads(event["body"])["userRequest"]["utterance"]
+        return {"statusCode": 200, "body": json.dumps({"version": "2.0", "template": {"outputs": [
+            {"simpleText": {"text": f"{text}: {utterance}"}}]}})}
+    return handler
+
+def test_thread_mode_acks_before_answer_and_delivers_to_callback_url(receiver):
+    url, state = receiver
+    dispatcher = CallbackDispatcher(mode="thread", **LOCAL)
+
+    t0 = time.perf_counter()
+    resp = dispatcher.handle(make_event(f"{url}/callback/task-1"), None, slow_handler(0.3))
+    ack_seconds = time.perf_counter() - t0
+
+    assert ack_seconds < 0.1
+    assert json.loads(resp["body"]) == {"version": "2.0", "useCallback": True, "data": {"text": dispatcher.ack_text}}
+    assert state.callback_received.wait(5)
+    _, path, payload = state.callbacks[0]
+    assert path == "/callback/task-1"
+    assert payload["template"]["outputs"][0]["simpleText"]["text"] == "답변: 안녕"
+
+    dispatcher.executor.shutdown(wait=True)
+    stats = dispatcher.stats()
+    assert stats["acks"] == 1 and stats["completions"] == 1 and stats["delivery_failures"] == 0
+    assert stats["avg_completion_ms"] >= 300
+
+def test_without_callback_url_or_when_off_answers_synchronously(receiver):
+    url, state = receiver
+    handler = slow_handler(0)
+
+    for dispatcher, event in [
+        (CallbackDispatcher(mode="thread", **LOCAL), make_event()),
+        (CallbackDispatcher(mode="off", **LOCAL), make_event(f"{url}/callback/task-1")),
+    ]:
+        resp = dispatcher.handle(event, None, handler)
+        assert json.loads(resp["body"])["template"]["outputs"][0]["simpleText"]["text"] == "답변: 안녕"
+        assert dispatcher.stats()["acks"] == 0
+    assert state.callbacks == []
+
+def test_handler_failure_delivers_error_template(receiver):
+    url, state = receiver
+    dispatcher = CallbackDispatcher(mode="thread", **LOCAL)
+
+    def failing(event, context):
+        raise RuntimeError("LLM timeout")
+
+    dispatcher.handle(make_event(f"{url}/callback/task-2"), None, failing)
+    assert state.callback_received.wait(5)
+    text = state.callbacks[0][2]["template"]["outputs"][0]["simpleText"]["text"]
+    assert text.startswith("죄송합니다")
+
+def test_lambda_mode_reinvokes_itself_and_worker_delivers(receiver):
+    url, state = receiver
+    invoked = []
+    dispatcher = CallbackDispatcher(mode="lambda", **LOCAL, invoke=lambda payload, context: invoked.append(payload))
+
+    resp = dispatcher.handle(make_event(f"{url}/callback/task-3", "뉴스"), None, slow_handler(0))
+    assert json.loads(resp["body"])["useCallback"] is True
+    assert state.callbacks == []
+
+    # The asynchronous invocation carries the original request and the callbackUrl
+    worker_event = json.loads(json.dumps(invoked[0]))
+    assert worker_event[WORKER_EVENT_KEY]["callbackUrl"] == f"{url}/callback/task-3"
+    dispatcher.handle(worker_event, None, slow_handler(0))
+
+    assert state.callbacks[0][2]["template"]["outputs"][0]["simpleText"]["text"] == "답변: 뉴스"
+    assert dispatcher.stats()["completions"] == 1
+
+def test_dispatch_failure_falls_back_to_synchronous_answer(receiver):
+    url, _ = receiver
+
+    def broken_invoke(payload, context):
+        raise RuntimeError("AccessDenied")
+
+    dispatcher = CallbackDispatcher(mode="lambda", **LOCAL, invoke=broken_invoke)
+    resp = dispatcher.handle(make_event(f"{url}/callback/task-4"), None, slow_handler(0))
+    assert "template" in json.loads(resp["body"])
+
+def test_rejected_callback_is_not_retried(receiver):
+    url, state = receiver
+    dispatcher = CallbackDispatcher(mode="off", **LOCAL, delivery_retries=3)
+
+    assert dispatcher.deliver(f"{url}/expired", {"version": "2.0"}) is False
+    assert len([r for r in state.requests if r[1] == "/expired"]) == 1
+
+def test_callback_url_outside_the_allowlist_is_never_called(receiver):
+    url, state = receiver
+    dispatcher = CallbackDispatcher(mode="thread")  # default: https on Kakao hosts only
+
+    for callback_url in [f"{url}/callback/task-5", "http://bot-api.kakao.com/callback", "https://bot-api.kakao.com.evil.example/x"]:
+        resp = dispatcher.handle(make_event(callback_url), None, slow_handler(0))
+        assert "template" in json.loads(resp["body"])  # answered synchronously, nothing queued
+    assert dispatcher.is_allowed("https://bot-api.kakao.com/v1/bots/abc/callback/xyz")
+    assert dispatcher.deliver(f"{url}/callback/task-5", {"version": "2.0"}) is False
+    assert state.requests == [] and dispatcher.stats()["acks"] == 0
@@ -0,0 +1,59 @@
+import pytest
+from types import SimpleNamespace
+import services.kakao_callback as callback
+from libs.chat_memory import ChatMemoryStore
+from libs.token_budget import estimate_tokens
+
+class FakeOpenAI:
+    requests = []
+
+    def __init__(self):
+        self.chat = SimpleNamespace(completions=self)
+
+    def create(self, model, messages):
+        FakeOpenAI.requests.append(messages)
+        if messages[0]["content"].startswith("이전 요약과"):
+            answer = "요약: 사용자는 환율에 관심이 많다"
+        else:
+            answer = "반가워요!"
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=answer))],
+                               usage=SimpleNamespace(prompt_tokens=123))
+
+def make_history(count, text="오늘 날씨 이야기를 길게 해볼게요. " * 20):
+    return [
+        {"role": "user" if i % 2 == 0 else "assistant", "text": f"{i}: {text}", "timestamp": f"2024-01-01T00:{i // 60:02d}:{i % 60:02d}"}
+        for i in range(count)
+    ]
+
+@pytest.fixture
+def llm(monkeypatch):
+    FakeOpenAI.requests = []
+    monkeypatch.setattr(callback, "get_openai_client", FakeOpenAI)
+    return FakeOpenAI.requests
+
+def test_history_is_packed_into_token_budget(monkeypatch, llm):
+    history = make_history(100)
+    monkeypatch.setattr(callback, "fetch_chat_history", lambda user_id: history)
+    monkeypatch.setattr(callback, "chat_memory", ChatMemoryStore(token_budget=600, max_message_tokens=100))
+
+    assert callback.generate_answer("user-1", "안녕") == "반가워요!"
+
+    messages = llm[0]
+    sent_history = messages[1:-1]
+    assert sum(estimate_tokens(m["content"]) + 4 for m in sent_history) <= 600
+    assert all(estimate_tokens(m["content"]) <= 100 for m in sent_history)
+    # Newest history kept, oldest dropped
+    assert sent_history[-1]["content"].startswith("99: ")
+    assert len(sent_history) < len(history)
+    assert messages[-1] == {"role": "user", "content": "안녕"}
+
+def test_evicted_turns_are_summarized(monkeypatch, llm):
+    monkeypatch.setattr(callback, "fetch_chat_history", lambda user_id: make_history(30))
+    monkeypatch.setattr(callback, "chat_memory",
+                        ChatMemoryStore(token_budget=400, max_message_tokens=100, summarize=callback.summarize_chats))
+
+    callback.generate_answer("user-1", "안녕")
+
+    summary_request, answer_request = llm
+    assert "0: 오늘 날씨" in summary_request[1]["content"]
+    assert answer_request[1] == {"role": "system", "content": "이전 대화 요약: 요약: 사용자는 환율에 관심이 많다"}
@@ -0,0 +1,58 @@
+import json
+import threading
+import pytest
+import services.kakao_callback_project as callback
+
+def make_event(utterance: str):
+    return {"body": json.dumps({"userRequest": {"user": {"id": "test_user"}, "utterance": utterance}})}
+
+@pytest.fixture
+def uploads(monkeypatch):
+    done = threading.Event()
+    uploaded = []
+
+    def fake_upload(user_id, role, text, timestamp=None):
+        uploaded.append((role, text, timestamp))
+        if len(uploaded) == 2:
+            done.set()
+
+    monkeypatch.setattr(callback, "upload_chat_history", fake_upload)
+    yield uploaded, done
+
+def test_news_turn_uses_speculative_retrieval(monkeypatch, uploads):
+    """News-looking utterances are retrieved while the intent is detected, and reused"""
+    uploaded, done = uploads
+    searches = []
+    monkeypatch.setattr(callback, "fetch_chat_history", lambda user_id: [])
+    monkeypatch.setattr(callback, "semantic_search", lambda text: searches.append(text) or [{"title": "환율"}])
+    monkeypatch.setattr(callback, "detect_intent", lambda utterance, ctx: ("news", {}))
+    monkeypatch.setattr(callback, "answer_news_search", lambda utterance, topics=None: f"{len(topics)}건의 기사")
+
+    resp = callback.main(make_event("환율 뉴스"), None)
+
+    body = json.loads(resp["body"])
+    assert body["template"]["outputs"][0]["simpleText"]["text"] == "1건의 기사"
+    assert searches == ["환율 뉴스"]
+
+    # History writes happen in the background, in order
+    assert done.wait(timeout=5)
+    by_role = {role: timestamp for role, _, timestamp in uploaded}
+    assert by_role["user"] <= by_role["assistant"]
+
+def test_chat_turn_waits_for_history(monkeypatch, uploads):
+    history = [{"role": "user", "text": "안녕", "timestamp": "2024-01-01T00:00:00"}]
+    seen = {}
+    monkeypatch.setattr(callback, "fetch_chat_history", lambda user_id: history)
+    monkeypatch.setattr(callback, "detect_intent", lambda utterance, ctx: ("chat", {}))
+
+    def fake_process(user_id, utterance, chat_history, ctx):
+        seen["history"] = chat_history
+        return "반가워요", {"version": "2.0", "template": {"outputs": [{"simpleText": {"text": "반가워요"}}]}}
+
+    monkeypatch.setattr(callback, "process_user_message", fake_process)
+
+    resp = callback.main(make_event("너 뭐 좋아해?"), None)
+
+    assert resp["statusCode"] == 200
+    assert seen["history"] == history
+    assert uploads[1].wait(timeout=5)
@@ -0,0 +1,89 @@
+import json
+import numpy as np
+import pytest
+from types import SimpleNamespace
+import libs.news_search as news_search
+from libs.news_search import fuse_rrf, fuse_scores, hybrid_search
+
+def hit(doc_id, score, embed=None):
+    source = {"title": f"제목 {doc_id}", "summary": "", "sources": []}
+    if embed is not None:
+        source["embed"] = embed
+    return {"_id": doc_id, "_score": score, "_source": source}
+
+def test_fuse_rrf():
+    fused = fuse_rrf([["a", "b", "c"], ["c", "a"]], [1.0, 1.0], rrf_k=60)
+    assert sorted(fused, key=fused.get, reverse=True) == ["a", "c", "b"]
+    assert fused["a"] == pytest.approx(1 / 61 + 1 / 62)
+
+def test_fuse_rrf_weights():
+    fused = fuse_rrf([["a"], ["b"]], [1.0, 2.0])
+    assert fused["b"] > fused["a"]
+
+def test_fuse_scores_normalizes_scales():
+    """BM25 scores in the tens and cosine scores near 1 contribute equally"""
+    fused = fuse_scores([{"a": 30.0, "b": 10.0}, {"b": 0.9, "a": 0.5}], [1.0, 1.0])
+    assert fused == {"a": 1.0, "b": 1.0}
+
+def fake_opensearch(monkeypatch, responses, *more_responses):
+    """Replace the pooled session behind libs.opensearch_client; returns the recorded requests"""
+    calls = []
+    queue = [responses, *more_responses]
+
+    def request(method, url, data, headers, timeout):
+        calls.append({"method": method, "url": url, "data": data.decode("utf-8"), "headers": headers})
+        body = queue[min(len(calls), len(queue)) - 1]  # one response per request, the last one repeats
+        return SimpleNamespace(status_code=200, content=json.dumps(body).encode("utf-8"), json=lambda: body)
+
+    monkeypatch.setattr(news_search.opensearch, "session", SimpleNamespace(request=request))
+    return calls
+
+@pytest.fixture
+def msearch(monkeypatch):
+    responses = {"responses": [
+        {"hits": {"hits": [hit("a", 12.0), hit("b", 8.0), hit("c", 3.0)]}},
+        {"hits": {"hits": [hit("c", 0.91), hit("b", 0.88), hit("d", 0.5)]}},
+    ]}
+    monkeypatch.setattr(news_search.embedding_service, "embed", lambda text: np.zeros(4, dtype=np.float32))
+    return fake_opensearch(monkeypatch, responses)
+
+def test_hybrid_search_single_msearch(msearch):
+    docs = hybrid_search("환율 뉴스", k=2, candidates=5, rerank=False)
+
+    assert len(msearch) == 1
+    assert msearch[0]["method"] == "POST" and msearch[0]["url"].endswith("/topics/_msearch")
+    assert msearch[0]["headers"]["Content-Type"] == "application/x-ndjson"
+    lines = msearch[0]["data"].strip().split("\n")
+    assert len(lines) == 4
+    assert json.loads(lines[1])["size"] == 5
+    assert json.loads(lines[3])["query"]["knn"]["embed"]["k"] == 5
+    # b and c appear in both rankings
+    assert [d["_id"] for d in docs] == ["c", "b"]
+
+def test_hybrid_search_score_fusion(msearch):
+    docs = hybrid_search("환율 뉴스", k=1, fusion="score", lexical_weight=3.0, vector_weight=1.0, rerank=False)
+    assert [d["_id"] for d in docs] == ["a"]
+
+def test_hybrid_search_mmr_rerank(monkeypatch):
+    """Over-fetched candidates are diversified: the near duplicate of the top topic is skipped"""
+    responses = {"responses": [
+        {"hits": {"hits": [hit("a", 12.0), hit("a2", 11.0), hit("b", 5.0), hit("c", 1.0)]}},
+        {"hits": {"hits": [hit("a", 0.9), hit("a2", 0.89), hit("b", 0.7), hit("d", 0.1)]}},
+    ]}
+    embeds = {"docs": [
+        {"_id": "a", "found": True, "_source": {"embed": [1.0, 0.0]}},
+        {"_id": "a2", "found": True, "_source": {"embed": [0.99, 0.1]}},
+        {"_id": "b", "found": True, "_source": {"embed": [0.0, 1.0]}},
+    ]}
+    calls = fake_opensearch(monkeypatch, responses, embeds)
+    monkeypatch.setattr(news_search.embedding_service, "embed", lambda text: np.array([1.0, 0.2], dtype=np.float32))
+
+    docs = hybrid_search("환율 뉴스", k=2, candidates=3, rerank=True, mmr_lambda=0.5)
+
+    assert [d["_id"] for d in docs] == ["a", "b"]
+    assert all("embed" not in d for d in docs)
+    # The _msearch never returns embeddings; only the top `candidates` fused ids are fetched with _mget
+    lexical = json.loads(calls[0]["data"].split("\n")[1])
+    assert "embed" not in lexical["_source"] and lexical["size"] == 3
+    assert calls[1]["url"].endswith("/topics/_mget?_source=embed")
+    assert json.loads(calls[1]["data"]) == {"ids": ["a", "a2", "b"]}
@@ -0,0 +1,84 @@
+import json
+import threading
+import pytest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from libs.opensearch_client import OpenSearchClient, endpoint_name
+
+@pytest.fixture
+def server():
+    """OpenSearch stand-in that answers 429 to the first `throttle` requests"""
+    state = {"throttle": 0, "requests": []}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _handle(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            state["requests"].append((self.command, self.path, body))
+            status = 429 if state["throttle"] > 0 else 200
+            state["throttle"] -= 1
+            payload = json.dumps({"hits": {"hits": []}} if status == 200 else {"error": "too many requests"}).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        do_GET = do_PUT = do_POST = _handle
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}", state
+    httpd.shutdown()
+
+def test_endpoint_name_drops_ids():
+    assert endpoint_name("PUT", "chat-history/_doc/abc123") == "PUT /chat-history/_doc"
+    assert endpoint_name("POST", "/topics/_msearch") == "POST /topics/_msearch"
+    assert endpoint_name("POST", "topics/_search?scroll=2m") == "POST /topics/_search"
+
+def test_connections_are_reused(server):
+    url, state = server
+    client = OpenSearchClient(url=url, auth=None)
+
+    for _ in range(5):
+        assert client.get("chat-history/_search", {"query": {"term": {"user_id": "사용자"}}}).status_code == 200
+    client.put("chat-history/_doc/1", {"text": "안녕"})
+
+    stats = client.stats()
+    assert stats["connections_opened"] == 1
+    assert stats["connections_reused"] == 5
+    assert stats["endpoints"]["GET /chat-history/_search"]["count"] == 5
+    assert stats["endpoints"]["PUT /chat-history/_doc"]["count"] == 1
+    # Compact UTF-8 JSON body
+    assert state["requests"][-1][2] == '{"text":"안녕"}'.encode("utf-8")
+
+def test_ndjson_body(server):
+    url, state = server
+    client = OpenSearchClient(url=url, auth=None)
+
+    client.post("topics/_msearch", [{}, {"size": 2}], ndjson=True)
+
+    assert state["requests"][0][2] == b'{}\n{"size":2}\n'
+
+def test_retries_429_with_backoff(server):
+    url, state = server
+    state["throttle"] = 2
+    client = OpenSearchClient(url=url, auth=None, max_retries=3, retry_backoff=0.01)
+
+    resp = client.post("topics/_search", {"size": 1})
+
+    assert resp.status_code == 200
+    assert len(state["requests"]) == 3
+    assert client.stats()["endpoints"]["POST /topics/_search"]["errors"] == 0
+
+def test_gives_up_after_max_retries(server):
+    url, state = server
+    state["throttle"] = 10
+    client = OpenSearchClient(url=url, auth=None, max_retries=1, retry_backoff=0.01)
+
+    assert client.get("topics/_search").status_code == 429
+    assert len(state["requests"]) == 2
+    assert client.stats()["endpoints"]["GET /topics/_search"]["errors"] == 1
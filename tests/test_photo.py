@@ -0,0 +1,96 @@
+import datetime as dt
+import json
+
+import pytest
+
+import libs.photo as photo
+from libs.photo import MORE_PATTERN, PhotoCursors
+
+@pytest.fixture
+def standin(standin, monkeypatch):
+    client, state = standin
+    monkeypatch.setattr(photo, "opensearch", client)
+    monkeypatch.setattr(photo, "photo_cursors", PhotoCursors())
+
+    # 23 photos from 2024-02-12 to 2024-02-14, two on the 15th, one for another user
+    first = dt.datetime(2024, 2, 12, 8, 0)
+    docs = {f"p{i:02d}": {"user_id": "u1", "photo_id": f"p{i:02d}", "photo_url": f"https://img/{i}.jpg", "description": f"사진 {i}",
+                          "timestamp": (first + dt.timedelta(hours=2 * i, microseconds=i)).isoformat()}
+            for i in range(23)}
+    docs.update({f"q{i}": {"user_id": "u1", "photo_id": f"q{i}", "photo_url": f"https://img/q{i}.jpg", "description": "",
+                           "timestamp": f"2024-02-15T0{i}:00:00"} for i in range(2)})
+    docs["other"] = {"user_id": "u2", "photo_url": "https://img/other.jpg", "description": "", "timestamp": "2024-02-13T12:00:00"}
+    state.indices["user-photos"] = docs
+    return state
+
+def carousel_urls(body):
+    return [item["thumbnail"]["imageUrl"] for item in body["template"]["outputs"][0]["carousel"]["items"]]
+
+def test_range_lookup_pages_through_every_photo_once(standin):
+    body, answer = photo.generate_photo_answer("u1", {"photo_date": "2024-02-12", "photo_end_date": "2024-02-14"})
+
+    pages = [carousel_urls(body)]
+    assert answer.startswith("2024-02-12 ~ 2024-02-14에 업로드된 사진 1~10번째")
+    assert body["template"]["quickReplies"][0]["messageText"] == "더 보여줘"
+    while "quickReplies" in body["template"]:
+        assert photo.wants_more_photos("u1", "더 보여줘")
+        body, answer = photo.generate_photo_answer("u1", {"photo_more": True})
+        pages.append(carousel_urls(body))
+
+    assert [len(page) for page in pages] == [10, 10, 3]
+    assert answer == "2024-02-12 ~ 2024-02-14에 업로드된 사진 21~23번째를 표시합니다."
+    assert sum(pages, []) == [f"https://img/{i}.jpg" for i in reversed(range(23))]  # newest first, nothing repeated
+    assert not photo.wants_more_photos("u1", "더 보여줘")
+
+def test_photos_sharing_a_timestamp_are_not_skipped_at_page_boundaries(standin):
+    standin.indices["user-photos"] = {
+        f"s{i:02d}": {"user_id": "u1", "photo_id": f"s{i:02d}", "photo_url": f"https://img/s{i}.jpg", "description": "",
+                      "timestamp": "2024-03-01T12:00:00"}  # one burst upload, identical timestamps
+        for i in range(15)
+    }
+
+    first, _ = photo.generate_photo_answer("u1", {"photo_date": "2024-03-01"})
+    second, _ = photo.generate_photo_answer("u1", {"photo_more": True})
+
+    assert carousel_urls(first) + carousel_urls(second) == [f"https://img/s{i}.jpg" for i in range(15)]
+    assert "quickReplies" not in second["template"]
+
+def test_search_fetches_one_page_of_rendered_fields(standin):
+    photo.generate_photo_answer("u1", {"photo_date": "2024-02-12", "photo_end_date": "2024-02-14"})
+    photo.generate_photo_answer("u1", {"photo_more": True})
+
+    searches = [json.loads(body) for method, path, body in standin.requests if path.endswith("_search")]
+    assert [s["size"] for s in searches] == [11, 11]
+    assert searches[0]["_source"] == ["photo_url", "description", "timestamp"]
+    assert "search_after" not in searches[0] and searches[1]["search_after"]
+
+def test_single_day_includes_the_whole_day(standin):
+    body, answer = photo.generate_photo_answer("u1", {"photo_date": "2024-02-15"})
+
+    assert carousel_urls(body) == ["https://img/q1.jpg", "https://img/q0.jpg"]
+    assert "quickReplies" not in body["template"]
+    assert answer == "2024-02-15에 업로드된 사진 1~2번째를 표시합니다."
+
+def test_no_photos_and_no_cursor(standin):
+    body, answer = photo.generate_photo_answer("u1", {"photo_date": "2024-03-01"})
+    assert answer == "2024-03-01에 업로드된 사진이 없습니다."
+    assert body["template"]["outputs"][0]["simpleText"]["text"] == answer
+
+    _, answer = photo.generate_photo_answer("u1", {"photo_more": True})
+    assert answer.startswith("이어서 보여드릴 사진이 없습니다")
+
+def test_cursor_expires():
+    cursors = PhotoCursors(ttl_seconds=0)
+    cursors.set("u1", {"start": "2024-02-12"})
+    assert cursors.get("u1") is None
+
+@pytest.mark.parametrize("utterance,expected", [
+    ("더 보여줘", True),
+    ("사진 더 보여줘", True),
+    ("다음 사진", True),
+    ("계속", True),
+    ("다음 일정 알려줘", False),
+    ("어제 사진 보여줘", False),
+])
+def test_more_pattern(utterance, expected):
+    assert (MORE_PATTERN.search(utterance) is not None) == expected
@@ -1,6 +1,7 @@
 import pytest
 from typing import List, Dict
-from libs.prompt_chains import detect_intent, generate_chat_response, process_user_message
+import libs.prompt_chains as prompt_chains
+from libs.prompt_chains import RequestContext, detect_intent, generate_chat_response, process_user_message
 from config import *
 
 # Mock chat history for testing
@@ -70,6 +71,50 @@ def test_full_conversation_flow():
         assert response is not None
         assert len(response) > 0
 
+class CountingChain:
+    """Stands in for an LLMChain and counts invocations"""
+    def __init__(self, output_key: str, output: str):
+        self.output_key = output_key
+        self.output = output
+        self.calls = []
+
+    def invoke(self, inputs):
+        self.calls.append(inputs)
+        return {self.output_key: self.output}
+
+class CountingTranslator:
+    def __init__(self):
+        self.translated = []
+
+    def translate_batch(self, texts):
+        self.translated.extend(texts)
+        return [(f"en({text})", True) for text in texts]
+
+def test_turn_runs_intent_and_translation_once(monkeypatch):
+    """One Kakao chat turn: one intent LLM call, one chat LLM call, one translation per text"""
+    intent_chain = CountingChain("intent_output", '{"intent": "chat", "params": {}}')
+    chat_chain = CountingChain("response", "안녕하세요! 저는 자비스예요.")
+    fake_translator = CountingTranslator()
+    monkeypatch.setattr(prompt_chains, "INTENT_FAST_PATH_ENABLED", False)
+    monkeypatch.setattr(prompt_chains, "intent_chain", intent_chain)
+    monkeypatch.setattr(prompt_chains, "chat_chain", chat_chain)
+    monkeypatch.setattr(prompt_chains, "translator", fake_translator)
+    monkeypatch.setattr(prompt_chains.response_cache, "enabled", False)
+
+    utterance = "너는 누구니?"
+    ctx = RequestContext("test_user", utterance)
+    # Same call sequence as services/kakao_callback_project.main
+    intent, params = detect_intent(utterance, ctx)
+    response, body = process_user_message("test_user", utterance, MOCK_CHAT_HISTORY, ctx)
+
+    assert intent == "chat"
+    assert response == "안녕하세요! 저는 자비스예요."
+    assert len(intent_chain.calls) == 1
+    assert len(chat_chain.calls) == 1
+    assert sorted(fake_translator.translated) == sorted([utterance, "안녕하세요"])
+    assert chat_chain.calls[0]["utterance"] == f"en({utterance})"
+    assert [m.content for m in chat_chain.calls[0]["history"]] == ["en(안녕하세요)", "안녕하세요! 무엇을 도와드릴까요?"]
+
 if __name__ == "__main__":
     # Run tests with more detailed output
     print("Running intent detection tests...")
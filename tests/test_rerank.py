@@ -0,0 +1,34 @@
+import time
+import numpy as np
+import pytest
+from libs.rerank import mmr_rerank
+
+def test_mmr_skips_near_duplicates():
+    query = np.array([1.0, 0.0, 0.0])
+    candidates = np.array([
+        [0.95, 0.31, 0.0],   # most relevant
+        [0.94, 0.33, 0.0],   # near duplicate of the first
+        [0.80, 0.0, 0.60],   # less relevant, different topic
+    ])
+    assert mmr_rerank(query, candidates, k=2, lambda_mult=0.5) == [0, 2]
+    # Pure relevance keeps the duplicate
+    assert mmr_rerank(query, candidates, k=2, lambda_mult=1.0) == [0, 1]
+
+def test_mmr_uses_given_relevance():
+    candidates = np.eye(3)
+    assert mmr_rerank(np.ones(3), candidates, k=3, relevance=np.array([0.1, 0.9, 0.5])) == [1, 2, 0]
+
+def test_mmr_edge_cases():
+    assert mmr_rerank(np.ones(4), np.empty((0, 4)), k=2) == []
+    assert mmr_rerank(np.ones(4), np.ones((1, 4)), k=5) == [0]
+
+def test_mmr_rerank_is_fast_for_100_candidates():
+    rng = np.random.default_rng(0)
+    query = rng.standard_normal(3072).astype(np.float32)
+    candidates = rng.standard_normal((100, 3072)).astype(np.float32)
+    mmr_rerank(query, candidates, k=2)
+
+    t0 = time.perf_counter()
+    for _ in range(20):
+        mmr_rerank(query, candidates, k=5)
+    assert (time.perf_counter() - t0) / 20 < 0.02
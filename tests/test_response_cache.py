@@ -0,0 +1,90 @@
+import pytest
+from libs.intent_classifier import intent_classifier
+from config import RESPONSE_CACHE_TTLS
+from libs.response_cache import ResponseCache, response_cache
+
+TTLS = {"news": 600, "chat": 300}
+
+class Counter:
+    def __init__(self, answer="답변"):
+        self.answer = answer
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return f"{self.answer} {self.calls}"
+
+def make_cache(**kwargs) -> ResponseCache:
+    return ResponseCache(enabled=True, ttls=TTLS, embed=intent_classifier.embed, **kwargs)
+
+def test_exact_hit_with_normalized_inputs():
+    cache = make_cache()
+    llm = Counter()
+
+    first = cache.get_or_compute("news", "news_answer", {"utterance": "환율 뉴스"}, llm, doc_ids=["a", "b"])
+    second = cache.get_or_compute("news", "news_answer", {"utterance": " 환율  뉴스 "}, llm, doc_ids=["a", "b"])
+
+    assert first == second == "답변 1"
+    assert llm.calls == 1
+    assert cache.stats()["news"]["hit_rate"] == 0.5
+
+def test_different_documents_miss():
+    cache = make_cache()
+    llm = Counter()
+    cache.get_or_compute("news", "news_answer", {"utterance": "환율 뉴스"}, llm, doc_ids=["a"])
+    cache.get_or_compute("news", "news_answer", {"utterance": "환율 뉴스"}, llm, doc_ids=["b"])
+    assert llm.calls == 2
+
+def test_similar_utterance_hit():
+    cache = make_cache(similarity_threshold=0.8)
+    llm = Counter()
+    cache.get_or_compute("news", "news_answer", {"utterance": "오늘 환율 뉴스 알려줘"}, llm,
+                         doc_ids=["a"], similar_text="오늘 환율 뉴스 알려줘")
+    answer = cache.get_or_compute("news", "news_answer", {"utterance": "오늘 환율 뉴스 알려줘요"}, llm,
+                                  doc_ids=["a"], similar_text="오늘 환율 뉴스 알려줘요")
+
+    assert answer == "답변 1"
+    assert cache.stats()["news"]["similar_hits"] == 1
+
+def test_opposite_questions_miss_by_default():
+    """Without an embed function only exact keys hit, so wording-alike questions are answered separately"""
+    cache = ResponseCache(enabled=True, ttls=TTLS)
+    llm = Counter()
+    for text in ["금리 인상됐어?", "금리 인하됐어?", "오늘 코스피 올랐는지 알려줘", "어제 코스피 내렸는지 알려줘"]:
+        cache.get_or_compute("news", "news_answer", {"utterance": text}, llm, doc_ids=["a"], similar_text=text)
+
+    assert llm.calls == 4
+    assert response_cache.embed is None
+    assert "chat" not in RESPONSE_CACHE_TTLS
+
+def test_scope_isolates_users():
+    """Answers built from personal context are never shared across users"""
+    cache = make_cache()
+    llm = Counter()
+    cache.get_or_compute("chat", "chat_chain", {"utterance": "내 이름 뭐야?"}, llm, scope="user-1")
+    cache.get_or_compute("chat", "chat_chain", {"utterance": "내 이름 뭐야?"}, llm, scope="user-2")
+    assert llm.calls == 2
+
+def test_ttl_and_uncached_intents(monkeypatch):
+    cache = make_cache()
+    llm = Counter()
+    now = [1000.0]
+    monkeypatch.setattr("libs.response_cache.time.time", lambda: now[0])
+
+    cache.get_or_compute("news", "news_answer", {"utterance": "환율 뉴스"}, llm)
+    now[0] += 601
+    cache.get_or_compute("news", "news_answer", {"utterance": "환율 뉴스"}, llm)
+    assert llm.calls == 2
+
+    # No TTL configured for schedule: always computed
+    cache.get_or_compute("schedule", "schedule_answer", {"utterance": "내일 일정"}, llm)
+    cache.get_or_compute("schedule", "schedule_answer", {"utterance": "내일 일정"}, llm)
+    assert llm.calls == 4
+
+def test_lru_bound():
+    cache = make_cache(max_entries=2)
+    llm = Counter()
+    for text in ["하나", "둘", "셋"]:
+        cache.get_or_compute("news", "news_answer", {"utterance": text}, llm)
+    cache.get_or_compute("news", "news_answer", {"utterance": "하나"}, llm)
+    assert llm.calls == 4
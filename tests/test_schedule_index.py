@@ -0,0 +1,127 @@
+import datetime as dt
+from types import SimpleNamespace
+
+import pytest
+
+import libs.schedule as schedule
+from libs.schedule_index import ScheduleIndex
+
+NOW = dt.datetime(2024, 2, 14, 10, 0)  # Wednesday
+
+SCHEDULES = [
+    ("a", "u1", "2024-02-14", "09:00", "조회"),
+    ("b", "u1", "2024-02-14", "", "생일"),
+    ("c", "u1", "2024-02-14", "15:00", "회의"),
+    ("d", "u1", "2024-02-16", "19:00", "저녁 약속"),
+    ("e", "u1", "2024-02-20", "10:00", "치과"),
+    ("f", "u1", "2024-03-02", "11:00", "결혼식"),
+    ("g", "u1", "2023-12-01", "11:00", "오래된 일정"),
+    ("h", "u2", "2024-02-14", "16:00", "다른 사용자"),
+]
+
+@pytest.fixture
+def standin(standin):
+    client, state = standin
+    state.indices["schedule"] = {
+        doc_id: {"user_id": user_id, "date": date, "time": time, "text": text, "timestamp": "2024-02-01T00:00:00"}
+        for doc_id, user_id, date, time, text in SCHEDULES
+    }
+    return client, state
+
+def texts(schedules):
+    return [x["text"] for x in schedules]
+
+def test_between_upcoming_and_overlaps(standin):
+    client, state = standin
+    index = ScheduleIndex(client=client)
+
+    assert texts(index.between("u1", dt.date(2024, 2, 12), dt.date(2024, 2, 18), NOW.date())) == ["생일", "조회", "회의", "저녁 약속"]
+    assert texts(index.upcoming("u1", NOW, 3)) == ["생일", "회의", "저녁 약속"]  # 09:00 already passed
+    assert texts(index.overlaps("u1", dt.datetime(2024, 2, 14, 15, 30), dt.datetime(2024, 2, 14, 16, 30))) == ["생일", "회의"]
+    assert index.overlaps("u1", dt.datetime(2024, 2, 16, 20, 0), dt.datetime(2024, 2, 16, 21, 0)) == []
+
+    # One load per user, served from memory afterwards
+    assert index.stats()["loads"] == 1
+    assert len([r for r in state.requests if "_search" in r[1]]) == 1
+
+def test_ranges_outside_the_loaded_window_return_none(standin):
+    client, _ = standin
+    assert ScheduleIndex(client=client).between("u1", dt.date(2023, 12, 1), dt.date(2023, 12, 31), NOW.date()) is None
+
+    # Loading stopped at 2024-02-16, which may itself be only partly loaded
+    truncated = ScheduleIndex(client=client, max_events=4)
+    assert truncated.between("u1", dt.date(2024, 2, 12), dt.date(2024, 2, 18), NOW.date()) is None
+    assert truncated.between("u1", dt.date(2024, 2, 16), dt.date(2024, 2, 16), NOW.date()) is None
+    assert texts(truncated.between("u1", dt.date(2024, 2, 14), dt.date(2024, 2, 15), NOW.date())) == ["생일", "조회", "회의"]
+    assert texts(truncated.upcoming("u1", NOW, 2)) == ["생일", "회의"]
+    assert truncated.upcoming("u1", NOW, 5) is None
+
+def test_saved_schedule_is_visible_before_reload(standin):
+    client, _ = standin
+    index = ScheduleIndex(client=client)
+    index.between("u1", NOW.date(), NOW.date(), NOW.date())
+
+    index.note_save("u1", {"date": "2024-02-14", "time": "12:00", "text": "점심"})
+
+    assert texts(index.upcoming("u1", NOW, 2)) == ["생일", "점심"]
+    assert index.stats()["loads"] == 1
+
+@pytest.fixture
+def use_standin(standin, monkeypatch):
+    client, state = standin
+    monkeypatch.setattr(schedule, "opensearch", client)
+    monkeypatch.setattr(schedule, "schedule_index", ScheduleIndex(client=client, enabled=False))
+    monkeypatch.setattr(schedule.datetime, "datetime", type("FrozenDatetime", (dt.datetime,), {"now": classmethod(lambda cls: NOW)}))
+    return client, state
+
+def test_week_lookup_is_one_range_query_rendered_as_list_card(use_standin):
+    _, state = use_standin
+
+    body, answer = schedule.generate_schedule_answer("u1", "이번 주 일정 알려줘")
+
+    card = body["template"]["outputs"][0]["listCard"]
+    assert card["header"]["title"] == "2024-02-12 ~ 2024-02-18 일정"
+    assert [item["title"] for item in card["items"]] == ["생일", "조회", "회의", "저녁 약속"]
+    assert card["items"][0]["description"] == "2024-02-14 (수)"
+    assert len([r for r in state.requests if "_search" in r[1]]) == 1
+
+def test_more_than_five_schedules_become_a_carousel(use_standin):
+    _, state = use_standin
+    for i in range(7):
+        state.indices["schedule"][f"x{i}"] = {"user_id": "u1", "date": "2024-02-21", "time": f"1{i}:00", "text": f"일정 {i}"}
+
+    body, _ = schedule.generate_schedule_answer("u1", "다음 주 일정 보여줘")
+
+    carousel = body["template"]["outputs"][0]["carousel"]
+    assert carousel["type"] == "listCard"
+    assert [len(card["items"]) for card in carousel["items"]] == [5, 3]
+    assert carousel["items"][0]["header"]["title"] == "2024-02-19 ~ 2024-02-25 일정 (8개)"
+
+def test_upcoming_from_opensearch_and_from_the_index(use_standin, monkeypatch):
+    client, _ = use_standin
+
+    _, answer = schedule.generate_schedule_answer("u1", "다음 일정 뭐야?")
+    assert answer == "다가오는 일정: 2024-02-14 (수) 생일"
+
+    monkeypatch.setattr(schedule, "schedule_index", ScheduleIndex(client=client, enabled=True))
+    body, _ = schedule.generate_schedule_answer("u1", "앞으로 일정 3개 알려줘")
+    assert [item["title"] for item in body["template"]["outputs"][0]["listCard"]["items"]] == ["생일", "회의", "저녁 약속"]
+
+def test_save_reports_overlapping_schedule(use_standin, monkeypatch):
+    client, state = use_standin
+    monkeypatch.setattr(schedule, "schedule_index", ScheduleIndex(client=client, enabled=True))
+
+    _, answer = schedule.generate_schedule_answer("u1", "오늘 오후 3시 반에 미팅 저장해줘")
+
+    assert answer.startswith("다음 일정을 저장했습니다. [미팅] 2024-02-14 15:30")
+    assert "[회의] 2024-02-14 (수) 15:00" in answer and "[생일]" in answer
+    assert any(doc["text"] == "미팅" for doc in state.indices["schedule"].values())
+
+def test_legacy_text_mapping_fails_with_migration_hint(monkeypatch):
+    class LegacyIndex:
+        def get(self, path, body):
+            return SimpleNamespace(status_code=400, text='{"error": "Text fields are not optimised for sorting ... [time]"}')
+
+    monkeypatch.setattr(schedule, "opensearch", LegacyIndex())
+    with pytest.raises(RuntimeError, match="manage_schema.py apply --index schedule --migrate-existing"):
+        schedule.fetch_schedules("u1", "2024-02-12", "2024-02-18")
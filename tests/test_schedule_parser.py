@@ -0,0 +1,134 @@
+import datetime as dt
+import json
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+import libs.schedule as schedule
+from libs.schedule_parser import parse_date, parse_schedule_request, parse_time
+
+NOW = dt.datetime(2024, 2, 14, 10, 0)  # Wednesday
+
+@pytest.mark.parametrize("text,expected", [
+    ("오늘", "2024-02-14"),
+    ("모레", "2024-02-16"),
+    ("다음 주 화요일", "2024-02-20"),
+    ("다다음주 월요일", "2024-02-26"),
+    ("지난주 금요일", "2024-02-09"),
+    ("금요일", "2024-02-16"),
+    ("수요일", "2024-02-14"),
+    ("이번 주말", "2024-02-17"),
+    ("3일 후", "2024-02-17"),
+    ("이틀 뒤", "2024-02-16"),
+    ("한 달 뒤", "2024-03-14"),
+    ("다음 달 3일", "2024-03-03"),
+    ("3월 5일", "2024-03-05"),
+    ("2/29", "2024-02-29"),
+    ("2024년 12월 25일", "2024-12-25"),
+    ("2월 30일", None),
+    ("다음에", None),
+])
+def test_parse_date(text, expected):
+    result = parse_date(text, NOW.date())
+    assert (result[0].isoformat() if result else None) == expected
+
+@pytest.mark.parametrize("text,expected", [
+    ("오후 7시", "19:00"),
+    ("3시 반", "15:30"),
+    ("아침 8시", "08:00"),
+    ("오전 12시", "00:00"),
+    ("밤 12시", "00:00"),
+    ("낮 12시", "12:00"),
+    ("저녁 여덟시", "20:00"),
+    ("열두시 반", "12:30"),
+    ("10시 20분", "10:20"),
+    ("14:30", "14:30"),
+    ("정오", "12:00"),
+    ("한 시간 동안", None),
+])
+def test_parse_time(text, expected):
+    result = parse_time(text)
+    assert (result[0] if result else None) == expected
+
+def test_time_without_date_is_the_next_occurrence():
+    assert parse_schedule_request("3시 반에 팀 회의 있어", NOW)["date"] == "2024-02-14"
+    assert parse_schedule_request("9시에 조회 있어", NOW)["date"] == "2024-02-15"
+
+def test_yearless_past_date_is_saved_for_next_year():
+    assert parse_schedule_request("1월 3일 동창회 저장해줘", NOW)["date"] == "2025-01-03"
+    assert parse_schedule_request("1월 3일 일정 뭐였지?", NOW)["date"] == "2024-01-03"
+
+def test_leap_day_saved_for_next_year_is_clamped():
+    request = parse_schedule_request("2월 29일 생일 저장해줘", dt.datetime(2024, 3, 1, 10, 0))
+    assert (request["date"], request["title"]) == ("2025-02-28", "생일")
+
+def test_relative_days_inside_other_words_are_not_dates():
+    request = parse_schedule_request("3시에 메일 보낼 거 기억해줘", NOW)
+    assert (request["date"], request["title"]) == ("2024-02-14", "메일 보낼 거")
+    assert parse_date("지금일 하는 중", NOW.date()) is None
+    assert parse_date("낼 봐", NOW.date())[0].isoformat() == "2024-02-15"
+
+def test_conflicting_or_incomplete_requests_fall_back():
+    assert parse_schedule_request("내일 회의 저장했는지 확인해줘", NOW) is None  # save and lookup cues
+    assert parse_schedule_request("내일 저장해줘", NOW) is None  # nothing to save
+    assert parse_schedule_request("내일 일정 추가해줘", NOW) is None  # no schedule name
+    assert parse_schedule_request("3시에 스케줄 등록해줘", NOW) is None
+    assert parse_schedule_request("약속 언제였지?", NOW) is None  # no date
+
+def test_eval_set_local_parser_accuracy():
+    """Whatever the local parser answers on the labeled set must be right"""
+    eval_path = Path(__file__).parent.parent / "benchmarks" / "schedule_eval.jsonl"
+    examples = [json.loads(line) for line in eval_path.read_text(encoding="utf-8").splitlines() if line.strip()]
+
+    answered = [(e, parse_schedule_request(e.pop("utterance"), NOW)) for e in examples]
+    answered = [(e, result) for e, result in answered if result is not None]
+
+    assert len(answered) >= len(examples) * 0.8
+    assert all(result == e for e, result in answered)
+
+class FakeOpenSearch:
+    def __init__(self, hits=()):
+        self.hits = list(hits)
+        self.saved = []
+
+    def put(self, path, body):
+        self.saved.append((path, body))
+        return SimpleNamespace(status_code=201)
+
+    def get(self, path, body):
+        return SimpleNamespace(status_code=200, json=lambda: {"hits": {"hits": [{"_source": h} for h in self.hits]}})
+
+def test_generate_schedule_answer_saves_without_llm(monkeypatch):
+    store = FakeOpenSearch()
+    monkeypatch.setattr(schedule, "opensearch", store)
+    monkeypatch.setattr(schedule, "get_openai_client", lambda: pytest.fail("LLM should not be called"))
+
+    body, answer = schedule.generate_schedule_answer("user-1", "모레 오후 3시 치과 예약 기억해줘")
+
+    doc = store.saved[0][1]
+    assert (doc["text"], doc["time"]) == ("치과 예약", "15:00")
+    assert answer == f"다음 일정을 저장했습니다. [치과 예약] {doc['date']} 15:00"
+    assert body["template"]["outputs"][0]["simpleText"]["text"] == answer
+
+def test_generate_schedule_answer_falls_back_to_structured_llm(monkeypatch):
+    requests = []
+
+    class FakeOpenAI:
+        def __init__(self):
+            self.chat = SimpleNamespace(completions=self)
+
+        def create(self, model, messages, response_format):
+            requests.append(response_format)
+            content = json.dumps({"action": "lookup", "title": "", "date": "2024-02-20", "end_date": None, "time": None, "limit": None})
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+    store = FakeOpenSearch([{"date": "2024-02-20", "time": " 15:00", "text": "약속", "timestamp": "2024-02-10T00:00:00"}])
+    monkeypatch.setattr(schedule, "opensearch", store)
+    monkeypatch.setattr(schedule, "get_openai_client", FakeOpenAI)
+
+    body, answer = schedule.generate_schedule_answer("user-1", "약속 언제였지?")
+
+    assert requests[0]["type"] == "json_schema"
+    assert answer == "2024-02-20 일정: 2024-02-20 (화) 15:00 약속"
+    assert body["template"]["outputs"][0]["listCard"]["items"] == [{"title": "약속", "description": "2024-02-20 (화) 15:00"}]
@@ -0,0 +1,44 @@
+from libs.sqlite_kv import SQLiteKV
+
+def make_store(tmp_path, namespace="ns", **kwargs):
+    return SQLiteKV(str(tmp_path / "kv.sqlite3"), "entries", namespace, max_entries=kwargs.pop("max_entries", 10), **kwargs)
+
+def test_put_get_and_namespaces(tmp_path):
+    store = make_store(tmp_path)
+    store.put_many([("a", "1"), ("b", b"\x00\x01")], created_at=5.0)
+
+    assert store.get("a") == ("1", 5.0)
+    assert store.get("b") == (b"\x00\x01", 5.0)
+    assert make_store(tmp_path, namespace="other").get("a") is None
+
+    store.clear()
+    assert store.get("a") is None
+
+def test_expired_rows_are_misses(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("libs.sqlite_kv.time.time", lambda: now[0])
+    store = make_store(tmp_path, ttl_seconds=10)
+
+    store.put("a", "1")
+    now[0] += 11
+
+    assert store.get("a") is None
+
+def test_trim_keeps_newest_rows(tmp_path):
+    store = make_store(tmp_path, max_entries=3)
+    store.TRIM_INTERVAL = 1
+    for i in range(5):
+        store.put(f"k{i}", str(i), created_at=float(i))
+
+    assert store.conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0] == 3
+    assert store.get("k1") is None and store.get("k4") == ("4", 4.0)
+
+def test_errors_are_misses(tmp_path):
+    store = make_store(tmp_path)
+    store.conn.execute("DROP TABLE entries")  # like a corrupt cache file
+
+    store.put("a", "1")
+    assert store.get("a") is None
+
+    unavailable = SQLiteKV(str(tmp_path / "missing" / "kv.sqlite3"), "entries", "ns", max_entries=10)
+    assert not unavailable.available and unavailable.get("a") is None
@@ -1,5 +1,6 @@
 import pytest
-from libs.translation_handler import translator
+from libs.translation_cache import TranslationCache
+from libs.translation_handler import TranslationHandler, split_into_chunks, translator
 
 TEST_CASES = [
     # (input_text, expected_is_korean)
@@ -10,6 +11,12 @@ TEST_CASES = [
     ("Today is a good day", False),
 ]
 
+KOREAN_TEXTS = [
+    "안녕하세요, 오늘 날씨가 좋네요",
+    "내일 일정을 알려주세요",
+    "사진을 보여주세요"
+]
+
 @pytest.mark.parametrize("text,expected_is_korean", TEST_CASES)
 def test_language_detection(text: str, expected_is_korean: bool):
     """Test language detection functionality"""
@@ -20,16 +27,150 @@ def test_language_detection(text: str, expected_is_korean: bool):
     assert is_korean == expected_is_korean
     assert 0 <= confidence <= 1
 
-def test_translation():
-    """Test Korean to English translation"""
-    korean_texts = [
-        "안녕하세요, 오늘 날씨가 좋네요",
+def test_model_loads_lazily():
+    """English-only traffic must not load the MarianMT model"""
+    handler = TranslationHandler()
+    assert not handler.is_loaded
+
+    handler.detect_language("안녕하세요")
+    translated, was_translated = handler.process_text("Show me the schedule")
+
+    assert not was_translated
+    assert translated == "Show me the schedule"
+    assert not handler.is_loaded
+
+class FakeTokenizer:
+    """Stands in for MarianTokenizer: 'tokens' are the texts themselves"""
+    def __call__(self, texts, **kwargs):
+        return {"input_ids": list(texts)}
+
+    def batch_decode(self, outputs, skip_special_tokens=True):
+        return [f"en({text})" for text in outputs]
+
+class FakeModel:
+    def __init__(self):
+        self.batches = []
+
+    def generate(self, input_ids):
+        self.batches.append(list(input_ids))
+        return input_ids
+
+def make_fake_handler() -> TranslationHandler:
+    handler = TranslationHandler(cache=TranslationCache(namespace="fake", enabled=True, disk_path=""))
+    handler.ko_en_tokenizer = FakeTokenizer()
+    handler.ko_en_model = FakeModel()
+    return handler
+
+def test_translate_batch_order_and_packing():
+    """Only Korean cache misses are generated, length-sorted, results in input order"""
+    handler = make_fake_handler()
+    handler.cache.set("사진을 보여주세요", "Show me the photos")
+    texts = [
+        "Hello, how are you?",
         "내일 일정을 알려주세요",
-        "사진을 보여주세요"
+        "사진을 보여주세요",
+        "안녕",
+        "내일 일정을 알려주세요",
+        "오늘 날씨가 정말 좋네요",
     ]
-    
+
+    results = handler.translate_batch(texts, batch_size=2)
+
+    assert results == [
+        ("Hello, how are you?", False),
+        ("en(내일 일정을 알려주세요)", True),
+        ("Show me the photos", True),
+        ("en(안녕)", True),
+        ("en(내일 일정을 알려주세요)", True),
+        ("en(오늘 날씨가 정말 좋네요)", True),
+    ]
+    # Duplicates are translated once; batches are packed shortest first
+    assert handler.ko_en_model.batches == [["안녕", "내일 일정을 알려주세요"], ["오늘 날씨가 정말 좋네요"]]
+    # Batched results are cached for later turns
+    assert handler.translate_batch(["안녕"]) == [("en(안녕)", True)]
+    assert len(handler.ko_en_model.batches) == 2
+
+def test_split_into_chunks():
+    """Sentences are merged up to max_chars; oversized sentences are cut at spaces"""
+    text = "오늘은 날씨가 좋네요. 내일은 비가 온대요!\n모레는 어떨까요?"
+    assert split_into_chunks(text, max_chars=100) == ["오늘은 날씨가 좋네요. 내일은 비가 온대요! 모레는 어떨까요?"]
+    assert split_into_chunks(text, max_chars=15) == ["오늘은 날씨가 좋네요.", "내일은 비가 온대요!", "모레는 어떨까요?"]
+    assert split_into_chunks("가나다 라마바 사아자", max_chars=7) == ["가나다 라마바", "사아자"]
+    assert split_into_chunks("가나다라마바사", max_chars=3) == ["가나다", "라마바", "사"]
+
+def test_long_text_is_chunked():
+    """A long input is translated completely, chunks batched together and rejoined in order"""
+    handler = make_fake_handler()
+    handler.chunk_max_chars = 20
+
+    translated = handler.translate_to_english("오늘은 날씨가 정말 좋네요. 산책 가요. 내일은 비가 온대요.")
+
+    assert translated == "en(오늘은 날씨가 정말 좋네요.) en(산책 가요. 내일은 비가 온대요.)"
+    assert handler.ko_en_model.batches == [["오늘은 날씨가 정말 좋네요.", "산책 가요. 내일은 비가 온대요."]]
+
+def make_tiny_marian_model():
+    """Randomly initialised MarianMT small enough to quantize in a unit test"""
+    from transformers import MarianConfig, MarianMTModel
+    config = MarianConfig(
+        vocab_size=64, d_model=16, encoder_layers=1, decoder_layers=1,
+        encoder_attention_heads=2, decoder_attention_heads=2,
+        encoder_ffn_dim=32, decoder_ffn_dim=32, max_position_embeddings=32,
+        pad_token_id=0, eos_token_id=1, decoder_start_token_id=0,
+    )
+    return MarianMTModel(config)
+
+def int8_weights(model):
+    import torch
+    return [m.weight().dequantize() for m in model.modules() if isinstance(m, torch.ao.nn.quantized.dynamic.Linear)]
+
+def test_quantized_model_is_cached(tmp_path, monkeypatch):
+    """The int8 weights are saved once as a state_dict; later cold starts load them"""
+    pytest.importorskip("torch")
+    transformers = pytest.importorskip("transformers")
+    import torch
+
+    loads = []
+    def fake_model_from_pretrained(name):
+        loads.append(name)
+        torch.manual_seed(len(loads))  # every load starts from different weights
+        return make_tiny_marian_model()
+
+    monkeypatch.setattr(transformers.MarianTokenizer, "from_pretrained", lambda name: FakeTokenizer())
+    monkeypatch.setattr(transformers.MarianMTModel, "from_pretrained", fake_model_from_pretrained)
+    model_path = str(tmp_path / "int8.pt")
+    cache = TranslationCache(namespace="fake", enabled=False)
+
+    first = TranslationHandler(cache=cache, quantized=True, quantized_model_path=model_path)
+    first.warmup()
+    assert (tmp_path / "int8.pt").exists()
+    assert any(isinstance(m, torch.ao.nn.quantized.dynamic.Linear) for m in first.ko_en_model.modules())
+    torch.load(model_path, weights_only=True)  # tensors only, no pickled modules
+
+    second = TranslationHandler(cache=cache, quantized=True, quantized_model_path=model_path)
+    second.warmup()
+    assert any(isinstance(m, torch.ao.nn.quantized.dynamic.Linear) for m in second.ko_en_model.modules())
+    assert all(torch.equal(a, b) for a, b in zip(int8_weights(first.ko_en_model), int8_weights(second.ko_en_model)))
+
+def test_corrupt_quantized_cache_is_a_miss(tmp_path, monkeypatch):
+    pytest.importorskip("torch")
+    transformers = pytest.importorskip("transformers")
+    import torch
+
+    monkeypatch.setattr(transformers.MarianTokenizer, "from_pretrained", lambda name: FakeTokenizer())
+    monkeypatch.setattr(transformers.MarianMTModel, "from_pretrained", lambda name: make_tiny_marian_model())
+    model_path = tmp_path / "int8.pt"
+    model_path.write_bytes(b"not a torch file")
+
+    handler = TranslationHandler(cache=TranslationCache(namespace="fake", enabled=False), quantized=True, quantized_model_path=str(model_path))
+    handler.warmup()
+
+    assert any(isinstance(m, torch.ao.nn.quantized.dynamic.Linear) for m in handler.ko_en_model.modules())
+    torch.load(str(model_path), weights_only=True)  # rewritten with valid weights
+
+def test_translation():
+    """Test Korean to English translation"""
     print("\nTesting translations:")
-    for text in korean_texts:
+    for text in KOREAN_TEXTS:
         translated, was_translated = translator.process_text(text)
         print(f"\nKorean: {text}")
         print(f"English: {translated}")
@@ -0,0 +1,87 @@
+import pytest
+from libs.translation_cache import TranslationCache, normalize_text
+from libs.translation_handler import TranslationHandler
+
+def make_cache(tmp_path=None, **kwargs) -> TranslationCache:
+    disk_path = str(tmp_path / "cache.sqlite3") if tmp_path else ""
+    return TranslationCache(namespace="test-model", enabled=True, disk_path=disk_path, **kwargs)
+
+def test_normalize_text():
+    """Whitespace differences share a cache key"""
+    assert normalize_text("  내일   일정 \n알려줘 ") == "내일 일정 알려줘"
+
+def test_memory_hit_and_miss():
+    cache = make_cache()
+    assert cache.get("안녕하세요") is None
+    cache.set("안녕하세요", "Hello")
+
+    assert cache.get("안녕하세요 ") == "Hello"
+    stats = cache.stats()
+    assert stats["memory_hits"] == 1
+    assert stats["misses"] == 1
+
+def test_lru_eviction():
+    cache = make_cache(max_entries=2)
+    cache.set("하나", "one")
+    cache.set("둘", "two")
+    cache.get("하나")  # "하나" becomes most recently used
+    cache.set("셋", "three")
+
+    assert cache.get("둘") is None
+    assert cache.get("하나") == "one"
+    assert cache.get("셋") == "three"
+
+def test_ttl_expiry(monkeypatch):
+    cache = make_cache(ttl_seconds=10)
+    now = [1000.0]
+    monkeypatch.setattr("libs.translation_cache.time.time", lambda: now[0])
+
+    cache.set("안녕하세요", "Hello")
+    now[0] += 11
+
+    assert cache.get("안녕하세요") is None
+
+def test_disk_survives_new_instance(tmp_path):
+    """A fresh process (warm container, new handler) reads the disk level"""
+    make_cache(tmp_path).set("사진을 보여주세요", "Show me the picture")
+
+    cache = make_cache(tmp_path)
+    assert cache.get("사진을 보여주세요") == "Show me the picture"
+    assert cache.stats()["disk_hits"] == 1
+    # Promoted into memory on the first disk hit
+    assert cache.get("사진을 보여주세요") == "Show me the picture"
+    assert cache.stats()["memory_hits"] == 1
+
+def test_disk_trim(tmp_path):
+    cache = make_cache(tmp_path, disk_max_entries=3)
+    cache._disk.TRIM_INTERVAL = 1
+    for i in range(5):
+        cache.set(f"문장 {i}", f"sentence {i}")
+
+    rows = cache._disk.conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+    assert rows == 3
+
+def test_disabled_cache(tmp_path):
+    cache = TranslationCache(namespace="test-model", enabled=False, disk_path=str(tmp_path / "off.sqlite3"))
+    cache.set("안녕하세요", "Hello")
+    assert cache.get("안녕하세요") is None
+    assert cache.stats()["misses"] == 0
+
+def test_process_text_uses_cache(monkeypatch):
+    """Only the first of repeated Korean utterances reaches MarianMT"""
+    handler = TranslationHandler(cache=make_cache())
+    calls = []
+
+    def fake_translate(text):
+        calls.append(text)
+        return f"translated({text})"
+
+    monkeypatch.setattr(handler, "translate_to_english", fake_translate)
+
+    for _ in range(3):
+        translated, was_translated = handler.process_text("내일 일정을 알려주세요")
+        assert was_translated
+        assert translated == "translated(내일 일정을 알려주세요)"
+
+    assert calls == ["내일 일정을 알려주세요"]
+    assert not handler.is_loaded
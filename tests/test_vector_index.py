@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+import libs.news_search as news_search
+from libs.vector_index import LocalVectorIndex
+
+def make_records(count=200, dim=16, seed=0):
+    rng = np.random.default_rng(seed)
+    return [
+        {"_id": f"topic-{i}", "_source": {"title": f"제목 {i}", "summary": f"요약 {i}", "sources": [i], "embed": rng.standard_normal(dim).tolist()}}
+        for i in range(count)
+    ]
+
+def test_exact_search_matches_brute_force():
+    records = make_records()
+    index = LocalVectorIndex.from_records(records)
+    query = np.asarray(records[42]["_source"]["embed"])
+
+    results = index.search(query, k=3)
+
+    assert results[0][0] == 42
+    assert index.docs[42] == {"title": "제목 42", "summary": "요약 42", "sources": [42], "_id": "topic-42"}
+    assert [s for _, s in results] == sorted([s for _, s in results], reverse=True)
+
+def test_from_records_with_reduced_dimensions():
+    records = make_records()
+    index = LocalVectorIndex.from_records(records, dimensions=8)
+
+    assert index.vectors.shape == (200, 8)
+    assert np.allclose(np.linalg.norm(index.vectors, axis=1), 1.0)
+    assert index.search(np.asarray(records[7]["_source"]["embed"][:8]), k=1)[0][0] == 7
+
+def test_ivf_with_all_lists_equals_exact():
+    index = LocalVectorIndex.from_records(make_records(), nlist=8)
+    rng = np.random.default_rng(1)
+    for _ in range(10):
+        query = rng.standard_normal(16)
+        exact = [i for i, _ in index.search(query, k=5, mode="exact")]
+        approx = [i for i, _ in index.search(query, k=5, mode="ivf", nprobe=8)]
+        assert approx == exact
+
+def test_save_and_load_memory_mapped(tmp_path):
+    index = LocalVectorIndex.from_records(make_records(), nlist=4)
+    index.save(str(tmp_path))
+
+    loaded = LocalVectorIndex.load(str(tmp_path))
+
+    assert isinstance(loaded.vectors, np.memmap)
+    query = np.asarray(make_records()[7]["_source"]["embed"])
+    assert loaded.search_docs(query, k=1, mode="ivf")[0]["_id"] == "topic-7"
+
+def test_semantic_search_uses_local_index(monkeypatch):
+    records = make_records()
+    index = LocalVectorIndex.from_records(records)
+    monkeypatch.setattr(news_search, "get_local_index", lambda: index)
+    monkeypatch.setattr(news_search.embedding_service, "embed", lambda text: np.asarray(records[3]["_source"]["embed"]))
+
+    docs = news_search.semantic_search("환율 뉴스")
+
+    assert len(docs) == 2
+    assert docs[0]["_id"] == "topic-3"